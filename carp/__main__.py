@@ -1,107 +1,707 @@
+from __future__ import annotations
+
 import json
+import sys
 from pathlib import Path
-from typing import Optional
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Optional
 
-from pydantic import parse_raw_as
 from typer import Typer, FileText, Argument, Option
 
-from common.errors import TranslationError
-from common.operations import Operation
-from executor.control import ControlUnit
-from executor.wiring import DataPath
-from translator.parser import ParserError
-from translator.reader import Reader
-from translator.translator import Translator
+# Commands import the translator and the executor only when they need them:
+# the interpreter start-up is a large share of the time of short runs
+# (see ``startup-time``). Only modules for the options are imported here
+from common.constants import (
+    DEFAULT_CACHE_LIMIT,
+    DEFAULT_CORE_STACK_SIZE,
+    DEFAULT_UNROLL_BUDGET,
+    DEFAULT_UNROLL_FACTOR,
+    IO_DEVICE_COUNT,
+    OPTIMIZATION_LEVELS,
+    ProgramFormat,
+)
+from common.errors import ProgramError, TranslationError
+from executor.cache import Replacement, WritePolicy
+from executor.prediction import PREDICTORS
+
+if TYPE_CHECKING:
+    from common.program import Program
+    from executor.cache import Cache
+    from executor.control import ControlUnit
+    from executor.pipeline import PipelineModel
+    from executor.prediction import BranchPredictor
+    from translator.build_cache import BuildCache
+    from translator.passes import PassStats
+    from translator.reader import Reader
 
 app = Typer()
 
+DEFAULT_MEMORY_SIZE: int = 100
+WATCH_INTERVAL: float = 0.5  # seconds between checks of the source with --watch
+
+
+def write_output(output: list[int], output_path: Path | None) -> None:
+    result = "".join(chr(i) for i in output)
+    if output_path:
+        with output_path.open("w", encoding="utf-8") as f:
+            f.write(result)
+    else:
+        print(result, end="")
+
+
+def print_pass_stats(level: int, stats: list[PassStats]) -> None:
+    print(f"Optimization passes (-O{level}):")
+    for record in stats:
+        print(f"  {record}")
+
+
+def print_timings(timings: dict[str, float]) -> None:
+    print("Timings:", file=sys.stderr)
+    for phase, time in [*timings.items(), ("total", sum(timings.values()))]:
+        print(f"  {phase:<12} {time * 1000:>10.3f} ms", file=sys.stderr)
+
+
+def print_translation_error(reader: Reader, error: TranslationError) -> None:
+    reader.back()
+    symbol = reader.current_or_closing()
+    print(
+        "Translation error occurred at "
+        + f"{symbol.line}:{symbol.char} "
+        + f"({symbol.text}): {error}"
+    )
+
+
+def translation_options(
+    optimize: int,
+    disable_pass: list[str],
+    unroll: int,
+    unroll_budget: int,
+    inline_runtime: bool,
+) -> dict[str, Any]:
+    """Options, that change the result (for the build cache keys)"""
+    return {
+        "optimize": optimize,
+        "disable_pass": sorted(disable_pass),
+        "unroll": unroll,
+        "unroll_budget": unroll_budget,
+        "inline_runtime": inline_runtime,
+    }
+
+
+def compile_source(
+    reader: Reader,
+    optimize: int,
+    disable_pass: list[str],
+    unroll: int,
+    unroll_budget: int,
+    inline_runtime: bool,
+) -> tuple[Program, list[PassStats]]:
+    """
+    Translates and optimizes the source, while it is read.
+    Raises :py:class:`ParserError` and :py:class:`TranslationError`
+    """
+    from common.program import Program
+    from translator.passes import (
+        create_form_passes,
+        create_operation_passes,
+        optimize_symbols,
+    )
+    from translator.translator import Translator
+
+    translator: Translator = Translator(
+        reader=reader, shared_runtime=optimize >= 1 and not inline_runtime
+    )
+    form_passes = create_form_passes(
+        translator.variables,
+        optimize,
+        disable_pass,
+        unroll,
+        unroll_budget,
+        shared_runtime=translator.shared_runtime,
+    )
+    if form_passes.enabled:
+        reader.symbols = optimize_symbols(reader.symbols, form_passes)
+    translator.translate_blocks()
+
+    passes = create_operation_passes(optimize, disable_pass)
+    operations = passes.run(translator.result)
+    program = Program(instructions=operations, data=translator.data)
+    return program, form_passes.stats + passes.stats
+
+
+def watch_source(
+    source_path: Path,
+    output_path: Path,
+    program_format: ProgramFormat,
+    optimize: int,
+    disable_pass: list[str],
+    unroll: int,
+    unroll_budget: int,
+    inline_runtime: bool,
+) -> None:
+    """
+    Translates the source again after each change, until interrupted.
+    Only forms from the first changed line are translated again,
+    unless passes over forms are enabled: they need the whole source
+    """
+    from time import sleep
+
+    from common.binary import save_program
+    from common.program import Program
+    from translator.incremental import IncrementalTranslator
+    from translator.parser import ParserError
+    from translator.passes import create_form_passes, create_operation_passes
+    from translator.reader import Reader
+    from translator.variables import VariableIndex
+
+    incremental: IncrementalTranslator | None = None
+    if not create_form_passes(VariableIndex(), optimize, disable_pass).enabled:
+        incremental = IncrementalTranslator(optimize >= 1 and not inline_runtime)
+
+    def compile_version(reader: Reader, source: str) -> tuple[Program, str]:
+        if incremental is None:
+            program, _ = compile_source(
+                reader, optimize, disable_pass, unroll, unroll_budget, inline_runtime
+            )
+            return program, "Compilation successful"
+        translated: Program = incremental.update(source)
+        operations = create_operation_passes(optimize, disable_pass).run(
+            translated.instructions
+        )
+        summary: str = f"Compiled {incremental.translated} of {incremental.forms} forms"
+        return Program(instructions=operations, data=translated.data), summary
+
+    print(f"Watching {source_path} for changes, press Ctrl+C to stop", flush=True)
+    modified: int | None = None
+    try:
+        while True:
+            try:
+                stamp: int | None = source_path.stat().st_mtime_ns
+            except FileNotFoundError:  # editors may replace the file
+                stamp = None
+            if stamp is not None and stamp != modified:
+                modified = stamp
+                source: str = source_path.read_text(encoding="utf-8")
+                reader: Reader = (
+                    Reader(source)
+                    if incremental is None
+                    else incremental.translator.reader
+                )
+                try:
+                    program, summary = compile_version(reader, source)
+                    save_program(program, output_path, program_format)
+                    print(f"{summary}, result has been saved to {output_path}")
+                except (ParserError, ProgramError) as e:
+                    print(str(e))
+                except TranslationError as e:
+                    print_translation_error(reader, e)
+                sys.stdout.flush()
+            sleep(WATCH_INTERVAL)
+    except KeyboardInterrupt:
+        print("Stopped watching")
+
+
+def cache_program(build_cache: BuildCache, key: str, program: Program) -> None:
+    """
+    Puts the program to the cache. Programs, that the binary format can not
+    encode (e.g. numbers outside a word), are left out of the cache
+    """
+    try:
+        build_cache.put(key, program)
+    except ProgramError:
+        pass
+
+
+def create_control(
+    program: Program,
+    input_string: FileText | None,
+    memory_size: int | None,
+    logging: bool = False,
+    cache: Cache | None = None,
+    pipeline: PipelineModel | None = None,
+    predictor: BranchPredictor | None = None,
+) -> ControlUnit:
+    from executor.control import ControlUnit
+    from executor.wiring import DataPath
+
+    if input_string is None:
+        input_data = []
+    else:
+        input_data = [ord(char) for char in input_string.read()]
+
+    data_path = DataPath(
+        data_memory_size=memory_size or DEFAULT_MEMORY_SIZE + program.data_size,
+        instruction_memory=program.instructions,
+        input_data=input_data,
+        cache=cache,
+    )
+    return ControlUnit(
+        data_path, logging=logging, pipeline=pipeline, predictor=predictor
+    )
+
+
+def run_control(
+    control: ControlUnit, program: Program, output_path: Path | None
+) -> None:
+    try:
+        control.data_path.load_data(program.data)
+        control.main()
+        write_output(control.data_path.get_output(), output_path)
+    except (IndexError, RuntimeError) as e:
+        control.save_state()
+        print(f"Error: {e}")
+        print("Run with --save-log to debug this")
+
+
+def write_log(control: ControlUnit, log_path: Path) -> None:
+    from common.serialization import dump
+
+    with log_path.open("w", encoding="utf-8") as f:
+        json.dump([dump(record) for record in control.log], f, indent=2)
+    print(f"Execution log saved to {log_path}")
+
 
 @app.command()
 def translate(
     input_file: FileText = Argument(..., help="Path to the source file"),
     output_path: Optional[Path] = Argument(None, help="Path for the output"),
     save_parsed: bool = Option(False, help="Saves parsed symbols to a file as well"),
+    optimize: int = Option(
+        0,
+        "--optimize",
+        "-O",
+        min=min(OPTIMIZATION_LEVELS),
+        max=max(OPTIMIZATION_LEVELS),
+        help="Optimization level (-O0 keeps the output as translated)",
+    ),
+    disable_pass: list[str] = Option([], help="Disables an optimization pass by name"),
+    pass_stats: bool = Option(False, help="Prints timing & size changes for passes"),
+    unroll: int = Option(
+        DEFAULT_UNROLL_FACTOR, min=1, help="Max times to repeat bodies of loops (-O2)"
+    ),
+    unroll_budget: int = Option(
+        DEFAULT_UNROLL_BUDGET, min=0, help="Max instructions in an unrolled body"
+    ),
+    inline_runtime: bool = Option(
+        False, help="Inlines runtime routines at each usage (always on -O0)"
+    ),
+    program_format: ProgramFormat = Option(
+        ProgramFormat.JSON.value,
+        "--format",
+        help="Format of the output: json (.curp) or binary (.curb)",
+    ),
+    cache_dir: Optional[Path] = Option(
+        None,
+        envvar="CARP_CACHE_DIR",
+        help="Reuses results for the same source and options from this directory "
+        + "(not with --save-parsed and --pass-stats)",
+    ),
+    cache_limit: int = Option(
+        DEFAULT_CACHE_LIMIT, min=1, help="Size of the cache directory in megabytes"
+    ),
+    watch: bool = Option(
+        False,
+        help="Translates the source again after each change, only from the first "
+        + "changed top-level form (until interrupted, without the cache)",
+    ),
 ) -> None:
+    from functools import partial
+
+    from common.binary import save_program
+    from translator.build_cache import BuildCache
+    from translator.parser import READ_CHUNK_SIZE, ParserError
+    from translator.reader import Reader
+
     input_path = input_file.name.rpartition(".")[0]
     if output_path is None:
-        output_path = Path(input_path + ".curp")
+        output_path = Path(input_path + program_format.suffix)
+
+    if watch:
+        input_file.close()
+        watch_source(
+            Path(input_file.name),
+            output_path,
+            program_format,
+            optimize,
+            disable_pass,
+            unroll,
+            unroll_budget,
+            inline_runtime,
+        )
+        return
+
+    build_cache: BuildCache | None = None
+    cache_key: str = ""
+    if cache_dir is not None and not save_parsed and not pass_stats:
+        build_cache = BuildCache(cache_dir, cache_limit * 1024 * 1024)
+
+    if build_cache is None:
+        # the source is parsed while it is read and translated
+        reader = Reader(iter(partial(input_file.read, READ_CHUNK_SIZE), ""))
+    else:
+        source: str = input_file.read()
+        cache_key = BuildCache.key(
+            source,
+            translation_options(
+                optimize, disable_pass, unroll, unroll_budget, inline_runtime
+            ),
+        )
+        cached: Program | None = build_cache.get(cache_key)
+        if cached is not None:
+            save_program(cached, output_path, program_format)
+            print("Compilation result is taken from the cache")
+            print(f"Result has been saved to {output_path}")
+            return
+        reader = Reader(source)
 
-    code = input_file.read()
     try:
-        reader = Reader(code)
-        print("Parsing successful")
         if save_parsed:
-            parsed = [symbol.dict() for symbol in reader.symbols]
+            parsed = [symbol.as_dict() for symbol in reader.symbols]
             with Path(input_path + ".cpar").open("w", encoding="utf-8") as f:
                 json.dump(parsed, f, indent=2)
             print(f"Parsing result saved to {input_path}.cpar")
-    except ParserError as e:
-        print(str(e))
-
-    try:
-        translator: Translator = Translator(reader=reader)
-        translator.translate_blocks()
-        compiled = [operation.dict() for operation in translator.result]
 
-        with output_path.open("w", encoding="utf-8") as f:
-            json.dump(compiled, f, indent=2)
+        compiled, stats = compile_source(
+            reader, optimize, disable_pass, unroll, unroll_budget, inline_runtime
+        )
+        print("Parsing and translation successful")
+        if build_cache is not None:
+            cache_program(build_cache, cache_key, compiled)
+        save_program(compiled, output_path, program_format)
         print("Compilation successful")
         print(f"Result has been saved to {output_path}")
+        if pass_stats:
+            print_pass_stats(optimize, stats)
+    except (ParserError, ProgramError) as e:
+        print(str(e))
     except TranslationError as e:
-        translator.reader.back()
-        symbol = translator.reader.current_or_closing()
-        print(
-            "Translation error occurred at "
-            + f"{symbol.line}:{symbol.char} "
-            + f"({symbol.text}): {e}"
-        )
+        print_translation_error(reader, e)
 
 
 @app.command()
 def execute(
-    instructions: FileText = Argument(..., help="Path to the compiled code file"),
+    instructions: Path = Argument(
+        ...,
+        exists=True,
+        dir_okay=False,
+        help="Path to the compiled code file (.curp or .curb)",
+    ),
+    input_string: Optional[FileText] = Argument(None, help="Path for the input data"),
+    output_path: Optional[Path] = Argument(None, help="Path for the output data"),
+    save_log: bool = Option(False, help="Saves the execution logs to a file"),
+    memory_size: Optional[int] = Option(
+        None,
+        min=IO_DEVICE_COUNT,
+        help="Size of the data memory (with the stack) [default: 100 + data segment]",
+    ),
+    stats: bool = Option(False, help="Prints performance counters to stderr"),
+    pipeline: bool = Option(False, help="Prints pipeline timing to stderr"),
+    cache: bool = Option(False, help="Simulates a data cache, prints it to stderr"),
+    cache_size: int = Option(64, min=1, help="Cache size in words"),
+    cache_line: int = Option(4, min=1, help="Cache line size in words"),
+    cache_ways: int = Option(2, min=1, help="Cache associativity"),
+    cache_replacement: Replacement = Option(Replacement.LRU.value),
+    cache_write: WritePolicy = Option(WritePolicy.WRITE_BACK.value),
+    predictor: Optional[str] = Option(
+        None,
+        help=f"Simulates a branch predictor ({', '.join(PREDICTORS)}), "
+        + "prints it to stderr",
+    ),
+) -> None:
+    from common.binary import load_program
+    from executor.cache import Cache, CacheConfig
+    from executor.pipeline import PipelineModel
+
+    cache_model: Cache | None = None
+    if cache:
+        try:
+            cache_model = Cache(
+                CacheConfig(
+                    size=cache_size,
+                    line_size=cache_line,
+                    associativity=cache_ways,
+                    replacement=cache_replacement,
+                    write_policy=cache_write,
+                )
+            )
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+
+    predictor_model: BranchPredictor | None = None
+    if predictor is not None:
+        predictor_type = PREDICTORS.get(predictor)
+        if predictor_type is None:
+            print(f"Error: unknown branch predictor '{predictor}'")
+            return
+        predictor_model = predictor_type()
+
+    try:
+        program: Program = load_program(instructions)
+    except ProgramError as e:
+        print(f"Error: {e}")
+        return
+
+    pipeline_model: PipelineModel | None = PipelineModel() if pipeline else None
+    control = create_control(
+        program,
+        input_string,
+        memory_size,
+        logging=save_log,
+        cache=cache_model,
+        pipeline=pipeline_model,
+        predictor=predictor_model,
+    )
+    run_control(control, program, output_path)
+
+    if stats:
+        print(f"Performance: {control.data_path.counters}", file=sys.stderr)
+    if pipeline_model is not None:
+        print(f"Pipeline: {pipeline_model.stats}", file=sys.stderr)
+    if cache_model is not None:
+        print(f"Cache:\n{cache_model.stats}", file=sys.stderr)
+    if predictor_model is not None:
+        print(f"Branch prediction ({predictor}):", file=sys.stderr)
+        print(predictor_model.stats, file=sys.stderr)
+
+    if save_log:
+        write_log(control, instructions.with_suffix(".clog"))
+
+
+@app.command()
+def run(
+    input_file: FileText = Argument(..., help="Path to the source file"),
     input_string: Optional[FileText] = Argument(None, help="Path for the input data"),
     output_path: Optional[Path] = Argument(None, help="Path for the output data"),
+    optimize: int = Option(
+        0,
+        "--optimize",
+        "-O",
+        min=min(OPTIMIZATION_LEVELS),
+        max=max(OPTIMIZATION_LEVELS),
+        help="Optimization level (-O0 keeps the output as translated)",
+    ),
+    disable_pass: list[str] = Option([], help="Disables an optimization pass by name"),
+    unroll: int = Option(
+        DEFAULT_UNROLL_FACTOR, min=1, help="Max times to repeat bodies of loops (-O2)"
+    ),
+    unroll_budget: int = Option(
+        DEFAULT_UNROLL_BUDGET, min=0, help="Max instructions in an unrolled body"
+    ),
+    inline_runtime: bool = Option(
+        False, help="Inlines runtime routines at each usage (always on -O0)"
+    ),
+    memory_size: Optional[int] = Option(
+        None,
+        min=IO_DEVICE_COUNT,
+        help="Size of the data memory (with the stack) [default: 100 + data segment]",
+    ),
+    program_path: Optional[Path] = Option(
+        None,
+        "--save-program",
+        help="Saves the compiled program as well (binary for .curb)",
+    ),
     save_log: bool = Option(False, help="Saves the execution logs to a file"),
+    stats: bool = Option(False, help="Prints performance counters to stderr"),
+    timings: bool = Option(False, help="Prints time of each phase to stderr"),
+    cache_dir: Optional[Path] = Option(
+        None,
+        envvar="CARP_CACHE_DIR",
+        help="Reuses results for the same source and options from this directory",
+    ),
+    cache_limit: int = Option(
+        DEFAULT_CACHE_LIMIT, min=1, help="Size of the cache directory in megabytes"
+    ),
 ) -> None:
-    operations: list[Operation] = parse_raw_as(list[Operation], instructions.read())
+    """
+    Translates and executes the source in one process,
+    operations are given to the executor without files
+    """
+    from common.binary import save_program
+    from translator.build_cache import BuildCache
+    from translator.parser import ParserError
+    from translator.reader import Reader
+
+    phases: dict[str, float] = {}
+    started: float = perf_counter()
+    source: str = input_file.read()
+    options: dict[str, Any] = translation_options(
+        optimize, disable_pass, unroll, unroll_budget, inline_runtime
+    )
+    build_cache: BuildCache | None = None
+    cache_key: str = ""
+    program: Program | None = None
+    if cache_dir is not None:
+        build_cache = BuildCache(cache_dir, cache_limit * 1024 * 1024)
+        cache_key = BuildCache.key(source, options)
+        program = build_cache.get(cache_key)
+    phases["read"] = perf_counter() - started
+
+    if program is None:
+        started = perf_counter()
+        reader = Reader(source)
+        try:
+            program, pass_stats = compile_source(reader, **options)
+        except ParserError as e:
+            print(str(e))
+            return
+        except TranslationError as e:
+            print_translation_error(reader, e)
+            return
+        optimized: float = sum(record.time for record in pass_stats)
+        phases["translate"] = perf_counter() - started - optimized
+        phases["optimize"] = optimized
+        if build_cache is not None:
+            cache_program(build_cache, cache_key, program)
+
+    if program_path is not None:
+        started = perf_counter()
+        try:
+            save_program(program, program_path, ProgramFormat.of(program_path))
+        except ProgramError as e:
+            print(str(e))
+            return
+        phases["save"] = perf_counter() - started
+
+    started = perf_counter()
+    control = create_control(program, input_string, memory_size, logging=save_log)
+    run_control(control, program, output_path)
+    phases["execute"] = perf_counter() - started
+
+    if stats:
+        print(f"Performance: {control.data_path.counters}", file=sys.stderr)
+    if timings:
+        print_timings(phases)
+    if save_log:
+        write_log(control, Path(input_file.name.rpartition(".")[0] + ".clog"))
+
+
+@app.command()
+def execute_cores(
+    instructions: Path = Argument(
+        ...,
+        exists=True,
+        dir_okay=False,
+        help="Path to the compiled code file (.curp or .curb)",
+    ),
+    input_string: Optional[FileText] = Argument(None, help="Path for the input data"),
+    output_path: Optional[Path] = Argument(None, help="Path for the output data"),
+    cores: int = Option(2, min=1, help="Number of cores, that start at 0"),
+    entry: list[int] = Option([], help="Entry point of a core (replaces --cores)"),
+    quantum: int = Option(1, min=1, help="Instructions per turn of a core"),
+    core_stack: int = Option(
+        DEFAULT_CORE_STACK_SIZE, min=1, help="Stack size of each core"
+    ),
+    memory_size: Optional[int] = Option(
+        None,
+        min=IO_DEVICE_COUNT,
+        help="Size of the shared data memory "
+        + "[default: 100 + data segment + stacks of other cores]",
+    ),
+    stats: bool = Option(False, help="Prints performance counters to stderr"),
+) -> None:
+    from common.binary import load_program
+    from executor.multicore import MultiCore
+
+    try:
+        program: Program = load_program(instructions)
+    except ProgramError as e:
+        print(f"Error: {e}")
+        return
     if input_string is None:
         input_data = []
     else:
         input_data = [ord(char) for char in input_string.read()]
 
-    data_path = DataPath(
-        data_memory_size=100,
-        instruction_memory=operations,
+    entry_points: list[int] = entry or [0] * cores
+    machine = MultiCore(
+        data_memory_size=memory_size
+        or DEFAULT_MEMORY_SIZE
+        + program.data_size
+        + (len(entry_points) - 1) * core_stack,
+        instruction_memory=program.instructions,
         input_data=input_data,
+        entry_points=entry_points,
+        quantum=quantum,
+        stack_size=core_stack,
     )
-    control = ControlUnit(data_path)
     try:
-        control.main()
-        result = "".join(chr(i) for i in data_path.get_output())
-        if output_path:
-            with output_path.open("w", encoding="utf-8") as f:
-                f.write(result)
-        else:
-            print(result, end="")
+        machine.load_data(program.data)
+        machine.main()
+        write_output(machine.get_output(), output_path)
     except (IndexError, RuntimeError) as e:
-        control.save_state()
         print(f"Error: {e}")
-        print("Run with --save-log to debug this")
 
-    if save_log:
-        log_path = instructions.name.rpartition(".")[0] + ".clog"
-        with Path(log_path).open("w", encoding="utf-8") as f:
-            json.dump([record.dict() for record in control.log], f, indent=2)
-        print(f"Execution log saved to {log_path}")
+    if stats:
+        print(f"Performance:\n{machine.stats}", file=sys.stderr)
 
 
 @app.command()
 def generate_schema(output_path: Optional[Path] = Argument(None)) -> None:
+    from common.schema import OperationModel
+
     if output_path is None:
         output_path = Path("docs/operation-schema.json")
     with output_path.open("w", encoding="utf-8") as f:
-        json.dump(Operation.schema(), f, indent=2)
+        json.dump(OperationModel.schema(), f, indent=2)
+
+
+@app.command(context_settings={"ignore_unknown_options": True})
+def startup_time(
+    command: Optional[list[str]] = Argument(
+        None, help="Command with its arguments to measure [default: --help]"
+    ),
+    runs: int = Option(10, min=1, help="Number of runs to measure"),
+    modules: bool = Option(False, help="Lists modules, that the command imports"),
+) -> None:
+    """
+    Runs a command in new interpreters and prints how long they take,
+    along with the interpreter itself, to keep the start-up fast
+    """
+    import subprocess
+    from statistics import median
+
+    arguments: list[str] = command or ["--help"]
+
+    def measure(*args: str) -> list[float]:
+        times: list[float] = []
+        for _ in range(runs):
+            started: float = perf_counter()
+            subprocess.run(
+                [sys.executable, *args],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=False,
+            )
+            times.append(perf_counter() - started)
+        return times
+
+    for name, times in [
+        ("python", measure("-c", "pass")),
+        (" ".join(arguments), measure(str(Path(__file__).parent), *arguments)),
+    ]:
+        print(
+            f"{name}: {min(times) * 1000:.1f} ms min, "
+            + f"{median(times) * 1000:.1f} ms median ({runs} runs)"
+        )
+
+    if modules:
+        imports: str = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                str(Path(__file__).parent),
+                *arguments,
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False,
+        ).stderr
+        for line in imports.splitlines()[1:]:
+            if line.startswith("import time:"):
+                print(line.rpartition("|")[2].strip())
 
 
 if __name__ == "__main__":
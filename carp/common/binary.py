@@ -0,0 +1,270 @@
+import json
+import mmap
+import struct
+from collections.abc import Callable
+from dataclasses import fields
+from enum import Enum
+from pathlib import Path
+from types import UnionType
+from typing import Any, get_args, get_origin, get_type_hints
+
+from common.constants import WORD_MAX_VALUE, WORD_MIN_VALUE, ProgramFormat
+from common.errors import ProgramError
+from common.operations import (
+    RA,
+    RB,
+    BinaryOperation,
+    BlockOperation,
+    IndexedMemoryOperation,
+    JumpOperation,
+    MemoryOperation,
+    Operation,
+    OperationBase,
+    Registry,
+    StackOperation,
+    SubroutineOperation,
+    Value,
+    VectorOperation,
+)
+from common.program import DataSegment, Program, parse_program
+
+# Binary format of compiled programs (``.curb``), all numbers are little-endian:
+#   header: magic, format version, number of data segments and of instructions
+#   data segments: address, number of values and the values (32-bit words)
+#   instructions: fixed-width words (see :py:data:`INSTRUCTION`)
+MAGIC: bytes = b"CURB"
+FORMAT_VERSION: int = 1
+HEADER: struct.Struct = struct.Struct("<4sHxxII")
+SEGMENT: struct.Struct = struct.Struct("<iI")
+WORD: struct.Struct = struct.Struct("<i")
+# opcode, registries (a bit per field), operand modes (a bit per field,
+# set for a number) and up to four 32-bit immediates, addresses or offsets
+INSTRUCTION: struct.Struct = struct.Struct("<BBBx4i")
+IMMEDIATES: int = 4
+
+REGISTRY_BITS: dict[Registry.Code, int] = {
+    Registry.Code.ACCUMULATOR: 0,
+    Registry.Code.BUFFER: 1,
+}
+BIT_REGISTRIES: tuple[Registry, Registry] = (RA, RB)
+
+
+# opcodes are pinned: a new code gets the next free number, and changing
+# the existing ones requires a new format version
+OPCODES: dict[Enum, int] = {
+    BinaryOperation.Code.MOVE_DATA: 0,
+    BinaryOperation.Code.COMPARE: 1,
+    BinaryOperation.Code.COMPARE_REVERSE: 2,
+    BinaryOperation.Code.MATH_ADD: 3,
+    BinaryOperation.Code.MATH_SUB: 4,
+    BinaryOperation.Code.MATH_MUL: 5,
+    BinaryOperation.Code.MATH_DIV: 6,
+    BinaryOperation.Code.MATH_MOD: 7,
+    StackOperation.Code.GRAB: 8,
+    StackOperation.Code.PUSH: 9,
+    JumpOperation.Code.JUMP_ZERO: 10,
+    JumpOperation.Code.JUMP_NEGATIVE: 11,
+    JumpOperation.Code.JUMP_NOT_ZERO: 12,
+    JumpOperation.Code.JUMP_NOT_NEGATIVE: 13,
+    JumpOperation.Code.JUMP_BECAUSE: 14,
+    MemoryOperation.Code.LOAD_MEMORY: 15,
+    MemoryOperation.Code.SAVE_MEMORY: 16,
+    IndexedMemoryOperation.Code.LOAD_INDEXED: 17,
+    IndexedMemoryOperation.Code.SAVE_INDEXED: 18,
+    SubroutineOperation.Code.CALL: 19,
+    SubroutineOperation.Code.RETURN: 20,
+    BlockOperation.Code.COPY_BLOCK: 21,
+    BlockOperation.Code.FILL_BLOCK: 22,
+    BlockOperation.Code.STREAM_BLOCK: 23,
+    VectorOperation.Code.VECTOR_ADD: 24,
+    VectorOperation.Code.VECTOR_SUB: 25,
+    VectorOperation.Code.VECTOR_MUL: 26,
+    VectorOperation.Code.VECTOR_DIV: 27,
+    VectorOperation.Code.VECTOR_MOD: 28,
+    VectorOperation.Code.VECTOR_COMPARE: 29,
+}
+
+# the layout of a field: its name and kind, number of a registry bit
+# (and of a mode bit) and number of an immediate. Operands are either
+# registries or values, addresses of vector operands are just numbers
+Layout = list[tuple[str, str, int, int]]
+
+
+def layout(cls: type) -> Layout:
+    """Places fields of an operation to registry bits and immediates"""
+    result: Layout = []
+    bit: int = 0
+    immediate: int = 0
+    hints: dict[str, Any] = get_type_hints(cls)
+    for field in fields(cls):
+        hint: Any = hints[field.name]
+        if field.name == "code":
+            continue
+        if hint is Registry:
+            result.append((field.name, "registry", bit, -1))
+            bit += 1
+        elif hint is int:
+            result.append((field.name, "int", -1, immediate))
+            immediate += 1
+        elif get_origin(hint) is UnionType:
+            kind: str = "value" if Value in get_args(hint) else "number"
+            result.append((field.name, kind, bit, immediate))
+            bit += 1
+            immediate += 1
+        else:
+            raise TypeError(f"Cannot encode {cls.__name__}.{field.name}")
+    if immediate > IMMEDIATES:
+        raise TypeError(f"Cannot encode {cls.__name__}: too many immediates")
+    return result
+
+
+LAYOUTS: dict[type, Layout] = {cls: layout(cls) for cls in get_args(Operation)}
+
+
+def check_word(value: int) -> int:
+    if not WORD_MIN_VALUE <= value <= WORD_MAX_VALUE:
+        raise ProgramError(f"{value} does not fit in a word")
+    return value
+
+
+def encode_operation(operation: OperationBase) -> bytes:
+    registries: int = 0
+    modes: int = 0
+    immediates: list[int] = [0] * IMMEDIATES
+    for name, kind, bit, immediate in LAYOUTS[type(operation)]:
+        value: Any = getattr(operation, name)
+        if isinstance(value, Registry):
+            registries |= REGISTRY_BITS[value.code] << bit
+        elif isinstance(value, Value):
+            modes |= 1 << bit
+            immediates[immediate] = check_word(value.value)
+        else:
+            if kind != "int":
+                modes |= 1 << bit
+            immediates[immediate] = check_word(value)
+    return INSTRUCTION.pack(
+        OPCODES[operation.code],  # type: ignore[index]
+        registries,
+        modes,
+        *immediates,
+    )
+
+
+def encode_program(program: Program) -> bytes:
+    """Converts a program to the binary format (see :py:func:`decode_program`)"""
+    parts: list[bytes] = [
+        HEADER.pack(MAGIC, FORMAT_VERSION, len(program.data), len(program.instructions))
+    ]
+    for segment in program.data:
+        parts.append(SEGMENT.pack(check_word(segment.address), len(segment.values)))
+        parts.append(struct.pack(f"<{len(segment.values)}i", *segment.values))
+    for index, operation in enumerate(program.instructions):
+        try:
+            parts.append(encode_operation(operation))
+        except ProgramError as e:
+            raise e.at(index).at("instructions")
+    return b"".join(parts)
+
+
+# creates an operation from a word: opcode, registries, modes and immediates
+Decoder = Callable[[tuple[int, ...]], OperationBase]
+
+
+def operation_decoder(cls: type, code: Enum) -> Decoder:
+    """Builds a function, that creates an operation from the fields of a word"""
+    field_layout: Layout = LAYOUTS[cls]
+
+    def decode(word: tuple[int, ...]) -> Any:
+        registries: int = word[1]
+        modes: int = word[2]
+        arguments: dict[str, Any] = {}
+        for name, kind, bit, immediate in field_layout:
+            if kind == "int":
+                arguments[name] = word[3 + immediate]
+            elif kind == "registry" or not modes >> bit & 1:
+                arguments[name] = BIT_REGISTRIES[registries >> bit & 1]
+            elif kind == "value":
+                arguments[name] = Value(value=word[3 + immediate])
+            else:
+                arguments[name] = word[3 + immediate]
+        return cls(code=code, **arguments)
+
+    return decode
+
+
+DECODERS: dict[int, Decoder] = {
+    OPCODES[code]: operation_decoder(cls, code)
+    for cls in get_args(Operation)
+    for code in get_type_hints(cls)["code"]
+}
+
+
+def decode_program(buffer: bytes | mmap.mmap) -> Program:
+    """Reads a program in the binary format from a buffer"""
+    if len(buffer) < HEADER.size:
+        raise ProgramError("the header is incomplete")
+    magic, version, segment_count, instruction_count = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ProgramError("not a binary program")
+    if version != FORMAT_VERSION:
+        raise ProgramError(
+            f"format version {version} is not supported (expected {FORMAT_VERSION})"
+        )
+
+    position: int = HEADER.size
+    data: list[DataSegment] = []
+    try:
+        for _ in range(segment_count):
+            address, length = SEGMENT.unpack_from(buffer, position)
+            position += SEGMENT.size
+            values = list(struct.unpack_from(f"<{length}i", buffer, position))
+            position += length * WORD.size
+            data.append(DataSegment(address=address, values=values))
+    except struct.error:
+        raise ProgramError("the data segment is incomplete")
+
+    end: int = position + instruction_count * INSTRUCTION.size
+    if len(buffer) != end:
+        raise ProgramError(
+            f"{instruction_count} instructions take {end - position} bytes, "
+            + f"but {len(buffer) - position} are left"
+        )
+    instructions: list[OperationBase] = []
+    # a view is not a copy, it is released before the mapped file is closed
+    section: memoryview = memoryview(buffer)[position:end]
+    try:
+        for index, word in enumerate(INSTRUCTION.iter_unpack(section)):
+            decode: Decoder | None = DECODERS.get(word[0])
+            if decode is None:
+                raise ProgramError(f"unknown opcode {word[0]}").at(index)
+            instructions.append(decode(word))
+    except ProgramError as e:
+        raise e.at("instructions")
+    finally:
+        section.release()
+    return Program(data=data, instructions=instructions)
+
+
+def load_program(path: Path) -> Program:
+    """
+    Loads a program in either format, binary ones are detected by the magic.
+    Binary files are memory-mapped instead of being read
+    """
+    with path.open("rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            f.seek(0)
+            try:
+                return parse_program(f.read().decode("utf-8"))
+            except UnicodeDecodeError:
+                raise ProgramError("neither a json, nor a binary program")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return decode_program(mapped)
+
+
+def save_program(program: Program, path: Path, program_format: ProgramFormat) -> None:
+    """Writes a program in the format, json is indented for reading"""
+    if program_format is ProgramFormat.BINARY:
+        path.write_bytes(encode_program(program))
+    else:
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(program.dump(), f, indent=2)
@@ -1,7 +1,12 @@
+from enum import Enum
+from pathlib import Path
+
 INPUT_ADDRESS: int = 1
 # A memory address, mapped to the input device
 OUTPUT_ADDRESS: int = 3
 # A memory address, mapped to the output device
+CORE_ID_ADDRESS: int = 5
+# A memory address, mapped to the read-only device with the number of the core
 
 IO_DEVICE_COUNT: int = 16
 
@@ -9,3 +14,25 @@ WORD_LENGTH: int = 32
 WORD_MAIN: int = 2 ** (WORD_LENGTH - 1)
 WORD_MAX_VALUE: int = WORD_MAIN - 1
 WORD_MIN_VALUE: int = -WORD_MAIN
+
+# defaults of the command line, kept here to not import the translator
+# and the executor before a command is chosen
+OPTIMIZATION_LEVELS: tuple[int, ...] = (0, 1, 2)
+DEFAULT_UNROLL_FACTOR: int = 4
+DEFAULT_UNROLL_BUDGET: int = 256
+DEFAULT_CORE_STACK_SIZE: int = 32
+DEFAULT_CACHE_LIMIT: int = 64  # megabytes
+
+
+class ProgramFormat(str, Enum):
+    JSON = "json"
+    BINARY = "binary"
+
+    @property
+    def suffix(self) -> str:
+        return ".curb" if self is ProgramFormat.BINARY else ".curp"
+
+    @classmethod
+    def of(cls, path: Path) -> "ProgramFormat":
+        """Format by the file extension, json for unknown ones"""
+        return cls.BINARY if path.suffix == cls.BINARY.suffix else cls.JSON
@@ -1,2 +1,23 @@
 class TranslationError(Exception):
     pass
+
+
+class ProgramError(Exception):
+    """Compiled program, that cannot be loaded. ``path`` points to the wrong value"""
+
+    def __init__(self, text: str, path: str = "") -> None:
+        self.text: str = text
+        self.path: str = path
+
+    def at(self, location: str | int) -> "ProgramError":
+        """Prepends a field name or a list index to the path"""
+        if isinstance(location, int):
+            self.path = f"[{location}]{self.path}"
+        else:
+            self.path = f".{location}{self.path}"
+        return self
+
+    def __str__(self) -> str:
+        if self.path:
+            return f"Invalid program at {self.path.lstrip('.')}: {self.text}"
+        return f"Invalid program: {self.text}"
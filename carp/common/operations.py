@@ -1,13 +1,18 @@
+from dataclasses import dataclass
 from enum import Enum
 from typing import Literal
 
-from pydantic import BaseModel
+# Operations are slotted dataclasses, so they are cheap to create and to execute.
+# They are validated and serialized with pydantic models,
+# derived from them in :py:mod:`common.serialization`
 
 
-class Operand(BaseModel):
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Operand:
     type: str  # noqa: A003 VNE003
 
 
+@dataclass(frozen=True, slots=True, kw_only=True)
 class Registry(Operand):
     class Code(str, Enum):
         ACCUMULATOR = "A"
@@ -21,15 +26,18 @@ RA: Registry = Registry(code=Registry.Code.ACCUMULATOR)
 RB: Registry = Registry(code=Registry.Code.BUFFER)
 
 
+@dataclass(frozen=True, slots=True, kw_only=True)
 class Value(Operand):
     type: Literal["value"] = "value"  # noqa: A003 VNE003
     value: int
 
 
-class OperationBase(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class OperationBase:
     code: str
 
 
+@dataclass(slots=True, kw_only=True)
 class BinaryOperation(OperationBase):
     class Code(str, Enum):
         MOVE_DATA = "mov"
@@ -55,6 +63,7 @@ OPERATOR_TO_CODE: dict[str, BinaryOperation.Code] = {
 }
 
 
+@dataclass(slots=True, kw_only=True)
 class StackOperation(OperationBase):
     class Code(str, Enum):
         GRAB = "grab"
@@ -64,16 +73,30 @@ class StackOperation(OperationBase):
     right: Registry = RA
 
 
+@dataclass(slots=True, kw_only=True)
 class JumpOperation(OperationBase):
     class Code(str, Enum):
         JUMP_ZERO = "jz"
         JUMP_NEGATIVE = "jn"
+        JUMP_NOT_ZERO = "jnz"
+        JUMP_NOT_NEGATIVE = "jnn"
         JUMP_BECAUSE = "jb"
 
     code: Code = Code.JUMP_BECAUSE
     offset: int = 1
 
 
+@dataclass(slots=True, kw_only=True)
+class SubroutineOperation(OperationBase):
+    class Code(str, Enum):
+        CALL = "call"
+        RETURN = "ret"
+
+    code: Code
+    offset: int = 0
+
+
+@dataclass(slots=True, kw_only=True)
 class MemoryOperation(OperationBase):
     class Code(str, Enum):
         LOAD_MEMORY = "load"
@@ -84,5 +107,87 @@ class MemoryOperation(OperationBase):
     address: int
 
 
-class Operation(BaseModel):
-    __root__: BinaryOperation | StackOperation | JumpOperation | MemoryOperation
+@dataclass(slots=True, kw_only=True)
+class IndexedMemoryOperation(OperationBase):
+    """
+    Memory access by the address, calculated during execution:
+    ``address`` (the base) plus the value of the ``index`` registry.
+    Base 0 gives the registry-indirect access
+    """
+
+    class Code(str, Enum):
+        LOAD_INDEXED = "loadi"
+        SAVE_INDEXED = "savei"
+
+    code: Code
+    right: Registry = RA
+    index: Registry = RB
+    address: int = 0
+
+
+@dataclass(slots=True, kw_only=True)
+class BlockOperation(OperationBase):
+    """
+    Operation over ``length`` cells of the data memory, done at once:
+    ``copy`` moves cells from ``source`` to ``address``, ``fill`` sets cells
+    from ``address`` to the value of the ``right`` registry and ``stream``
+    writes cells from ``source`` to the device at ``address``
+    """
+
+    class Code(str, Enum):
+        COPY_BLOCK = "copy"
+        FILL_BLOCK = "fill"
+        STREAM_BLOCK = "stream"
+
+    code: Code
+    right: Registry = RA
+    source: int = 0
+    address: int
+    length: int
+
+
+@dataclass(slots=True, kw_only=True)
+class VectorOperation(OperationBase):
+    """
+    Element-wise variant of a binary operation over ``length`` cells:
+    cells from ``address`` get results for cells from ``source`` (the left side)
+    and from ``operand``, which is either an address of a range
+    or a registry with the same right side for every cell.
+    ``vcmp`` gives the sign of the difference instead of flags
+    """
+
+    class Code(str, Enum):
+        VECTOR_ADD = "vadd"
+        VECTOR_SUB = "vsub"
+        VECTOR_MUL = "vmul"
+        VECTOR_DIV = "vdiv"
+        VECTOR_MOD = "vmod"
+        VECTOR_COMPARE = "vcmp"
+
+    code: Code
+    source: int
+    operand: int | Registry
+    address: int
+    length: int
+
+
+OPERATOR_TO_VECTOR_CODE: dict[str, VectorOperation.Code] = {
+    "+": VectorOperation.Code.VECTOR_ADD,
+    "-": VectorOperation.Code.VECTOR_SUB,
+    "*": VectorOperation.Code.VECTOR_MUL,
+    "/": VectorOperation.Code.VECTOR_DIV,
+    "%": VectorOperation.Code.VECTOR_MOD,
+    "<=>": VectorOperation.Code.VECTOR_COMPARE,
+}
+
+
+Operation = (
+    BinaryOperation
+    | StackOperation
+    | JumpOperation
+    | MemoryOperation
+    | IndexedMemoryOperation
+    | SubroutineOperation
+    | BlockOperation
+    | VectorOperation
+)
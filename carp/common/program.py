@@ -0,0 +1,54 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+from common.errors import ProgramError
+from common.operations import OperationBase
+from common.serialization import decoder, dump
+
+
+@dataclass(slots=True, kw_only=True)
+class DataSegment:
+    """Values, that are placed to the data memory from the address before start"""
+
+    address: int
+    values: list[int]
+
+
+@dataclass(slots=True, kw_only=True)
+class Program:
+    """
+    Compiled program: instructions with the initialized data memory.
+    Programs without data are stored as just a list of instructions
+    """
+
+    data: list[DataSegment] = field(default_factory=list)
+    instructions: list[OperationBase]
+
+    @property
+    def data_size(self) -> int:
+        return sum(len(segment.values) for segment in self.data)
+
+    def dump(self) -> Any:
+        """Converts to a json-compatible object (see :py:func:`parse_program`)"""
+        result: dict[str, Any] = dump(self)
+        if not self.data:
+            return result["instructions"]
+        return result
+
+
+def parse_program(raw: str) -> Program:
+    """
+    Parses a program from json, both with and without the data segment.
+    Raises :py:class:`ProgramError` with the path to the first wrong value
+    """
+    try:
+        data: Any = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ProgramError(f"not a json ({e})")
+    if isinstance(data, list):
+        try:
+            return Program(instructions=decoder(list[OperationBase])(data))
+        except ProgramError as e:
+            raise e.at("instructions")
+    return decoder(Program)(data)  # type: ignore[no-any-return]
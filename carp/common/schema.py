@@ -0,0 +1,55 @@
+from dataclasses import MISSING, fields, is_dataclass
+from types import UnionType
+from typing import Any, Union, get_args, get_origin, get_type_hints
+
+from pydantic import BaseModel, create_model
+
+from common.operations import Operation, OperationBase
+
+# pydantic models to describe files with (see ``generate-schema``).
+# Models are derived from the dataclasses, so both always have the same fields
+
+_models: dict[type, type[BaseModel]] = {}
+
+
+def model_type(hint: Any) -> Any:
+    """
+    Replaces dataclasses in a type hint with their models.
+    Fields with any operation are validated as one of the operations
+    """
+    if hint is OperationBase:
+        hint = Operation
+    if isinstance(hint, type) and is_dataclass(hint):
+        return model_of(hint)
+    origin: Any = get_origin(hint)
+    if origin is UnionType or origin is Union:
+        return Union[tuple(model_type(arg) for arg in get_args(hint))]
+    if origin is list:
+        return list[model_type(get_args(hint)[0])]  # type: ignore[index,misc]
+    return hint
+
+
+def model_of(cls: type) -> type[BaseModel]:
+    """pydantic model with the same name, fields and defaults as the dataclass"""
+    model: type[BaseModel] | None = _models.get(cls)
+    if model is None:
+        hints: dict[str, Any] = get_type_hints(cls)
+        definitions: dict[str, Any] = {}
+        for field in fields(cls):
+            default: Any = ...
+            if field.default is not MISSING:
+                default = field.default
+            elif field.default_factory is not MISSING:
+                default = field.default_factory()
+            definitions[field.name] = (model_type(hints[field.name]), default)
+        model = create_model(cls.__name__, **definitions)
+        doc: str = cls.__doc__ or ""
+        if not doc.startswith(cls.__name__ + "("):  # a signature from dataclass
+            model.__doc__ = doc
+        _models[cls] = model
+    return model
+
+
+OperationModel: type[BaseModel] = create_model(
+    "Operation", __root__=(model_type(Operation), ...)
+)
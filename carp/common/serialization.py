@@ -0,0 +1,221 @@
+from collections.abc import Callable
+from dataclasses import MISSING, fields, is_dataclass
+from enum import Enum
+from types import UnionType
+from typing import Any, Literal, Union, get_args, get_origin, get_type_hints
+
+from common.errors import ProgramError
+from common.operations import Operation, OperationBase
+
+# Internal structures (operations, programs, logs) are slotted dataclasses.
+# They are converted to json-compatible objects and back without pydantic,
+# so loading programs does not depend on it (see :py:mod:`common.schema`)
+
+# converts a json-compatible value to the field type or raises ProgramError
+Decoder = Callable[[Any], Any]
+_decoders: dict[Any, Decoder] = {}
+# shared instances of a frozen dataclass, kept by long-lived processes as well
+SHARED_INSTANCES_LIMIT: int = 4096
+
+
+def dump(value: Any) -> Any:
+    """Converts dataclasses to json-compatible dicts, in the order of fields"""
+    if is_dataclass(value) and not isinstance(value, type):
+        return {field.name: dump(getattr(value, field.name)) for field in fields(value)}
+    if isinstance(value, list):
+        return [dump(item) for item in value]
+    return value
+
+
+def describe(hint: Any) -> str:
+    """Name of the expected type for error messages"""
+    if hint is int:
+        return "an integer"
+    if isinstance(hint, type) and issubclass(hint, Enum):
+        return "one of " + ", ".join(repr(member.value) for member in hint)
+    if isinstance(hint, type) and is_dataclass(hint):
+        kind: Any = get_type_hints(hint).get("type")
+        return f"a {get_args(kind)[0]}" if kind else f"a {hint.__name__}"
+    return " or ".join(describe(arg) for arg in get_args(hint))
+
+
+def decode_int(value: Any) -> int:
+    if type(value) is not int:
+        raise ProgramError(f"an integer was expected, got {value!r}")
+    return value
+
+
+def enum_decoder(hint: type[Enum]) -> Decoder:
+    members: dict[Any, Enum] = {member.value: member for member in hint}
+
+    def decode(value: Any) -> Enum:
+        try:
+            return members[value]
+        except (KeyError, TypeError):
+            raise ProgramError(f"{describe(hint)} was expected, got {value!r}")
+
+    return decode
+
+
+def literal_decoder(expected: Any) -> Decoder:
+    def decode(value: Any) -> Any:
+        if value != expected:
+            raise ProgramError(f"{expected!r} was expected, got {value!r}")
+        return value
+
+    return decode
+
+
+def list_decoder(item_hint: Any) -> Decoder:
+    decode_item: Decoder = decoder(item_hint)
+
+    def decode(value: Any) -> list[Any]:
+        if not isinstance(value, list):
+            raise ProgramError(f"a list was expected, got {value!r}")
+        result: list[Any] = []
+        for index, item in enumerate(value):
+            try:
+                result.append(decode_item(item))
+            except ProgramError as e:
+                raise e.at(index)
+        return result
+
+    return decode
+
+
+def dataclass_decoder(cls: type) -> Decoder:
+    """
+    Checks, that all fields are known and required ones are given.
+    Frozen dataclasses (operands) are shared between equal decoded values,
+    up to :py:data:`SHARED_INSTANCES_LIMIT` of them
+    """
+    hints: dict[str, Any] = get_type_hints(cls)
+    decoders: dict[str, Decoder] = {}
+    required: list[str] = []
+    for field in fields(cls):
+        decoders[field.name] = decoder(hints[field.name])
+        if field.default is MISSING and field.default_factory is MISSING:
+            required.append(field.name)
+    frozen: bool = cls.__dataclass_params__.frozen  # type: ignore[attr-defined]
+    instances: dict[tuple[Any, ...], Any] = {}
+
+    def decode(value: Any) -> Any:
+        if not isinstance(value, dict):
+            raise ProgramError(f"{describe(cls)} was expected, got {value!r}")
+        arguments: dict[str, Any] = {}
+        for name, item in value.items():
+            field_decoder: Decoder | None = decoders.get(name)
+            if field_decoder is None:
+                raise ProgramError("unknown field").at(name)
+            try:
+                arguments[name] = field_decoder(item)
+            except ProgramError as e:
+                raise e.at(name)
+        for name in required:
+            if name not in arguments:
+                raise ProgramError("missing field").at(name)
+        if not frozen:
+            return cls(**arguments)
+        key: tuple[Any, ...] = tuple(arguments.items())
+        result: Any = instances.get(key)
+        if result is None:
+            result = cls(**arguments)
+            if len(instances) < SHARED_INSTANCES_LIMIT:
+                instances[key] = result
+        return result
+
+    return decode
+
+
+def union_decoder(hint: Any) -> Decoder:
+    """
+    Picks a member without trying each one: integers by the type
+    and dataclasses by their literal ``type`` field
+    """
+    by_type: dict[Any, Decoder] = {}
+    decode_integer: Decoder | None = None
+    for arg in get_args(hint):
+        if arg is int:
+            decode_integer = decode_int
+        else:
+            by_type[get_type_hints(arg)["type"].__args__[0]] = decoder(arg)
+
+    def decode(value: Any) -> Any:
+        if type(value) is int and decode_integer is not None:
+            return decode_integer(value)
+        if isinstance(value, dict):
+            member: Decoder | None = by_type.get(value.get("type"))
+            if member is not None:
+                return member(value)
+        raise ProgramError(f"{describe(hint)} was expected, got {value!r}")
+
+    return decode
+
+
+def operation_decoder() -> Decoder:
+    """
+    Dispatches operations on the ``code`` field straight to their classes.
+    Operations without a code are jumps, as ``jb`` is the default
+    """
+    by_code: dict[Any, Decoder] = {}
+    default: Decoder | None = None
+    for cls in get_args(Operation):
+        code: Any = get_type_hints(cls)["code"]
+        by_code.update({member.value: decoder(cls) for member in code})
+        if cls.__dataclass_fields__["code"].default is not MISSING:
+            default = decoder(cls)
+    codes: str = ", ".join(repr(code) for code in by_code)
+
+    def decode(value: Any) -> OperationBase:
+        if not isinstance(value, dict):
+            raise ProgramError(f"an operation was expected, got {value!r}")
+        code: Any = value.get("code")
+        try:
+            operation: Decoder | None = by_code.get(code)
+        except TypeError:
+            operation = None
+        if operation is None:
+            if "code" not in value and default is not None:
+                return default(value)  # type: ignore[no-any-return]
+            raise ProgramError(f"one of {codes} was expected, got {code!r}").at("code")
+        return operation(value)  # type: ignore[no-any-return]
+
+    return decode
+
+
+def decoder(hint: Any) -> Decoder:
+    """
+    Builds (once for each type) a function, that converts values from json
+    to the type in a hint. Unlike pydantic unions, operations are dispatched
+    on their code, so loading is linear and errors are precise
+    """
+    if hint is OperationBase or hint == Operation:
+        hint = OperationBase
+    result: Decoder | None = _decoders.get(hint)
+    if result is not None:
+        return result
+
+    origin: Any = get_origin(hint)
+    if hint is OperationBase:
+        result = operation_decoder()
+    elif hint is int:
+        result = decode_int
+    elif isinstance(hint, type) and issubclass(hint, Enum):
+        result = enum_decoder(hint)
+    elif isinstance(hint, type) and is_dataclass(hint):
+        result = dataclass_decoder(hint)
+    elif origin is Literal:
+        result = literal_decoder(get_args(hint)[0])
+    elif origin is list:
+        result = list_decoder(get_args(hint)[0])
+    elif origin is UnionType or origin is Union:
+        result = union_decoder(hint)
+    else:
+        raise TypeError(f"Cannot decode {hint}")
+    _decoders[hint] = result
+    return result
+
+
+def parse_operation(data: Any) -> OperationBase:
+    """Converts a json-compatible object to an operation"""
+    return decoder(OperationBase)(data)  # type: ignore[no-any-return]
@@ -37,13 +37,37 @@ class ALU:
         self.zero: bool = True
         self.negative: bool = False
 
+    @staticmethod
+    def wrap(value: int) -> int:
+        """Brings the value back to the machine word"""
+        if value > WORD_MAX_VALUE:
+            return value % (WORD_MAX_VALUE + 1)
+        if value < WORD_MIN_VALUE:
+            return value % WORD_MIN_VALUE
+        return value
+
+    @staticmethod
+    def sign(value: int) -> int:
+        """Flags of the value as a number: -1 (negative), 0 (zero) or 1"""
+        return (value > 0) - (value < 0)
+
     def execute(self, operation: ALUOperation, flags: bool = True) -> None:
-        self.result = self.operations[operation](self.left, self.right)
-        if self.result > WORD_MAX_VALUE:
-            self.result %= WORD_MAX_VALUE + 1
-        elif self.result < WORD_MIN_VALUE:
-            self.result %= WORD_MIN_VALUE
+        self.result = self.wrap(self.operations[operation](self.left, self.right))
 
         if flags:
             self.zero = self.result == 0
             self.negative = self.result < 0
+
+    def execute_vector(
+        self, operation: ALUOperation, left: list[int], right: list[int]
+    ) -> list[int]:
+        """
+        Element-wise variant of :py:meth:`execute` for whole ranges at once,
+        flags are not changed. Arithmetic runs without Python-level calls
+        per element; results are wrapped the same way, but only when
+        the range bounds show, that some of them left the machine word
+        """
+        results: list[int] = list(map(self.operations[operation], left, right))
+        if results and (max(results) > WORD_MAX_VALUE or min(results) < WORD_MIN_VALUE):
+            return list(map(self.wrap, results))
+        return results
@@ -0,0 +1,160 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+
+
+class Replacement(str, Enum):
+    LRU = "lru"
+    FIFO = "fifo"
+
+
+class WritePolicy(str, Enum):
+    WRITE_BACK = "write-back"
+    WRITE_THROUGH = "write-through"
+
+
+class Region(str, Enum):
+    """Parts of the data memory, that are counted separately"""
+
+    VARIABLES = "variables"
+    STACK = "stack"
+    IO = "io"
+
+
+@dataclass(slots=True, kw_only=True)
+class CacheConfig:
+    """Sizes are in machine words, ``size`` should be divisible by a set size"""
+
+    size: int = 64
+    line_size: int = 4
+    associativity: int = 2
+    replacement: Replacement = Replacement.LRU
+    write_policy: WritePolicy = WritePolicy.WRITE_BACK
+
+    def __post_init__(self) -> None:
+        self.replacement = Replacement(self.replacement)
+        self.write_policy = WritePolicy(self.write_policy)
+        set_size: int = self.line_size * self.associativity
+        if set_size < 1 or self.size < set_size or self.size % set_size:
+            raise ValueError("Cache size should be divisible by line size * ways")
+
+    @property
+    def set_count(self) -> int:
+        return self.size // (self.line_size * self.associativity)
+
+
+@dataclass(slots=True, kw_only=True)
+class RegionStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        accesses: int = self.hits + self.misses
+        return self.hits / accesses if accesses else 0.0
+
+
+@dataclass(slots=True, kw_only=True)
+class CacheStats:
+    regions: dict[Region, RegionStats] = field(
+        default_factory=lambda: {region: RegionStats() for region in Region}
+    )
+    write_backs: int = 0
+    memory_writes: int = 0
+
+    def __str__(self) -> str:
+        lines: list[str] = [
+            f"{region.value}: {stats.hits} hits, {stats.misses} misses "
+            + f"({stats.hit_rate:.1%} hit rate), {stats.evictions} evictions"
+            for region, stats in self.regions.items()
+        ]
+        lines.append(
+            f"{self.write_backs} write-backs, "
+            + f"{self.memory_writes} words written to the memory"
+        )
+        return "\n".join(lines)
+
+
+class Cache:
+    """
+    Model of a set-associative data cache. Only tags are kept, as the data
+    itself stays in :py:attr:`DataPath.data_memory`. Each set is an ordered
+    dict from the tag to the dirty bit: hits move lines to the end for LRU,
+    so the first line is always the one to replace.
+
+    Write-back caches allocate lines on writes and write dirty lines back
+    on eviction, write-through ones write every word and don't allocate.
+    Devices are never cached, so every I/O access is a miss
+    """
+
+    def __init__(self, config: CacheConfig) -> None:
+        self.config: CacheConfig = config
+        self.sets: list[OrderedDict[int, bool]] = [
+            OrderedDict() for _ in range(config.set_count)
+        ]
+        self.stats: CacheStats = CacheStats()
+
+    def access_line(self, line: int, write: bool, region: Region) -> bool:
+        """Accesses a word in the line, returns if it was a hit"""
+        stats: RegionStats = self.stats.regions[region]
+        if region is Region.IO:
+            stats.misses += 1
+            return False
+
+        write_back: bool = self.config.write_policy is WritePolicy.WRITE_BACK
+        if write and not write_back:
+            self.stats.memory_writes += 1
+
+        lines: OrderedDict[int, bool] = self.sets[line % len(self.sets)]
+        dirty: bool | None = lines.get(line)
+        if dirty is not None:
+            stats.hits += 1
+            if self.config.replacement is Replacement.LRU:
+                lines.move_to_end(line)
+            if write and write_back:
+                lines[line] = True
+            return True
+
+        stats.misses += 1
+        if write and not write_back:
+            return False
+        if len(lines) >= self.config.associativity:
+            _, evicted_dirty = lines.popitem(last=False)
+            stats.evictions += 1
+            if evicted_dirty:
+                self.stats.write_backs += 1
+                self.stats.memory_writes += self.config.line_size
+        lines[line] = write
+        return False
+
+    def access(self, address: int, write: bool, region: Region) -> None:
+        self.access_line(address // self.config.line_size, write, region)
+
+    def access_range(
+        self, start: int, length: int, write: bool, region: Region
+    ) -> None:
+        """
+        Accesses ``length`` words one after another. Only the first word
+        of each line can miss, so the rest are counted without lookups
+        """
+        if region is Region.IO:
+            self.stats.regions[region].misses += length
+            return
+        line_size: int = self.config.line_size
+        allocating: bool = not write or (
+            self.config.write_policy is WritePolicy.WRITE_BACK
+        )
+        address: int = start
+        end: int = start + length
+        while address < end:
+            line: int = address // line_size
+            rest: int = min(end, (line + 1) * line_size) - address - 1
+            hit: bool = self.access_line(line, write, region)
+            if not allocating:
+                self.stats.memory_writes += rest
+            if hit or allocating:
+                self.stats.regions[region].hits += rest
+            else:
+                self.stats.regions[region].misses += rest
+            address += rest + 1
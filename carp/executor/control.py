@@ -1,28 +1,91 @@
 from common.operations import (
     BinaryOperation,
+    BlockOperation,
+    IndexedMemoryOperation,
     Registry,
     Value,
     StackOperation,
     JumpOperation,
     MemoryOperation,
     OperationBase,
+    SubroutineOperation,
+    VectorOperation,
 )
 from executor.alu import ALUOperation
+from executor.counters import cycle_cost
 from executor.logs import LogRecord
+from executor.pipeline import PipelineModel
+from executor.prediction import BranchPredictor
 from executor.wiring import DataPath
 
+COMPARE_CODES: frozenset[BinaryOperation.Code] = frozenset(
+    (BinaryOperation.Code.COMPARE, BinaryOperation.Code.COMPARE_REVERSE)
+)
+
+
+FusedGroup = tuple[BinaryOperation, list[JumpOperation]]
+
+
+def find_fused_groups(operations: list[OperationBase]) -> dict[int, FusedGroup]:
+    """
+    Finds compare-and-branch groups: ``cmp`` or ``pmc``, followed by
+    a conditional jump and, optionally, by ``jb`` (which is only reached
+    if the branch isn't taken). Returns groups by their starts
+    """
+    result: dict[int, FusedGroup] = {}
+    for index, operation in enumerate(operations[:-1]):
+        compare, branch = operation, operations[index + 1]
+        if (
+            not isinstance(compare, BinaryOperation)
+            or compare.code not in COMPARE_CODES
+            or not isinstance(branch, JumpOperation)
+            or branch.code is JumpOperation.Code.JUMP_BECAUSE
+        ):
+            continue
+        jumps: list[JumpOperation] = [branch]
+        if index + 2 < len(operations):
+            jump = operations[index + 2]
+            if (
+                isinstance(jump, JumpOperation)
+                and jump.code is JumpOperation.Code.JUMP_BECAUSE
+            ):
+                jumps.append(jump)
+        result[index] = (compare, jumps)
+    return result
+
 
 class ControlUnit:
     """
     The main controller of the simulated system.
     Works on top of :py:class:`DataPath` and performs all its operations against it.
     Executes just one program by simulating all CPU cycles, implemented as methods.
+
+    With ``fusion`` enabled, compare-and-branch groups are found at load time
+    (see :py:func:`find_fused_groups`) and each is executed in one dispatch.
+    State, performance counters and logs after each instruction stay the same.
+    Without ``logging`` states are not recorded, unless :py:meth:`save_state`
+    is called directly. Retired instructions are also passed to the ``pipeline``
+    timing model and conditional jumps to the branch ``predictor`` if given
     """
 
-    def __init__(self, data_path: DataPath) -> None:
+    def __init__(
+        self,
+        data_path: DataPath,
+        fusion: bool = True,
+        logging: bool = True,
+        pipeline: PipelineModel | None = None,
+        predictor: BranchPredictor | None = None,
+    ) -> None:
         self.data_path: DataPath = data_path
         self.log: list[LogRecord] = []
+        self.logging: bool = logging
+        self.pipeline: PipelineModel | None = pipeline
+        self.predictor: BranchPredictor | None = predictor
+        self.instruction_address: int = 0
         self.finished: bool = False
+        self.fused: dict[int, FusedGroup] = (
+            find_fused_groups(data_path.instruction_memory) if fusion else {}
+        )
 
     def fetch_instruction(self) -> None:
         """
@@ -30,6 +93,7 @@ class ControlUnit:
         If there are no more instructions, program is marked as finished.
         """
         if not self.finished and self.data_path.read_command():
+            self.instruction_address = self.data_path.instruction_pointer
             self.data_path.instruction_pointer += 1
         else:
             self.finished = True
@@ -43,6 +107,15 @@ class ControlUnit:
         BinaryOperation.Code.MATH_MOD: ALUOperation.MOD,
     }
 
+    VECTOR_TO_ALU = {
+        VectorOperation.Code.VECTOR_ADD: ALUOperation.ADD,
+        VectorOperation.Code.VECTOR_SUB: ALUOperation.SUB,
+        VectorOperation.Code.VECTOR_MUL: ALUOperation.MUL,
+        VectorOperation.Code.VECTOR_DIV: ALUOperation.DIV,
+        VectorOperation.Code.VECTOR_MOD: ALUOperation.MOD,
+        VectorOperation.Code.VECTOR_COMPARE: ALUOperation.SUB,
+    }
+
     def execute_binary_operation(self, operation: BinaryOperation) -> None:
         source: int
         if isinstance(operation.left, Registry):
@@ -73,19 +146,27 @@ class ControlUnit:
             )
 
     def execute_jump_operation(self, operation: JumpOperation) -> None:
-        no_jump: bool = (
-            operation.code is JumpOperation.Code.JUMP_ZERO
-            and not self.data_path.alu.zero
-            or operation.code is JumpOperation.Code.JUMP_NEGATIVE
-            and not self.data_path.alu.negative
-        )
-        if no_jump:
-            return
+        zero: bool = self.data_path.alu.zero
+        negative: bool = self.data_path.alu.negative
+        no_jump: bool = {
+            JumpOperation.Code.JUMP_ZERO: not zero,
+            JumpOperation.Code.JUMP_NEGATIVE: not negative,
+            JumpOperation.Code.JUMP_NOT_ZERO: zero,
+            JumpOperation.Code.JUMP_NOT_NEGATIVE: negative,
+        }.get(operation.code, False)
+        if (
+            self.predictor is not None
+            and operation.code is not JumpOperation.Code.JUMP_BECAUSE
+        ):
+            self.predictor.record(self.instruction_address, operation, not no_jump)
+        if not no_jump:
+            self.move_instruction_pointer(operation.offset)
 
+    def move_instruction_pointer(self, offset: int) -> None:
         self.data_path.instruction_pointer = self.data_path.alu_execute(
             operation=ALUOperation.ADD,
             left=self.data_path.instruction_pointer,
-            right=operation.offset,
+            right=offset,
             flags=False,
         )
 
@@ -98,17 +179,25 @@ class ControlUnit:
         if self.data_path.command_data is None:
             return
 
-        operation: OperationBase = self.data_path.command_data.__root__
+        operation: OperationBase = self.data_path.command_data
         if isinstance(operation, BinaryOperation):
             self.execute_binary_operation(operation)
         elif isinstance(operation, JumpOperation):
             self.execute_jump_operation(operation)
-        elif isinstance(operation, MemoryOperation):
+        elif isinstance(operation, MemoryOperation | BlockOperation | VectorOperation):
             self.data_path.memory_pointer = operation.address
-        elif isinstance(operation, StackOperation):
+        elif isinstance(operation, IndexedMemoryOperation):
+            self.data_path.memory_pointer = self.data_path.alu_execute(
+                operation=ALUOperation.ADD,
+                left=operation.address,
+                right=self.data_path.general_registries[operation.index.code],
+                flags=False,
+            )
+        elif isinstance(operation, StackOperation | SubroutineOperation):
             self.data_path.stack_pointer = self.data_path.alu_execute(
                 operation=ALUOperation.SUB
-                if operation.code is StackOperation.Code.PUSH
+                if operation.code
+                in (StackOperation.Code.PUSH, SubroutineOperation.Code.CALL)
                 else ALUOperation.ADD,
                 left=self.data_path.stack_pointer,
                 right=1,
@@ -120,22 +209,106 @@ class ControlUnit:
         Acts on the memory if the current operation requires this step.
         Operation is grabbed from the command_data registry.
         Addresses in required registries should be prepared during previous stages.
-        No calculations are performed and this stage.
+        No calculations are performed and this stage, except for calls,
+        which jump only after the return address is saved.
         """
         if self.data_path.command_data is None:
             return
 
-        operation: OperationBase = self.data_path.command_data.__root__
+        operation: OperationBase = self.data_path.command_data
         if isinstance(operation, MemoryOperation):
             if operation.code is MemoryOperation.Code.LOAD_MEMORY:
                 self.data_path.memory_read(operation.right.code)
             elif operation.code is MemoryOperation.Code.SAVE_MEMORY:
                 self.data_path.memory_write(operation.right.code)
+        elif isinstance(operation, IndexedMemoryOperation):
+            if operation.code is IndexedMemoryOperation.Code.LOAD_INDEXED:
+                self.data_path.memory_read(operation.right.code)
+            elif operation.code is IndexedMemoryOperation.Code.SAVE_INDEXED:
+                self.data_path.memory_write(operation.right.code)
         elif isinstance(operation, StackOperation):
             if operation.code is StackOperation.Code.PUSH:
                 self.data_path.memory_write(operation.right.code, stack=True)
             elif operation.code is StackOperation.Code.GRAB:
                 self.data_path.memory_read(operation.right.code, stack=True)
+        elif isinstance(operation, SubroutineOperation):
+            if operation.code is SubroutineOperation.Code.CALL:
+                self.data_path.write_return_address()
+                self.move_instruction_pointer(operation.offset)
+            elif operation.code is SubroutineOperation.Code.RETURN:
+                self.data_path.read_return_address()
+        elif isinstance(operation, BlockOperation):
+            self.block_fetch(operation)
+        elif isinstance(operation, VectorOperation):
+            self.vector_fetch(operation)
+
+    def block_fetch(self, operation: BlockOperation) -> None:
+        """Block operations are done by the DataPath at once, not cell by cell"""
+        if operation.code is BlockOperation.Code.COPY_BLOCK:
+            self.data_path.block_copy(
+                operation.source, operation.address, operation.length
+            )
+        elif operation.code is BlockOperation.Code.FILL_BLOCK:
+            self.data_path.block_fill(
+                operation.address, operation.length, operation.right.code
+            )
+        elif operation.code is BlockOperation.Code.STREAM_BLOCK:
+            self.data_path.block_output(
+                operation.source, operation.length, operation.address
+            )
+
+    def vector_fetch(self, operation: VectorOperation) -> None:
+        """
+        Vector operations go through the ALU as a whole, results are written
+        right away, as every range is read before any of them is changed
+        """
+        self.data_path.vector_execute(
+            operation=self.VECTOR_TO_ALU[operation.code],
+            destination=operation.address,
+            source=operation.source,
+            operand=operation.operand.code
+            if isinstance(operation.operand, Registry)
+            else operation.operand,
+            length=operation.length,
+            sign=operation.code is VectorOperation.Code.VECTOR_COMPARE,
+        )
+
+    def count_cycles(self) -> None:
+        """Updates performance counters after the current operation is done"""
+        if self.data_path.command_data is None:
+            return
+        self.data_path.counters.instructions += 1
+        self.data_path.counters.cycles += cycle_cost(self.data_path.command_data)
+
+    def execute_fused(self, start: int, group: FusedGroup) -> None:
+        """
+        Executes a compare-and-branch group, the compare is already fetched.
+        Jumps are fetched right here, the group is left as soon as
+        the instruction pointer goes outside it
+        """
+        compare, jumps = group
+        self.execute_binary_operation(compare)
+        self.retire_instruction()
+
+        for index, jump in enumerate(jumps, start=start + 1):
+            if self.data_path.instruction_pointer != index:
+                return
+            self.data_path.command_data = self.data_path.instruction_memory[index]
+            self.instruction_address = index
+            self.data_path.instruction_pointer += 1
+            self.execute_jump_operation(jump)
+            self.retire_instruction()
+
+    def retire_instruction(self) -> None:
+        self.count_cycles()
+        if self.pipeline is not None and self.data_path.command_data is not None:
+            self.pipeline.retire(
+                self.data_path.command_data,
+                taken=self.data_path.instruction_pointer
+                != self.instruction_address + 1,
+            )
+        if self.logging:
+            self.save_state()
 
     def save_state(self) -> None:
         """
@@ -144,15 +317,32 @@ class ControlUnit:
         """
         self.log.append(self.data_path.record_state())
 
+    def start(self) -> None:
+        """Records the initial state and fetches the first instruction"""
+        if self.logging:
+            self.save_state()
+        self.fetch_instruction()
+
+    def step(self) -> None:
+        """
+        Executes the fetched instruction (or a fused group) and fetches
+        the next one. Should be called only until the program is finished
+        """
+        start: int = self.data_path.instruction_pointer - 1
+        group: FusedGroup | None = self.fused.get(start)
+        if group is None:
+            self.execute_instruction()
+            self.memory_fetch()
+            self.retire_instruction()
+        else:
+            self.execute_fused(start, group)
+        self.fetch_instruction()
+
     def main(self) -> None:
         """
         Executes the program, while the fetch_instruction cycle won't declare
         the program as done (happens, when there are no more instructions)
         """
-        self.save_state()
-        self.fetch_instruction()
+        self.start()
         while not self.finished:
-            self.execute_instruction()
-            self.memory_fetch()
-            self.save_state()
-            self.fetch_instruction()
+            self.step()
@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+
+from common.operations import BlockOperation, OperationBase, VectorOperation
+
+# cycles per each cell of a block: one for every memory access
+BLOCK_CELL_CYCLES: dict[BlockOperation.Code, int] = {
+    BlockOperation.Code.COPY_BLOCK: 2,
+    BlockOperation.Code.FILL_BLOCK: 1,
+    BlockOperation.Code.STREAM_BLOCK: 2,
+}
+
+
+def cycle_cost(operation: OperationBase) -> int:
+    """
+    Cycles, that the operation takes on the simulated processor. Every instruction
+    takes one cycle, block and vector operations also take a cycle for each
+    memory access, though the simulator performs them at once
+    """
+    if isinstance(operation, BlockOperation):
+        return 1 + BLOCK_CELL_CYCLES[operation.code] * operation.length
+    if isinstance(operation, VectorOperation):
+        # the right side is read from memory only if it is a range
+        accesses: int = 2 if isinstance(operation.operand, int) else 1
+        return 1 + (accesses + 1) * operation.length
+    return 1
+
+
+@dataclass(slots=True, kw_only=True)
+class PerformanceCounters:
+    """Counters of the executed program, collected by :py:class:`DataPath`"""
+
+    instructions: int = 0
+    cycles: int = 0
+    memory_reads: int = 0
+    memory_writes: int = 0
+
+    @property
+    def cycles_per_instruction(self) -> float:
+        return self.cycles / self.instructions if self.instructions else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.instructions} instructions, {self.cycles} cycles "
+            + f"(CPI {self.cycles_per_instruction:.2f}), "
+            + f"{self.memory_reads} memory reads, {self.memory_writes} memory writes"
+        )
@@ -1,23 +1,26 @@
-from pydantic import BaseModel
+from dataclasses import dataclass
 
-from common.operations import Operation
+from common.operations import OperationBase
 
 
-class RegistriesRecord(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class RegistriesRecord:
     accumulator: int
     buffer: int
     memory_pointer: int
     stack_pointer: int
     instruction_pointer: int
-    command_data: Operation | None
+    command_data: OperationBase | None
 
 
-class FlagsRecord(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class FlagsRecord:
     zero: bool
     negative: bool
 
 
-class LogRecord(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class LogRecord:
     registries: RegistriesRecord
     flags: FlagsRecord
     input_data: int | None = None
@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+
+from common.constants import DEFAULT_CORE_STACK_SIZE
+from common.operations import OperationBase
+from common.program import DataSegment
+from executor.control import ControlUnit
+from executor.counters import PerformanceCounters
+from executor.wiring import DataPath
+
+
+@dataclass(slots=True, kw_only=True)
+class MultiCoreStats:
+    cores: list[PerformanceCounters]
+
+    @property
+    def elapsed_cycles(self) -> int:
+        """Cores work in parallel, so the run takes as long as the slowest core"""
+        return max((counters.cycles for counters in self.cores), default=0)
+
+    @property
+    def total_cycles(self) -> int:
+        return sum(counters.cycles for counters in self.cores)
+
+    def __str__(self) -> str:
+        lines: list[str] = [
+            f"core {core_id}: {counters}" for core_id, counters in enumerate(self.cores)
+        ]
+        speedup: float = (
+            self.total_cycles / self.elapsed_cycles if self.elapsed_cycles else 0.0
+        )
+        lines.append(
+            f"{self.elapsed_cycles} cycles elapsed, {self.total_cycles} in total "
+            + f"(x{speedup:.2f} parallel speedup)"
+        )
+        return "\n".join(lines)
+
+
+class MultiCore:
+    """
+    Several cores with their own registries and instruction pointers,
+    that share the data memory and devices. Each core is a :py:class:`DataPath`
+    with a :py:class:`ControlUnit`, the memory list and devices of the first one
+    are given to the rest. Cores start at their entry points and have stacks
+    of ``stack_size`` cells, one under another, from the end of the memory.
+
+    Cores are interleaved by a deterministic round-robin scheduler: every core,
+    that is not finished, executes ``quantum`` instructions in its turn.
+    Fusion is disabled, so quanta are exact
+    """
+
+    def __init__(
+        self,
+        data_memory_size: int,
+        instruction_memory: list[OperationBase],
+        input_data: list[int],
+        entry_points: list[int],
+        quantum: int = 1,
+        stack_size: int = DEFAULT_CORE_STACK_SIZE,
+        logging: bool = False,
+    ) -> None:
+        if not entry_points:
+            raise ValueError("At least one core is required")
+        if quantum < 1:
+            raise ValueError("Quantum should be positive")
+        self.quantum: int = quantum
+        self.controls: list[ControlUnit] = []
+        for core_id, entry_point in enumerate(entry_points):
+            data_path = DataPath(
+                data_memory_size=data_memory_size,
+                instruction_memory=instruction_memory,
+                input_data=input_data,
+                core_id=core_id,
+            )
+            if self.controls:
+                shared: DataPath = self.controls[0].data_path
+                data_path.data_memory = shared.data_memory
+                data_path.io = shared.io
+            data_path.stack_pointer = data_memory_size - core_id * stack_size
+            data_path.instruction_pointer = entry_point
+            self.controls.append(ControlUnit(data_path, fusion=False, logging=logging))
+
+    @property
+    def data_paths(self) -> list[DataPath]:
+        return [control.data_path for control in self.controls]
+
+    @property
+    def stats(self) -> MultiCoreStats:
+        return MultiCoreStats(cores=[dp.counters for dp in self.data_paths])
+
+    def load_data(self, segments: list[DataSegment]) -> None:
+        self.controls[0].data_path.load_data(segments)
+
+    def get_output(self) -> list[int]:
+        return self.controls[0].data_path.get_output()
+
+    def main(self) -> None:
+        for control in self.controls:
+            control.start()
+
+        running: list[ControlUnit] = [c for c in self.controls if not c.finished]
+        while running:
+            for control in running:
+                for _ in range(self.quantum):
+                    control.step()
+                    if control.finished:
+                        break
+            running = [control for control in running if not control.finished]
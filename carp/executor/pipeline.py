@@ -0,0 +1,139 @@
+from dataclasses import dataclass
+from enum import Enum
+
+from common.operations import (
+    BinaryOperation,
+    BlockOperation,
+    IndexedMemoryOperation,
+    JumpOperation,
+    MemoryOperation,
+    OperationBase,
+    Registry,
+    StackOperation,
+    SubroutineOperation,
+    VectorOperation,
+)
+from executor.counters import cycle_cost
+
+
+class Resource(str, Enum):
+    """Parts of the state, that instructions can depend on"""
+
+    ACCUMULATOR = Registry.Code.ACCUMULATOR.value
+    BUFFER = Registry.Code.BUFFER.value
+    FLAGS = "flags"
+
+
+LOADING_CODES: frozenset[str] = frozenset(
+    (
+        MemoryOperation.Code.LOAD_MEMORY,
+        IndexedMemoryOperation.Code.LOAD_INDEXED,
+        StackOperation.Code.GRAB,
+    )
+)
+
+
+def registry_resource(registry: Registry) -> Resource:
+    return Resource(registry.code.value)
+
+
+@dataclass(slots=True, kw_only=True)
+class PipelineStats:
+    instructions: int = 0
+    ticks: int = 0
+    stalls: int = 0
+    flushes: int = 0
+
+    @property
+    def cycles_per_instruction(self) -> float:
+        return self.ticks / self.instructions if self.instructions else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.ticks} ticks for {self.instructions} instructions "
+            + f"(CPI {self.cycles_per_instruction:.2f}), "
+            + f"{self.stalls} stalls, {self.flushes} flushes"
+        )
+
+
+class PipelineModel:
+    """
+    Timing model of a classic in-order pipeline over the stages of
+    :py:class:`ControlUnit`: fetch, execute and memory. It is driven by
+    the trace of retired instructions, so the simulation itself is unchanged.
+
+    - Results of the execute stage are forwarded, results of the memory stage
+      (loads and grabs, including their flags) stall the next instruction
+      for a tick, if it needs them in the execute stage
+    - Instructions, that take more than one cycle (see :py:func:`cycle_cost`),
+      hold the memory stage and stall the pipeline for the extra cycles
+    - Jumps are predicted as not taken. Taken jumps are resolved in
+      the execute stage and flush one fetched instruction, calls and returns
+      change the instruction pointer in the memory stage and flush two
+    """
+
+    STAGES: tuple[str, ...] = ("fetch", "execute", "memory")
+
+    def __init__(self) -> None:
+        self.stats: PipelineStats = PipelineStats()
+        self.late_writes: frozenset[Resource] = frozenset()
+
+    @staticmethod
+    def execute_reads(operation: OperationBase) -> set[Resource]:
+        """Resources, that the operation needs in the execute stage"""
+        if isinstance(operation, BinaryOperation):
+            result: set[Resource] = set()
+            if isinstance(operation.left, Registry):
+                result.add(registry_resource(operation.left))
+            if operation.code is not BinaryOperation.Code.MOVE_DATA:
+                result.add(registry_resource(operation.right))
+            return result
+        if isinstance(operation, JumpOperation):
+            if operation.code is JumpOperation.Code.JUMP_BECAUSE:
+                return set()
+            return {Resource.FLAGS}
+        if isinstance(operation, IndexedMemoryOperation):
+            return {registry_resource(operation.index)}
+        return set()
+
+    @staticmethod
+    def memory_writes(operation: OperationBase) -> frozenset[Resource]:
+        """Resources, that the operation changes only in the memory stage"""
+        if (
+            isinstance(
+                operation, MemoryOperation | IndexedMemoryOperation | StackOperation
+            )
+            and operation.code in LOADING_CODES
+        ):
+            return frozenset((registry_resource(operation.right), Resource.FLAGS))
+        return frozenset()
+
+    @staticmethod
+    def flush_size(operation: OperationBase, taken: bool) -> int:
+        if isinstance(operation, SubroutineOperation):
+            return 2
+        if isinstance(operation, JumpOperation) and taken:
+            return 1
+        return 0
+
+    def retire(self, operation: OperationBase, taken: bool) -> None:
+        """
+        Accounts the next retired instruction
+
+        :param taken: if the instruction pointer was changed by the instruction
+        """
+        if self.stats.instructions == 0:
+            self.stats.ticks = len(self.STAGES) - 1  # filling the pipeline
+        self.stats.instructions += 1
+
+        stalls: int = 0
+        if self.execute_reads(operation) & self.late_writes:
+            stalls += 1
+        if isinstance(operation, BlockOperation | VectorOperation):
+            stalls += cycle_cost(operation) - 1
+        flushes: int = self.flush_size(operation, taken)
+
+        self.stats.stalls += stalls
+        self.stats.flushes += flushes
+        self.stats.ticks += 1 + stalls + flushes
+        self.late_writes = self.memory_writes(operation)
@@ -0,0 +1,152 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+
+from common.operations import JumpOperation
+
+
+@dataclass(slots=True, kw_only=True)
+class BranchRecord:
+    code: JumpOperation.Code
+    executed: int = 0
+    mispredicted: int = 0
+
+    @property
+    def misprediction_rate(self) -> float:
+        return self.mispredicted / self.executed if self.executed else 0.0
+
+
+@dataclass(slots=True, kw_only=True)
+class BranchStats:
+    branches: dict[int, BranchRecord] = field(default_factory=dict)
+
+    @property
+    def executed(self) -> int:
+        return sum(record.executed for record in self.branches.values())
+
+    @property
+    def mispredicted(self) -> int:
+        return sum(record.mispredicted for record in self.branches.values())
+
+    @property
+    def misprediction_rate(self) -> float:
+        return self.mispredicted / self.executed if self.executed else 0.0
+
+    def __str__(self) -> str:
+        lines: list[str] = [
+            f"{self.executed} branches, {self.mispredicted} mispredicted "
+            + f"({self.misprediction_rate:.1%})"
+        ]
+        for address, record in sorted(self.branches.items()):
+            lines.append(
+                f"  {address:>5} {record.code.value:<3}: {record.executed} executed, "
+                + f"{record.mispredicted} mispredicted "
+                + f"({record.misprediction_rate:.1%})"
+            )
+        return "\n".join(lines)
+
+
+class BranchPredictor(ABC):
+    """
+    Base for models of branch predictors, that guess directions of conditional
+    jumps by their addresses in the instruction memory. Unconditional jumps
+    always go to the known target, so they are not predicted
+    """
+
+    def __init__(self) -> None:
+        self.stats: BranchStats = BranchStats()
+
+    @abstractmethod
+    def predict(self, address: int, offset: int) -> bool:
+        """Guesses, if the branch at the address is taken"""
+
+    @abstractmethod
+    def update(self, address: int, taken: bool) -> None:
+        """Learns the actual direction of the branch at the address"""
+
+    def record(self, address: int, operation: JumpOperation, taken: bool) -> None:
+        """Accounts the executed branch and updates the predictor with it"""
+        record: BranchRecord | None = self.stats.branches.get(address)
+        if record is None:
+            record = BranchRecord(code=operation.code)
+            self.stats.branches[address] = record
+        record.executed += 1
+        if self.predict(address, operation.offset) != taken:
+            record.mispredicted += 1
+        self.update(address, taken)
+
+
+class StaticPredictor(BranchPredictor):
+    """Backward jumps (loops) are predicted as taken, forward ones are not"""
+
+    def predict(self, address: int, offset: int) -> bool:
+        return offset < 0
+
+    def update(self, address: int, taken: bool) -> None:
+        pass
+
+
+class OneBitPredictor(BranchPredictor):
+    """Each branch is predicted to go the same way as the last time"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.history: dict[int, bool] = {}
+
+    def predict(self, address: int, offset: int) -> bool:
+        return self.history.get(address, offset < 0)
+
+    def update(self, address: int, taken: bool) -> None:
+        self.history[address] = taken
+
+
+class TwoBitPredictor(BranchPredictor):
+    """
+    Each branch has a saturating counter from 0 to 3, values from 2 mean taken.
+    So the prediction only changes after two mistakes in a row
+    """
+
+    INITIAL: int = 1  # weakly not taken
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.counters: dict[int, int] = {}
+
+    def predict(self, address: int, offset: int) -> bool:
+        return self.counters.get(address, self.INITIAL) >= 2
+
+    def update(self, address: int, taken: bool) -> None:
+        counter: int = self.counters.get(address, self.INITIAL)
+        self.counters[address] = min(counter + 1, 3) if taken else max(counter - 1, 0)
+
+
+class GSharePredictor(BranchPredictor):
+    """
+    Two-bit counters in a shared table, indexed by the address of the branch
+    xor the global history (directions of the last ``history_bits`` branches)
+    """
+
+    def __init__(self, history_bits: int = 8) -> None:
+        super().__init__()
+        self.mask: int = (1 << history_bits) - 1
+        self.history: int = 0
+        self.counters: list[int] = [TwoBitPredictor.INITIAL] * (self.mask + 1)
+
+    def index(self, address: int) -> int:
+        return (address ^ self.history) & self.mask
+
+    def predict(self, address: int, offset: int) -> bool:
+        return self.counters[self.index(address)] >= 2
+
+    def update(self, address: int, taken: bool) -> None:
+        index: int = self.index(address)
+        counter: int = self.counters[index]
+        self.counters[index] = min(counter + 1, 3) if taken else max(counter - 1, 0)
+        self.history = ((self.history << 1) | taken) & self.mask
+
+
+PREDICTORS: dict[str, type[BranchPredictor]] = {
+    "static": StaticPredictor,
+    "1-bit": OneBitPredictor,
+    "2-bit": TwoBitPredictor,
+    "gshare": GSharePredictor,
+}
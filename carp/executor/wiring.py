@@ -1,6 +1,14 @@
-from common.constants import INPUT_ADDRESS, OUTPUT_ADDRESS, IO_DEVICE_COUNT
-from common.operations import Operation, Registry
+from common.constants import (
+    CORE_ID_ADDRESS,
+    INPUT_ADDRESS,
+    OUTPUT_ADDRESS,
+    IO_DEVICE_COUNT,
+)
+from common.operations import OperationBase, Registry
+from common.program import DataSegment
 from executor.alu import ALU, ALUOperation
+from executor.cache import Cache, Region
+from executor.counters import PerformanceCounters
 from executor.logs import LogRecord, RegistriesRecord, FlagsRecord
 
 
@@ -14,8 +22,10 @@ class DataPath:
     def __init__(
         self,
         data_memory_size: int,
-        instruction_memory: list[Operation],
+        instruction_memory: list[OperationBase],
         input_data: list[int],
+        cache: Cache | None = None,
+        core_id: int = 0,
     ) -> None:
         self.general_registries: dict[Registry.Code, int] = {
             Registry.Code.ACCUMULATOR: 0,
@@ -27,15 +37,26 @@ class DataPath:
         self.memory_pointer: int = 0
         self.stack_pointer: int = data_memory_size
 
-        self.instruction_memory: list[Operation] = instruction_memory
+        self.instruction_memory: list[OperationBase] = instruction_memory
         self.instruction_pointer: int = 0
-        self.command_data: Operation | None = None
+        self.command_data: OperationBase | None = None
 
         self.io: dict[int, list[int]] = {
             INPUT_ADDRESS: input_data[::-1],
             OUTPUT_ADDRESS: [],
         }
         self.last_io: dict[int, int | None] = {}
+        self.counters: PerformanceCounters = PerformanceCounters()
+        self.cache: Cache | None = cache
+        self.core_id: int = core_id
+
+    def load_data(self, segments: list[DataSegment]) -> None:
+        """Initializes the data memory with segments of a program before start"""
+        for segment in segments:
+            end: int = segment.address + len(segment.values)
+            if segment.address < IO_DEVICE_COUNT or end > len(self.data_memory):
+                raise IndexError("Data segment doesn't fit into the memory")
+            self.data_memory[segment.address : end] = segment.values
 
     @property
     def accumulator(self) -> int:
@@ -55,6 +76,19 @@ class DataPath:
         self.command_data = self.instruction_memory[self.instruction_pointer]
         return True
 
+    def _cache_access(
+        self, index: int, write: bool, stack: bool = False, length: int = 1
+    ) -> None:
+        """Passes an access to the cache model, if there is one"""
+        if self.cache is None:
+            return
+        region: Region = Region.VARIABLES
+        if 0 <= index < IO_DEVICE_COUNT:
+            region = Region.IO
+        elif stack:
+            region = Region.STACK
+        self.cache.access_range(index, length, write, region)
+
     def _get_io_device(self, index: int) -> list[int]:
         device = self.io.get(index)
         if device is None:
@@ -65,10 +99,14 @@ class DataPath:
         """
         Reads from the data memory to a specified general registry.
         Uses :py:attr:`memory_pointer` or :py:attr:`stack_pointer` as the address.
-        The memory-mapped input is also *imitated* here.
+        The memory-mapped input and the core id device are also *imitated* here.
         """
         index = self.stack_pointer - 1 if stack else self.memory_pointer
-        if 0 <= index < IO_DEVICE_COUNT:
+        self.counters.memory_reads += 1
+        self._cache_access(index, write=False, stack=stack)
+        if index == CORE_ID_ADDRESS:
+            data = self.core_id
+        elif 0 <= index < IO_DEVICE_COUNT:
             device = self._get_io_device(index)
             data = 0 if len(device) == 0 else device.pop()
             self.last_io[index] = data
@@ -90,6 +128,8 @@ class DataPath:
         """
         data = self.general_registries[source]
         index = self.stack_pointer if stack else self.memory_pointer
+        self.counters.memory_writes += 1
+        self._cache_access(index, write=True, stack=stack)
         if 0 <= index < IO_DEVICE_COUNT:
             self._get_io_device(index).append(data)
             self.last_io[index] = data
@@ -98,6 +138,112 @@ class DataPath:
         else:
             raise IndexError("An attempt to write to outside the memory")
 
+    def write_return_address(self) -> None:
+        """
+        Writes the instruction pointer (address of the next instruction)
+        to the top of the stack. Uses :py:attr:`stack_pointer` as the address.
+        """
+        if not IO_DEVICE_COUNT <= self.stack_pointer < len(self.data_memory):
+            raise IndexError("An attempt to write to outside the memory")
+        self.counters.memory_writes += 1
+        self._cache_access(self.stack_pointer, write=True, stack=True)
+        self.data_memory[self.stack_pointer] = self.instruction_pointer
+
+    def read_return_address(self) -> None:
+        """
+        Reads the instruction pointer from the top of the stack, flags are unchanged.
+        Uses :py:attr:`stack_pointer` as the address.
+        """
+        index = self.stack_pointer - 1
+        if not IO_DEVICE_COUNT <= index < len(self.data_memory):
+            raise IndexError("An attempt to read from outside the memory")
+        self.counters.memory_reads += 1
+        self._cache_access(index, write=False, stack=True)
+        self.instruction_pointer = self.data_memory[index]
+
+    def _check_block(self, start: int, length: int, action: str) -> None:
+        if length < 0:
+            raise IndexError("Block length can't be negative")
+        if start < IO_DEVICE_COUNT or start + length > len(self.data_memory):
+            raise IndexError(f"An attempt to {action} outside the memory")
+
+    def block_copy(self, source: int, destination: int, length: int) -> None:
+        """
+        Copies ``length`` cells at once, the ranges may overlap.
+        Device addresses are not allowed on both sides
+        """
+        self._check_block(source, length, "read from")
+        self._check_block(destination, length, "write to")
+        self.data_memory[destination : destination + length] = self.data_memory[
+            source : source + length
+        ]
+        self.counters.memory_reads += length
+        self.counters.memory_writes += length
+        self._cache_access(source, write=False, length=length)
+        self._cache_access(destination, write=True, length=length)
+
+    def block_fill(self, destination: int, length: int, source: Registry.Code) -> None:
+        """Sets ``length`` cells at once to the value of a general registry"""
+        self._check_block(destination, length, "write to")
+        self.data_memory[destination : destination + length] = [
+            self.general_registries[source]
+        ] * length
+        self.counters.memory_writes += length
+        self._cache_access(destination, write=True, length=length)
+
+    def block_output(self, source: int, length: int, device: int) -> None:
+        """
+        Writes ``length`` cells at once to a memory-mapped device,
+        :py:attr:`last_io` gets the last written value
+        """
+        self._check_block(source, length, "read from")
+        if not 0 <= device < IO_DEVICE_COUNT:
+            raise RuntimeError(f"Device {device} not connected")
+        values: list[int] = self.data_memory[source : source + length]
+        self._get_io_device(device).extend(values)
+        if values:
+            self.last_io[device] = values[-1]
+        self.counters.memory_reads += length
+        self.counters.memory_writes += length
+        self._cache_access(source, write=False, length=length)
+        self._cache_access(device, write=True, length=length)
+
+    def vector_execute(
+        self,
+        operation: ALUOperation,
+        destination: int,
+        source: int,
+        operand: int | Registry.Code,
+        length: int,
+        sign: bool = False,
+    ) -> None:
+        """
+        Applies the operation to whole ranges at once: the left side is read
+        from ``source``, the right one from the ``operand`` range or registry.
+        With ``sign`` results are replaced by their signs (-1, 0 or 1)
+        """
+        self._check_block(source, length, "read from")
+        self._check_block(destination, length, "write to")
+        right: list[int]
+        if isinstance(operand, Registry.Code):
+            right = [self.general_registries[operand]] * length
+        else:
+            self._check_block(operand, length, "read from")
+            right = self.data_memory[operand : operand + length]
+            self.counters.memory_reads += length
+            self._cache_access(operand, write=False, length=length)
+
+        result: list[int] = self.alu.execute_vector(
+            operation, self.data_memory[source : source + length], right
+        )
+        if sign:
+            result = list(map(ALU.sign, result))
+        self.data_memory[destination : destination + length] = result
+        self.counters.memory_reads += length
+        self.counters.memory_writes += length
+        self._cache_access(source, write=False, length=length)
+        self._cache_access(destination, write=True, length=length)
+
     def alu_execute(
         self,
         operation: ALUOperation,
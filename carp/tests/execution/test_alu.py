@@ -39,3 +39,32 @@ def test_alu(
     assert alu.result == result
     assert alu.zero == (result == 0)
     assert alu.negative == (result < 0)
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        pytest.param(member, id=name)
+        for name, member in ALUOperation.__members__.items()
+    ],
+)
+@pytest.mark.parametrize(
+    "left",
+    [
+        pytest.param([WORD_MAX_VALUE, WORD_MIN_VALUE, 7, -7, 0], id="overflow"),
+        pytest.param([10, -10, 7, -7, 0], id="word"),
+    ],
+)
+def test_execute_vector(alu: ALU, operation: ALUOperation, left: list[int]) -> None:
+    right: list[int] = [2, 4, -3, 3, 5]
+
+    expected: list[int] = []
+    for left_value, right_value in zip(left, right):
+        alu.left = left_value
+        alu.right = right_value
+        alu.execute(operation, flags=False)
+        expected.append(alu.result)
+
+    alu.zero = True
+    assert alu.execute_vector(operation, left, right) == expected
+    assert alu.zero
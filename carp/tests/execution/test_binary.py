@@ -0,0 +1,181 @@
+from pathlib import Path
+from typing import get_args, get_type_hints
+
+import pytest
+
+from common.binary import (
+    FORMAT_VERSION,
+    HEADER,
+    INSTRUCTION,
+    MAGIC,
+    OPCODES,
+    decode_program,
+    encode_program,
+    load_program,
+    save_program,
+)
+from common.constants import ProgramFormat
+from common.errors import ProgramError
+from common.operations import (
+    RA,
+    Operation,
+    RB,
+    BinaryOperation,
+    BlockOperation,
+    IndexedMemoryOperation,
+    JumpOperation,
+    MemoryOperation,
+    StackOperation,
+    SubroutineOperation,
+    Value,
+    VectorOperation,
+)
+from common.program import DataSegment, Program
+
+program = Program(
+    data=[
+        DataSegment(address=20, values=[1, -2, 3]),
+        DataSegment(address=40, values=[]),
+    ],
+    instructions=[
+        BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, left=Value(value=-7)),
+        BinaryOperation(code=BinaryOperation.Code.MATH_ADD, right=RB, left=RA),
+        StackOperation(code=StackOperation.Code.PUSH, right=RB),
+        JumpOperation(code=JumpOperation.Code.JUMP_NOT_ZERO, offset=-3),
+        SubroutineOperation(code=SubroutineOperation.Code.CALL, offset=2),
+        MemoryOperation(code=MemoryOperation.Code.SAVE_MEMORY, address=3),
+        IndexedMemoryOperation(
+            code=IndexedMemoryOperation.Code.LOAD_INDEXED, right=RB, index=RA
+        ),
+        BlockOperation(
+            code=BlockOperation.Code.COPY_BLOCK, source=20, address=30, length=3
+        ),
+        VectorOperation(
+            code=VectorOperation.Code.VECTOR_COMPARE,
+            source=20,
+            operand=30,
+            address=40,
+            length=3,
+        ),
+        VectorOperation(
+            code=VectorOperation.Code.VECTOR_MUL,
+            source=20,
+            operand=RB,
+            address=40,
+            length=3,
+        ),
+    ],
+)
+
+
+def test_opcodes() -> None:
+    """Opcodes are a part of the format, changing them needs a new version"""
+    assert {code.value: opcode for code, opcode in OPCODES.items()} == {
+        "mov": 0,
+        "cmp": 1,
+        "pmc": 2,
+        "add": 3,
+        "sub": 4,
+        "mul": 5,
+        "div": 6,
+        "mod": 7,
+        "grab": 8,
+        "push": 9,
+        "jz": 10,
+        "jn": 11,
+        "jnz": 12,
+        "jnn": 13,
+        "jb": 14,
+        "load": 15,
+        "save": 16,
+        "loadi": 17,
+        "savei": 18,
+        "call": 19,
+        "ret": 20,
+        "copy": 21,
+        "fill": 22,
+        "stream": 23,
+        "vadd": 24,
+        "vsub": 25,
+        "vmul": 26,
+        "vdiv": 27,
+        "vmod": 28,
+        "vcmp": 29,
+    }
+    codes = {
+        code for cls in get_args(Operation) for code in get_type_hints(cls)["code"]
+    }
+    assert set(OPCODES) == codes
+
+
+def test_round_trip() -> None:
+    encoded: bytes = encode_program(program)
+    assert len(encoded) == (
+        HEADER.size + 8 + 3 * 4 + 8 + len(program.instructions) * INSTRUCTION.size
+    )
+    assert decode_program(encoded) == program
+
+
+@pytest.mark.parametrize("program_format", list(ProgramFormat))
+def test_load_program(tmp_path: Path, program_format: ProgramFormat) -> None:
+    path: Path = tmp_path / f"program{program_format.suffix}"
+    save_program(program, path, program_format)
+    assert load_program(path) == program
+
+
+@pytest.mark.parametrize(
+    ("data", "message"),
+    [
+        pytest.param(b"CURB", "the header is incomplete", id="header"),
+        pytest.param(
+            HEADER.pack(b"CURP", FORMAT_VERSION, 0, 0),
+            "not a binary program",
+            id="magic",
+        ),
+        pytest.param(
+            HEADER.pack(MAGIC, FORMAT_VERSION + 1, 0, 0),
+            f"format version {FORMAT_VERSION + 1} is not supported",
+            id="version",
+        ),
+        pytest.param(
+            HEADER.pack(MAGIC, FORMAT_VERSION, 1, 0) + b"\0" * 6,
+            "the data segment is incomplete",
+            id="data",
+        ),
+        pytest.param(
+            HEADER.pack(MAGIC, FORMAT_VERSION, 0, 2) + b"\0" * INSTRUCTION.size,
+            "2 instructions take 40 bytes, but 20 are left",
+            id="instructions",
+        ),
+        pytest.param(
+            HEADER.pack(MAGIC, FORMAT_VERSION, 0, 1)
+            + INSTRUCTION.pack(255, 0, 0, 0, 0, 0, 0),
+            "at instructions[0]: unknown opcode 255",
+            id="opcode",
+        ),
+    ],
+)
+def test_decode_errors(data: bytes, message: str) -> None:
+    with pytest.raises(ProgramError) as e:
+        decode_program(data)
+    assert message in str(e.value)
+
+
+def test_encode_word_overflow() -> None:
+    too_far = Program(instructions=[JumpOperation(offset=2**31)])
+    with pytest.raises(ProgramError) as e:
+        encode_program(too_far)
+    assert str(e.value) == (
+        "Invalid program at instructions[0]: 2147483648 does not fit in a word"
+    )
+
+
+def test_load_errors(tmp_path: Path) -> None:
+    path: Path = tmp_path / "program.curb"
+    path.write_bytes(
+        HEADER.pack(MAGIC, FORMAT_VERSION, 0, 1)
+        + INSTRUCTION.pack(255, 0, 0, 0, 0, 0, 0)
+    )
+    with pytest.raises(ProgramError) as e:  # the mapped file is still closed
+        load_program(path)
+    assert str(e.value) == "Invalid program at instructions[0]: unknown opcode 255"
@@ -0,0 +1,112 @@
+import pytest
+from tests.helpers import create_data_path
+
+from common.constants import IO_DEVICE_COUNT, OUTPUT_ADDRESS
+from common.operations import Registry
+from executor.cache import (
+    Cache,
+    CacheConfig,
+    Region,
+    Replacement,
+    WritePolicy,
+)
+
+
+def create_cache(**kwargs: int | str) -> Cache:
+    # one set of two lines of 2 words, so replacement is easy to track
+    config: dict[str, int | str] = {"size": 4, "line_size": 2, "associativity": 2}
+    config.update(kwargs)
+    return Cache(CacheConfig(**config))  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize(
+    ("size", "line_size", "associativity"),
+    [(10, 4, 2), (4, 4, 2), (8, 0, 2)],
+    ids=["not_divisible", "too_small", "empty_line"],
+)
+def test_config_fails(size: int, line_size: int, associativity: int) -> None:
+    with pytest.raises(ValueError):
+        CacheConfig(size=size, line_size=line_size, associativity=associativity)
+
+
+@pytest.mark.parametrize(
+    ("replacement", "hits"),
+    [
+        pytest.param(Replacement.LRU, 2, id="lru"),  # 20 stays after the reuse
+        pytest.param(Replacement.FIFO, 1, id="fifo"),  # 20 is the oldest anyway
+    ],
+)
+def test_replacement(replacement: Replacement, hits: int) -> None:
+    cache = create_cache(replacement=replacement.value)
+    for address in (20, 22, 21, 24, 20):
+        cache.access(address, write=False, region=Region.VARIABLES)
+
+    stats = cache.stats.regions[Region.VARIABLES]
+    assert stats.hits == hits
+    assert stats.misses == 5 - hits
+    assert stats.evictions == 3 - hits
+
+
+def test_write_back() -> None:
+    cache = create_cache()
+    cache.access(20, write=True, region=Region.STACK)
+    cache.access(22, write=False, region=Region.STACK)
+    cache.access(24, write=False, region=Region.STACK)  # evicts the dirty line
+    cache.access(26, write=False, region=Region.STACK)  # evicts the clean one
+
+    assert cache.stats.regions[Region.STACK].evictions == 2
+    assert cache.stats.write_backs == 1
+    assert cache.stats.memory_writes == 2
+
+
+def test_write_through() -> None:
+    cache = create_cache(write_policy=WritePolicy.WRITE_THROUGH.value)
+    cache.access(20, write=True, region=Region.VARIABLES)  # not allocated
+    cache.access(20, write=False, region=Region.VARIABLES)
+    cache.access(21, write=True, region=Region.VARIABLES)
+
+    stats = cache.stats.regions[Region.VARIABLES]
+    assert (stats.hits, stats.misses) == (1, 2)
+    assert cache.stats.write_backs == 0
+    assert cache.stats.memory_writes == 2
+
+
+@pytest.mark.parametrize("write_policy", list(WritePolicy))
+@pytest.mark.parametrize("write", [False, True], ids=["read", "write"])
+@pytest.mark.parametrize(("start", "length"), [(20, 5), (21, 6), (23, 1), (20, 0)])
+def test_access_range(
+    write_policy: WritePolicy, write: bool, start: int, length: int
+) -> None:
+    ranged = create_cache(size=8, write_policy=write_policy.value)
+    ranged.access(22, write=False, region=Region.VARIABLES)
+    ranged.access_range(start, length, write, Region.VARIABLES)
+
+    single = create_cache(size=8, write_policy=write_policy.value)
+    single.access(22, write=False, region=Region.VARIABLES)
+    for address in range(start, start + length):
+        single.access(address, write, Region.VARIABLES)
+
+    assert ranged.stats == single.stats
+    assert ranged.sets == single.sets
+
+
+def test_regions() -> None:
+    dp = create_data_path()
+    dp.cache = create_cache(size=8)
+    code: Registry.Code = Registry.Code.ACCUMULATOR
+
+    dp.memory_pointer = IO_DEVICE_COUNT
+    dp.memory_write(code)
+    dp.memory_read(code)
+    dp.stack_pointer = 50
+    dp.memory_write(code, stack=True)
+    dp.memory_pointer = OUTPUT_ADDRESS
+    dp.memory_write(code)
+    dp.block_output(IO_DEVICE_COUNT, 3, OUTPUT_ADDRESS)
+
+    # the block goes to the next line after two words
+    counts = {
+        region: (stats.hits, stats.misses)
+        for region, stats in dp.cache.stats.regions.items()
+    }
+    assert counts == {Region.VARIABLES: (3, 2), Region.STACK: (0, 1), Region.IO: (0, 4)}
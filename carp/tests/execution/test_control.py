@@ -2,25 +2,29 @@ from collections.abc import Callable
 from random import randint
 
 import pytest
-from tests.execution.test_wiring import create_data_path, operations
+from tests.helpers import create_data_path, operations
 
+from common.constants import OUTPUT_ADDRESS
 from common.operations import (
-    Operation,
     Registry,
     Value,
     RA,
     RB,
     BinaryOperation,
+    BlockOperation,
+    IndexedMemoryOperation,
     JumpOperation,
     MemoryOperation,
     StackOperation,
+    SubroutineOperation,
+    VectorOperation,
     OperationBase,
 )
-from executor.control import ControlUnit
+from executor.control import ControlUnit, find_fused_groups
 
 
 def create_control_unit(
-    instruction_memory: list[Operation] | None = None,
+    instruction_memory: list[OperationBase] | None = None,
     input_data: list[int] | None = None,
 ) -> ControlUnit:
     return ControlUnit(create_data_path(instruction_memory, input_data))
@@ -31,7 +35,7 @@ def test_fetch(count: int) -> None:
     cu: ControlUnit = create_control_unit(instruction_memory=operations[:count])
 
     i: int = 0
-    operation: Operation | None = None
+    operation: OperationBase | None = None
     assert cu.data_path.instruction_pointer == i
     assert cu.data_path.command_data is None
 
@@ -93,7 +97,7 @@ def test_binary_operations(
     cu.data_path.general_registries[Registry.Code.BUFFER] = -THE_VALUE
 
     operation = BinaryOperation(code=code, right=RA, left=source)
-    cu.data_path.command_data = Operation.parse_obj(operation)
+    cu.data_path.command_data = operation
     cu.execute_instruction()
 
     assert cu.data_path.general_registries[Registry.Code.ACCUMULATOR] == result
@@ -129,6 +133,16 @@ def test_binary_operations(
             lambda z, n: n,
             id="jn",
         ),
+        pytest.param(
+            JumpOperation.Code.JUMP_NOT_ZERO,
+            lambda z, n: not z,
+            id="jnz",
+        ),
+        pytest.param(
+            JumpOperation.Code.JUMP_NOT_NEGATIVE,
+            lambda z, n: not n,
+            id="jnn",
+        ),
     ],
 )
 def test_jump_operations(
@@ -145,7 +159,7 @@ def test_jump_operations(
     offset: int = randint(-100, 100)
 
     operation = JumpOperation(code=code, offset=offset)
-    cu.data_path.command_data = Operation.parse_obj(operation)
+    cu.data_path.command_data = operation
     cu.execute_instruction()
 
     if check(zero, negative):
@@ -155,9 +169,21 @@ def test_jump_operations(
     assert cu.data_path.alu.negative is negative
 
 
+@pytest.mark.parametrize("address", [0, THE_VALUE])
+def test_indexed_memory_execute(cu: ControlUnit, address: int) -> None:
+    cu.data_path.general_registries[Registry.Code.BUFFER] = THE_VALUE
+    cu.data_path.command_data = IndexedMemoryOperation(
+        code=IndexedMemoryOperation.Code.LOAD_INDEXED, address=address
+    )
+    zero: bool = cu.data_path.alu.zero
+    cu.execute_instruction()
+    assert cu.data_path.memory_pointer == address + THE_VALUE
+    assert cu.data_path.alu.zero is zero
+
+
 def test_memory_execute(cu: ControlUnit) -> None:
-    cu.data_path.command_data = Operation.parse_obj(
-        MemoryOperation(code=MemoryOperation.Code.LOAD_MEMORY, address=THE_VALUE)
+    cu.data_path.command_data = MemoryOperation(
+        code=MemoryOperation.Code.LOAD_MEMORY, address=THE_VALUE
     )
     cu.execute_instruction()
     assert cu.data_path.memory_pointer == THE_VALUE
@@ -176,7 +202,7 @@ def test_stack_execute(cu: ControlUnit, code: StackOperation.Code, delta: int) -
     cu.data_path.alu.negative = True
 
     sp: int = cu.data_path.stack_pointer
-    cu.data_path.command_data = Operation.parse_obj(StackOperation(code=code))
+    cu.data_path.command_data = StackOperation(code=code)
     cu.execute_instruction()
     assert cu.data_path.stack_pointer == sp + delta
 
@@ -184,6 +210,33 @@ def test_stack_execute(cu: ControlUnit, code: StackOperation.Code, delta: int) -
     assert cu.data_path.alu.negative
 
 
+def test_subroutine_operations(cu: ControlUnit) -> None:
+    cu.data_path.alu.zero = True
+    cu.data_path.alu.negative = True
+
+    sp: int = cu.data_path.stack_pointer
+    cu.data_path.instruction_pointer = 10
+    cu.data_path.command_data = SubroutineOperation(
+        code=SubroutineOperation.Code.CALL, offset=20
+    )
+    cu.execute_instruction()
+    cu.memory_fetch()
+    assert cu.data_path.instruction_pointer == 30
+    assert cu.data_path.stack_pointer == sp - 1
+    assert cu.data_path.data_memory[sp - 1] == 10
+
+    cu.data_path.command_data = SubroutineOperation(
+        code=SubroutineOperation.Code.RETURN
+    )
+    cu.execute_instruction()
+    cu.memory_fetch()
+    assert cu.data_path.instruction_pointer == 10
+    assert cu.data_path.stack_pointer == sp
+
+    assert cu.data_path.alu.zero
+    assert cu.data_path.alu.negative
+
+
 THE_ADDRESS: int = 25
 
 
@@ -201,11 +254,21 @@ THE_ADDRESS: int = 25
             True,
             False,
         ),
+        (
+            IndexedMemoryOperation(code=IndexedMemoryOperation.Code.SAVE_INDEXED),
+            False,
+            True,
+        ),
+        (
+            IndexedMemoryOperation(code=IndexedMemoryOperation.Code.LOAD_INDEXED),
+            True,
+            False,
+        ),
         (StackOperation(code=StackOperation.Code.PUSH), False, True),
         (StackOperation(code=StackOperation.Code.GRAB), True, False),
         (JumpOperation(), False, False),
     ],
-    ids=["none", "save", "load", "push", "grab", "other"],
+    ids=["none", "save", "load", "savei", "loadi", "push", "grab", "other"],
 )
 def test_memory_fetch(
     cu: ControlUnit,
@@ -213,8 +276,7 @@ def test_memory_fetch(
     read: bool,
     write: bool,
 ) -> None:
-    op: Operation | None = None if operation is None else Operation.parse_obj(operation)
-    cu.data_path.command_data = op
+    cu.data_path.command_data = operation
     cu.data_path.memory_pointer = THE_ADDRESS
     cu.data_path.stack_pointer = THE_ADDRESS
 
@@ -240,3 +302,135 @@ def test_logs(count: int) -> None:
     cu.main()
     assert len(cu.log) == count + 1
     assert cu.finished
+
+
+def test_indexed_loop() -> None:
+    # writes squares of 0..4 to 20..24 & reads one back registry-indirectly
+    program: list[OperationBase] = [
+        BinaryOperation(
+            code=BinaryOperation.Code.MOVE_DATA, right=RB, left=Value(value=0)
+        ),
+        BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, left=RB),
+        BinaryOperation(code=BinaryOperation.Code.MATH_MUL, left=RB),
+        IndexedMemoryOperation(
+            code=IndexedMemoryOperation.Code.SAVE_INDEXED, address=20
+        ),
+        BinaryOperation(
+            code=BinaryOperation.Code.MATH_ADD, right=RB, left=Value(value=1)
+        ),
+        BinaryOperation(
+            code=BinaryOperation.Code.COMPARE, right=RB, left=Value(value=5)
+        ),
+        JumpOperation(code=JumpOperation.Code.JUMP_NEGATIVE, offset=-6),
+        BinaryOperation(
+            code=BinaryOperation.Code.MOVE_DATA, right=RB, left=Value(value=23)
+        ),
+        IndexedMemoryOperation(code=IndexedMemoryOperation.Code.LOAD_INDEXED),
+    ]
+    cu = create_control_unit(program)
+    cu.main()
+    assert cu.data_path.data_memory[20:25] == [0, 1, 4, 9, 16]
+    assert cu.data_path.accumulator == 9
+
+
+def test_block_operations() -> None:
+    # fills 20..23 with 5, copies them to 30..33 & streams to the output
+    program: list[OperationBase] = [
+        BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, left=Value(value=5)),
+        BlockOperation(code=BlockOperation.Code.FILL_BLOCK, address=20, length=4),
+        BlockOperation(
+            code=BlockOperation.Code.COPY_BLOCK, source=20, address=30, length=4
+        ),
+        BlockOperation(
+            code=BlockOperation.Code.STREAM_BLOCK,
+            source=29,
+            address=OUTPUT_ADDRESS,
+            length=3,
+        ),
+    ]
+    cu = create_control_unit(program)
+    cu.main()
+    assert cu.data_path.data_memory[30:34] == [5] * 4
+    assert cu.data_path.get_output() == [0, 5, 5]
+    assert cu.log[-1].output_data == 5
+    assert len(cu.log) == len(program) + 1
+
+    counters = cu.data_path.counters
+    assert counters.instructions == len(program)
+    assert counters.cycles == 1 + (1 + 4) + (1 + 2 * 4) + (1 + 2 * 3)
+    assert counters.memory_reads == 4 + 3
+    assert counters.memory_writes == 4 + 4 + 3
+
+
+def test_counters() -> None:
+    cu: ControlUnit = create_control_unit(operations[:2])
+    cu.main()
+    assert cu.data_path.counters.instructions == 2
+    assert cu.data_path.counters.cycles == 2
+    assert cu.data_path.counters.cycles_per_instruction == 1
+
+
+def test_vector_operations() -> None:
+    # squares 20..22 into 30..32 & compares them to 4
+    program: list[OperationBase] = [
+        BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, left=Value(value=4)),
+        VectorOperation(
+            code=VectorOperation.Code.VECTOR_MUL,
+            source=20,
+            operand=20,
+            address=30,
+            length=3,
+        ),
+        VectorOperation(
+            code=VectorOperation.Code.VECTOR_COMPARE,
+            source=30,
+            operand=RA,
+            address=30,
+            length=3,
+        ),
+    ]
+    cu = create_control_unit(program)
+    cu.data_path.data_memory[20:23] = [1, 2, -3]
+    cu.main()
+    assert cu.data_path.data_memory[30:33] == [-1, 0, 1]
+    assert cu.data_path.alu.zero is False
+    assert cu.data_path.counters.cycles == 1 + (1 + 3 * 3) + (1 + 2 * 3)
+
+
+def test_find_fused_groups() -> None:
+    compare = BinaryOperation(
+        code=BinaryOperation.Code.COMPARE, left=Value(value=THE_VALUE)
+    )
+    branch = JumpOperation(code=JumpOperation.Code.JUMP_ZERO, offset=1)
+    jump = JumpOperation(offset=-4)
+    program: list[OperationBase] = [compare, branch, jump, compare, jump, compare]
+    groups = find_fused_groups(program)
+    assert groups == {0: (compare, [branch, jump])}
+
+
+@pytest.mark.parametrize("value", [THE_VALUE - 1, THE_VALUE, THE_VALUE + 1])
+def test_fusion(value: int) -> None:
+    # counts up to THE_VALUE, three-instruction groups are left at each of jumps
+    program: list[OperationBase] = [
+        BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, left=Value(value=value)),
+        BinaryOperation(code=BinaryOperation.Code.MATH_ADD, left=Value(value=1)),
+        BinaryOperation(code=BinaryOperation.Code.COMPARE, left=Value(value=THE_VALUE)),
+        JumpOperation(code=JumpOperation.Code.JUMP_NOT_NEGATIVE, offset=1),
+        JumpOperation(offset=-4),
+        BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, right=RB, left=RA),
+    ]
+    plain = ControlUnit(create_data_path(program), fusion=False)
+    plain.main()
+    fused = ControlUnit(create_data_path(program), fusion=True)
+    fused.main()
+    assert fused.fused
+    assert fused.log == plain.log
+    assert fused.data_path.counters == plain.data_path.counters
+    assert fused.data_path.buffer == max(value + 1, THE_VALUE)
+
+
+def test_no_logging() -> None:
+    cu = ControlUnit(create_data_path(operations[:2]), logging=False)
+    cu.main()
+    assert cu.log == []
+    assert cu.data_path.counters.instructions == 2
@@ -0,0 +1,119 @@
+import pytest
+
+from common.constants import CORE_ID_ADDRESS, OUTPUT_ADDRESS
+from common.operations import (
+    BinaryOperation,
+    JumpOperation,
+    MemoryOperation,
+    OperationBase,
+    Value,
+)
+from executor.counters import PerformanceCounters
+from executor.multicore import MultiCore, MultiCoreStats
+
+MEMORY_SIZE: int = 100
+
+# every core writes its id to the output
+write_core_id: list[OperationBase] = [
+    MemoryOperation(code=MemoryOperation.Code.LOAD_MEMORY, address=CORE_ID_ADDRESS),
+    MemoryOperation(code=MemoryOperation.Code.SAVE_MEMORY, address=OUTPUT_ADDRESS),
+]
+
+
+def create_multicore(
+    instructions: list[OperationBase], entry_points: list[int], quantum: int = 1
+) -> MultiCore:
+    return MultiCore(
+        data_memory_size=MEMORY_SIZE,
+        instruction_memory=instructions,
+        input_data=[],
+        entry_points=entry_points,
+        quantum=quantum,
+        stack_size=10,
+    )
+
+
+def test_shared_memory() -> None:
+    machine = create_multicore(write_core_id, [0, 0, 0])
+    machine.main()
+
+    assert machine.get_output() == [0, 1, 2]
+    assert [dp.stack_pointer for dp in machine.data_paths] == [100, 90, 80]
+    assert all(
+        dp.data_memory is machine.data_paths[0].data_memory for dp in machine.data_paths
+    )
+
+
+def test_entry_points() -> None:
+    instructions: list[OperationBase] = [
+        BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, left=Value(value=7)),
+        MemoryOperation(code=MemoryOperation.Code.SAVE_MEMORY, address=OUTPUT_ADDRESS),
+        JumpOperation(code=JumpOperation.Code.JUMP_BECAUSE, offset=2),
+        *write_core_id,
+    ]
+    machine = create_multicore(instructions, [3, 0])
+    machine.main()
+
+    assert machine.get_output() == [0, 7]
+
+
+@pytest.mark.parametrize(
+    ("quantum", "expected"),
+    [
+        pytest.param(1, [1, 2, 1, 2, 1, 2], id="round_robin"),
+        pytest.param(2, [1, 2, 1, 1, 2, 2], id="quantum_2"),
+        pytest.param(10, [1, 1, 1, 2, 2, 2], id="long_quantum"),
+    ],
+)
+def test_quantum(quantum: int, expected: list[int]) -> None:
+    # core 0 outputs 1 three times, core 1 outputs 2 three times
+    instructions: list[OperationBase] = [
+        BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, left=Value(value=1)),
+        MemoryOperation(code=MemoryOperation.Code.SAVE_MEMORY, address=OUTPUT_ADDRESS),
+        MemoryOperation(code=MemoryOperation.Code.SAVE_MEMORY, address=OUTPUT_ADDRESS),
+        MemoryOperation(code=MemoryOperation.Code.SAVE_MEMORY, address=OUTPUT_ADDRESS),
+        JumpOperation(code=JumpOperation.Code.JUMP_BECAUSE, offset=4),
+        BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, left=Value(value=2)),
+        MemoryOperation(code=MemoryOperation.Code.SAVE_MEMORY, address=OUTPUT_ADDRESS),
+        MemoryOperation(code=MemoryOperation.Code.SAVE_MEMORY, address=OUTPUT_ADDRESS),
+        MemoryOperation(code=MemoryOperation.Code.SAVE_MEMORY, address=OUTPUT_ADDRESS),
+    ]
+    machine = create_multicore(instructions, [0, 5], quantum=quantum)
+    machine.main()
+
+    assert machine.get_output() == expected
+
+
+def test_per_core_counters() -> None:
+    machine = create_multicore(write_core_id, [0, 1])
+    machine.main()
+
+    stats: MultiCoreStats = machine.stats
+    assert [counters.instructions for counters in stats.cores] == [2, 1]
+    assert stats.elapsed_cycles == 2
+    assert stats.total_cycles == 3
+
+
+def test_stats_str() -> None:
+    stats = MultiCoreStats(
+        cores=[
+            PerformanceCounters(instructions=4, cycles=4),
+            PerformanceCounters(instructions=2, cycles=2),
+        ]
+    )
+    assert str(stats).splitlines()[-1] == (
+        "4 cycles elapsed, 6 in total (x1.50 parallel speedup)"
+    )
+
+
+@pytest.mark.parametrize(
+    ("entry_points", "quantum", "message"),
+    [
+        pytest.param([], 1, "At least one core is required", id="no_cores"),
+        pytest.param([0], 0, "Quantum should be positive", id="quantum"),
+    ],
+)
+def test_errors(entry_points: list[int], quantum: int, message: str) -> None:
+    with pytest.raises(ValueError) as e:
+        create_multicore(write_core_id, entry_points, quantum=quantum)
+    assert e.value.args[0] == message
@@ -0,0 +1,104 @@
+import pytest
+from tests.helpers import create_data_path
+
+from common.operations import (
+    RB,
+    BinaryOperation,
+    BlockOperation,
+    IndexedMemoryOperation,
+    JumpOperation,
+    MemoryOperation,
+    Operation,
+    OperationBase,
+    StackOperation,
+    SubroutineOperation,
+    Value,
+)
+from executor.control import ControlUnit
+from executor.pipeline import PipelineModel
+
+LOAD = MemoryOperation(code=MemoryOperation.Code.LOAD_MEMORY, address=20)
+GRAB = StackOperation(code=StackOperation.Code.GRAB, right=RB)
+ADD = BinaryOperation(code=BinaryOperation.Code.MATH_ADD, left=RB)
+MOVE = BinaryOperation(
+    code=BinaryOperation.Code.MOVE_DATA, right=RB, left=Value(value=1)
+)
+
+
+@pytest.mark.parametrize(
+    ("first", "second", "stalls"),
+    [
+        pytest.param(LOAD, ADD, 1, id="load_use"),
+        pytest.param(GRAB, ADD, 1, id="grab_use"),
+        pytest.param(MOVE, ADD, 0, id="forwarded"),
+        pytest.param(LOAD, MOVE, 0, id="independent"),
+        pytest.param(
+            LOAD, JumpOperation(code=JumpOperation.Code.JUMP_ZERO), 1, id="load_flags"
+        ),
+        pytest.param(LOAD, JumpOperation(), 0, id="unconditional"),
+        pytest.param(
+            GRAB,
+            IndexedMemoryOperation(code=IndexedMemoryOperation.Code.LOAD_INDEXED),
+            1,
+            id="index",
+        ),
+        pytest.param(
+            MOVE,
+            BlockOperation(code=BlockOperation.Code.FILL_BLOCK, address=20, length=3),
+            3,
+            id="block",
+        ),
+    ],
+)
+def test_stalls(first: OperationBase, second: OperationBase, stalls: int) -> None:
+    model = PipelineModel()
+    model.retire(first, taken=False)
+    model.retire(second, taken=False)
+    assert model.stats.stalls == stalls
+    assert model.stats.flushes == 0
+    assert model.stats.ticks == len(PipelineModel.STAGES) - 1 + 2 + stalls
+
+
+@pytest.mark.parametrize(
+    ("operation", "taken", "flushes"),
+    [
+        pytest.param(JumpOperation(), True, 1, id="jump"),
+        pytest.param(
+            JumpOperation(code=JumpOperation.Code.JUMP_ZERO), False, 0, id="not_taken"
+        ),
+        pytest.param(
+            SubroutineOperation(code=SubroutineOperation.Code.CALL), True, 2, id="call"
+        ),
+        pytest.param(
+            SubroutineOperation(code=SubroutineOperation.Code.RETURN),
+            True,
+            2,
+            id="return",
+        ),
+    ],
+)
+def test_flushes(operation: OperationBase, taken: bool, flushes: int) -> None:
+    model = PipelineModel()
+    model.retire(operation, taken=taken)
+    assert model.stats.flushes == flushes
+
+
+def test_pipelined_execution() -> None:
+    # a loop of 3 iterations with a load-use stall inside
+    program: list[OperationBase] = [
+        BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, left=Value(value=3)),
+        MemoryOperation(code=MemoryOperation.Code.SAVE_MEMORY, address=20),
+        LOAD,
+        BinaryOperation(code=BinaryOperation.Code.MATH_SUB, left=Value(value=1)),
+        MemoryOperation(code=MemoryOperation.Code.SAVE_MEMORY, address=20),
+        JumpOperation(code=JumpOperation.Code.JUMP_NOT_ZERO, offset=-4),
+    ]
+    model = PipelineModel()
+    cu = ControlUnit(create_data_path(program), pipeline=model)
+    cu.main()
+
+    assert model.stats.instructions == cu.data_path.counters.instructions == 14
+    assert model.stats.stalls == 3
+    assert model.stats.flushes == 2
+    assert model.stats.ticks == 2 + 14 + 3 + 2
+    assert cu.data_path.accumulator == 0
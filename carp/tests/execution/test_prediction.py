@@ -0,0 +1,76 @@
+import pytest
+from tests.helpers import create_data_path
+
+from common.operations import BinaryOperation, JumpOperation, Operation, Value
+from executor.control import ControlUnit
+from executor.prediction import (
+    PREDICTORS,
+    BranchPredictor,
+    GSharePredictor,
+    OneBitPredictor,
+    StaticPredictor,
+    TwoBitPredictor,
+)
+
+BACKWARD: JumpOperation = JumpOperation(code=JumpOperation.Code.JUMP_ZERO, offset=-3)
+FORWARD: JumpOperation = JumpOperation(code=JumpOperation.Code.JUMP_ZERO, offset=3)
+
+
+def mispredictions(
+    predictor: BranchPredictor, operation: JumpOperation, pattern: list[bool]
+) -> int:
+    for taken in pattern:
+        predictor.record(10, operation, taken)
+    return predictor.stats.mispredicted
+
+
+LOOP: list[bool] = [True] * 9 + [False]
+ALTERNATING: list[bool] = [True, False] * 20
+
+
+@pytest.mark.parametrize(
+    ("predictor_type", "operation", "pattern", "expected"),
+    [
+        pytest.param(StaticPredictor, BACKWARD, LOOP * 3, 3, id="static_loop"),
+        pytest.param(StaticPredictor, FORWARD, LOOP, 9, id="static_forward"),
+        pytest.param(OneBitPredictor, BACKWARD, LOOP * 3, 5, id="1bit_loop"),
+        pytest.param(OneBitPredictor, FORWARD, ALTERNATING, 40, id="1bit_alternating"),
+        pytest.param(TwoBitPredictor, BACKWARD, LOOP * 3, 4, id="2bit_loop"),
+        pytest.param(TwoBitPredictor, FORWARD, ALTERNATING, 40, id="2bit_alternating"),
+        pytest.param(GSharePredictor, FORWARD, ALTERNATING, 5, id="gshare_alternating"),
+    ],
+)
+def test_predictors(
+    predictor_type: type[BranchPredictor],
+    operation: JumpOperation,
+    pattern: list[bool],
+    expected: int,
+) -> None:
+    predictor = predictor_type()
+    assert mispredictions(predictor, operation, pattern) == expected
+    record = predictor.stats.branches[10]
+    assert record.executed == len(pattern)
+    assert record.code is JumpOperation.Code.JUMP_ZERO
+
+
+@pytest.mark.parametrize("name", list(PREDICTORS))
+@pytest.mark.parametrize("fusion", [False, True])
+def test_predicted_execution(name: str, fusion: bool) -> None:
+    # a loop of 5 iterations, the jb is not predicted
+    program = [
+        BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, left=Value(value=5)),
+        BinaryOperation(code=BinaryOperation.Code.MATH_SUB, left=Value(value=1)),
+        BinaryOperation(code=BinaryOperation.Code.COMPARE, left=Value(value=0)),
+        JumpOperation(code=JumpOperation.Code.JUMP_ZERO, offset=1),
+        JumpOperation(offset=-4),
+    ]
+    predictor = PREDICTORS[name]()
+    cu = ControlUnit(
+        create_data_path(program),
+        fusion=fusion,
+        predictor=predictor,
+    )
+    cu.main()
+    assert list(predictor.stats.branches) == [3]
+    assert predictor.stats.executed == 5
+    assert 0 < predictor.stats.mispredicted < 5
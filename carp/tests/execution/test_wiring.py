@@ -1,38 +1,34 @@
+import json
 from collections.abc import Callable
 from dataclasses import dataclass
 from random import randint
 from typing import Any
 
 import pytest
-from pydantic import parse_obj_as
-
-from common.constants import IO_DEVICE_COUNT, INPUT_ADDRESS, OUTPUT_ADDRESS
-from common.operations import Operation, BinaryOperation, Registry, RB
+from tests.helpers import MAX_MEMORY_ADDRESS, create_data_path, operations
+
+from common.constants import (
+    CORE_ID_ADDRESS,
+    IO_DEVICE_COUNT,
+    INPUT_ADDRESS,
+    OUTPUT_ADDRESS,
+    WORD_MAX_VALUE,
+)
+from common.errors import ProgramError
+from common.operations import (
+    OperationBase,
+    BinaryOperation,
+    JumpOperation,
+    Registry,
+    RB,
+    Value,
+    VectorOperation,
+)
+from common.program import DataSegment, Program, parse_program
+from common.serialization import dump
 from executor.alu import ALUOperation
 from executor.wiring import DataPath
 
-MAX_MEMORY_ADDRESS: int = 100
-
-
-def create_data_path(
-    instruction_memory: list[Operation] | None = None,
-    input_data: list[int] | None = None,
-) -> DataPath:
-    return DataPath(
-        data_memory_size=MAX_MEMORY_ADDRESS,
-        instruction_memory=instruction_memory or [],
-        input_data=input_data or [],
-    )
-
-
-operations: list[Operation] = parse_obj_as(
-    list[Operation],
-    [
-        BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, left=RB),
-        BinaryOperation(code=BinaryOperation.Code.MATH_ADD, left=RB),
-    ],
-)
-
 
 @pytest.mark.parametrize(
     "operations",
@@ -42,7 +38,7 @@ operations: list[Operation] = parse_obj_as(
         pytest.param(operations[:2], id="two_operations"),
     ],
 )
-def test_read_command(operations: list[Operation]) -> None:
+def test_read_command(operations: list[OperationBase]) -> None:
     dp: DataPath = create_data_path(instruction_memory=operations)
     for operation in operations:
         assert dp.read_command()
@@ -179,7 +175,11 @@ def test_output(input_len: int, registry_code: Registry.Code) -> None:
 
 @pytest.mark.parametrize(
     "device",
-    [i for i in range(IO_DEVICE_COUNT) if i not in {INPUT_ADDRESS, OUTPUT_ADDRESS}],
+    [
+        i
+        for i in range(IO_DEVICE_COUNT)
+        if i not in {INPUT_ADDRESS, OUTPUT_ADDRESS, CORE_ID_ADDRESS}
+    ],
 )
 @pytest.mark.parametrize(
     "method",
@@ -200,6 +200,25 @@ def test_device_fails(
     assert e.value.args[0] == f"Device {device} not connected"
 
 
+@pytest.mark.parametrize("core_id", [0, 3])
+def test_core_id_device(core_id: int, registry_code: Registry.Code) -> None:
+    dp = DataPath(
+        data_memory_size=MAX_MEMORY_ADDRESS,
+        instruction_memory=[],
+        input_data=[],
+        core_id=core_id,
+    )
+    dp.memory_pointer = CORE_ID_ADDRESS
+
+    dp.memory_read(registry_code)
+    assert dp.general_registries[registry_code] == core_id
+    assert dp.alu.zero == (core_id == 0)
+
+    with pytest.raises(RuntimeError) as e:
+        dp.memory_write(registry_code)
+    assert e.value.args[0] == f"Device {CORE_ID_ADDRESS} not connected"
+
+
 @pytest.mark.parametrize(
     ("zero", "negative"),
     [
@@ -270,4 +289,209 @@ def test_logging() -> None:
 
     state = dp.record_state()
     assert len(dp.last_io) == 0
-    assert state.dict() == data
+    assert dump(state) == data
+
+
+@pytest.mark.parametrize(
+    ("address", "size", "fits"),
+    [
+        pytest.param(IO_DEVICE_COUNT, 3, True, id="start"),
+        pytest.param(MAX_MEMORY_ADDRESS - 3, 3, True, id="end"),
+        pytest.param(IO_DEVICE_COUNT - 1, 3, False, id="devices"),
+        pytest.param(MAX_MEMORY_ADDRESS - 2, 3, False, id="outside"),
+    ],
+)
+def test_load_data(address: int, size: int, fits: bool) -> None:
+    dp: DataPath = create_data_path()
+    segment = DataSegment(address=address, values=list(range(1, size + 1)))
+    if fits:
+        dp.load_data([segment])
+        assert dp.data_memory[address : address + size] == segment.values
+    else:
+        with pytest.raises(IndexError):
+            dp.load_data([segment])
+
+
+@pytest.mark.parametrize("data", [[], [DataSegment(address=20, values=[1, 2])]])
+def test_program_format(data: list[DataSegment]) -> None:
+    program = Program(instructions=operations, data=data)
+    dumped = program.dump()
+    assert isinstance(dumped, list) is not bool(data)
+    assert parse_program(json.dumps(dumped)) == program
+
+
+def test_program_operands() -> None:
+    raw: str = json.dumps(
+        [
+            {"offset": 3},
+            {"code": "mov", "left": {"type": "value", "value": 5}},
+            {"code": "vadd", "source": 20, "operand": 30, "address": 40, "length": 2},
+            {
+                "code": "vadd",
+                "source": 20,
+                "operand": {"type": "registry", "code": "B"},
+                "address": 40,
+                "length": 2,
+            },
+        ]
+    )
+    assert parse_program(raw).instructions == [
+        JumpOperation(offset=3),
+        BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, left=Value(value=5)),
+        VectorOperation(
+            code=VectorOperation.Code.VECTOR_ADD,
+            source=20,
+            operand=30,
+            address=40,
+            length=2,
+        ),
+        VectorOperation(
+            code=VectorOperation.Code.VECTOR_ADD,
+            source=20,
+            operand=RB,
+            address=40,
+            length=2,
+        ),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("raw", "message"),
+    [
+        pytest.param("[1", "Invalid program: not a json", id="json"),
+        pytest.param(
+            '[{"code": "jb"}, {"code": "nop"}]',
+            "Invalid program at instructions[1].code: one of 'mov', ",
+            id="code",
+        ),
+        pytest.param(
+            '[{"code": "load"}]',
+            "Invalid program at instructions[0].address: missing field",
+            id="missing",
+        ),
+        pytest.param(
+            '[{"code": "jb", "offest": 1}]',
+            "Invalid program at instructions[0].offest: unknown field",
+            id="unknown",
+        ),
+        pytest.param(
+            '[{"code": "mov", "left": {"type": "value", "value": "5"}}]',
+            "Invalid program at instructions[0].left.value: an integer was expected",
+            id="integer",
+        ),
+        pytest.param(
+            '[{"code": "mov", "left": {"type": "number", "value": 5}}]',
+            "Invalid program at instructions[0].left: a registry or a value",
+            id="operand",
+        ),
+        pytest.param(
+            '{"data": [{"address": 20, "values": [1, null]}], "instructions": []}',
+            "Invalid program at data[0].values[1]: an integer was expected",
+            id="data",
+        ),
+        pytest.param("3", "Invalid program: a Program was expected", id="program"),
+    ],
+)
+def test_program_errors(raw: str, message: str) -> None:
+    with pytest.raises(ProgramError) as e:
+        parse_program(raw)
+    assert str(e.value).startswith(message)
+
+
+@pytest.mark.parametrize("value", ["true", "1.0"])
+def test_shared_operands(value: str) -> None:
+    one: str = '[{"code": "add", "left": {"type": "value", "value": 1}}]'
+    assert parse_program(one) == parse_program(one)
+    with pytest.raises(ProgramError) as e:
+        parse_program(one.replace("1}", value + "}"))
+    assert "an integer was expected" in str(e.value)
+
+
+@pytest.mark.parametrize(
+    ("source", "destination"),
+    [
+        pytest.param(20, 40, id="apart"),
+        pytest.param(20, 22, id="overlap_forward"),
+        pytest.param(22, 20, id="overlap_backward"),
+    ],
+)
+def test_block_copy(source: int, destination: int) -> None:
+    dp: DataPath = create_data_path()
+    values: list[int] = [randint(1, 100) for _ in range(5)]
+    dp.data_memory[source : source + 5] = values
+
+    dp.block_copy(source, destination, 5)
+    assert dp.data_memory[destination : destination + 5] == values
+    assert dp.counters.memory_reads == dp.counters.memory_writes == 5
+
+
+def test_block_fill_and_output(registry_code: Registry.Code) -> None:
+    dp: DataPath = create_data_path()
+    value: int = randint(1, 100)
+    dp.general_registries[registry_code] = value
+
+    dp.block_fill(IO_DEVICE_COUNT, 3, registry_code)
+    dp.block_output(IO_DEVICE_COUNT, 4, OUTPUT_ADDRESS)
+    assert dp.get_output() == [value, value, value, 0]
+    assert dp.last_io[OUTPUT_ADDRESS] == 0
+    assert dp.counters.memory_reads == 4
+    assert dp.counters.memory_writes == 7
+
+
+@pytest.mark.parametrize(
+    ("method", "arguments", "error"),
+    [
+        pytest.param(
+            DataPath.block_copy,
+            (IO_DEVICE_COUNT, MAX_MEMORY_ADDRESS - 1, 2),
+            IndexError,
+            id="copy_outside",
+        ),
+        pytest.param(
+            DataPath.block_copy, (0, IO_DEVICE_COUNT, 2), IndexError, id="copy_device"
+        ),
+        pytest.param(
+            DataPath.block_fill,
+            (IO_DEVICE_COUNT, -1, Registry.Code.ACCUMULATOR),
+            IndexError,
+            id="fill_negative",
+        ),
+        pytest.param(
+            DataPath.block_output,
+            (IO_DEVICE_COUNT, 2, IO_DEVICE_COUNT),
+            RuntimeError,
+            id="output_memory",
+        ),
+    ],
+)
+def test_block_fails(
+    method: Callable[..., None], arguments: tuple[Any, ...], error: type[Exception]
+) -> None:
+    dp: DataPath = create_data_path()
+    with pytest.raises(error):
+        method(dp, *arguments)
+    assert dp.get_output() == []
+
+
+@pytest.mark.parametrize(
+    ("operand", "sign", "expected"),
+    [
+        pytest.param(30, False, [-3, 3, 1], id="range"),  # wrapped like the ALU
+        pytest.param(30, True, [-1, 1, 1], id="sign"),
+        pytest.param(
+            Registry.Code.BUFFER, False, [0, 2, WORD_MAX_VALUE - 2], id="registry"
+        ),
+    ],
+)
+def test_vector_execute(
+    operand: int | Registry.Code, sign: bool, expected: list[int]
+) -> None:
+    dp: DataPath = create_data_path()
+    dp.general_registries[Registry.Code.BUFFER] = 2
+    dp.data_memory[20:23] = [2, 4, WORD_MAX_VALUE]
+    dp.data_memory[30:33] = [5, 1, -2]
+
+    dp.vector_execute(ALUOperation.SUB, 20, 20, operand, 3, sign=sign)
+    assert dp.data_memory[20:23] == expected
+    assert dp.counters.memory_reads == (6 if isinstance(operand, int) else 3)
+    assert dp.counters.memory_writes == 3
@@ -0,0 +1,47 @@
+from common.operations import RB, BinaryOperation, OperationBase
+from common.program import DataSegment, Program
+from executor.control import ControlUnit
+from executor.wiring import DataPath
+from translator.parser import Parser
+
+MAX_MEMORY_ADDRESS: int = 100
+
+
+def create_data_path(
+    instruction_memory: list[OperationBase] | None = None,
+    input_data: list[int] | None = None,
+) -> DataPath:
+    return DataPath(
+        data_memory_size=MAX_MEMORY_ADDRESS,
+        instruction_memory=instruction_memory or [],
+        input_data=input_data or [],
+    )
+
+
+operations: list[OperationBase] = [
+    BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, left=RB),
+    BinaryOperation(code=BinaryOperation.Code.MATH_ADD, left=RB),
+]
+
+
+def execute(
+    operations: list[OperationBase], data: list[DataSegment] | None = None
+) -> str:
+    """Output of a translated program, run with the stack room of ``execute``"""
+    program = Program(
+        instructions=operations,
+        data=data or [],
+    )
+    data_path = DataPath(
+        data_memory_size=MAX_MEMORY_ADDRESS + program.data_size,
+        instruction_memory=program.instructions,
+        input_data=[],
+    )
+    data_path.load_data(program.data)
+    ControlUnit(data_path).main()
+    return "".join(chr(i) for i in data_path.get_output())
+
+
+def to_text(source: str) -> str:
+    """Source with single spaces between symbols, as passes print it"""
+    return " ".join(symbol.text for symbol in Parser(source).result)
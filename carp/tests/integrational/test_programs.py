@@ -1,3 +1,4 @@
+import signal
 import subprocess
 from pathlib import Path
 
@@ -58,3 +59,181 @@ def test_one(
 
     with (".." / clog_path).open(encoding="utf-8") as f:
         assert f.read() == gold.out[f"{program_name}_clog"]
+
+
+@pytest.mark.parametrize(
+    ("program_name", "expected"),
+    [
+        pytest.param("hello", "Hello World", id="hello"),
+        pytest.param("prob2", "4613732", id="prob2"),
+    ],
+)
+def test_binary(tmp_path: Path, program_name: str, expected: str) -> None:
+    source_path: Path = EXAMPLE_FOLDER / f"{program_name}.carp"
+    executable_path: Path = tmp_path / f"{program_name}.curb"
+
+    check_output("translate", str(source_path), str(executable_path), "--format=binary")
+    assert executable_path.read_bytes().startswith(b"CURB")
+    assert check_output("execute", str(executable_path)) == expected
+
+
+@pytest.mark.parametrize(
+    ("program_name", "expected"),
+    [
+        pytest.param("hello", "Hello World", id="hello"),
+        pytest.param("prob2", "4613732", id="prob2"),
+    ],
+)
+def test_run(tmp_path: Path, program_name: str, expected: str) -> None:
+    source_path: Path = EXAMPLE_FOLDER / f"{program_name}.carp"
+    executable_path: Path = tmp_path / f"{program_name}.curb"
+
+    output: str = check_output(
+        "run", str(source_path), "-O2", "--save-program", str(executable_path)
+    )
+    assert output == expected
+    assert check_output("execute", str(executable_path)) == expected
+
+
+@pytest.mark.parametrize(
+    ("source", "args", "expected"),
+    [
+        pytest.param(
+            '(print "missing',
+            [],
+            "Parsing error occurred: Missing closing quotation mark",
+            id="parser",
+        ),
+        pytest.param(
+            "(foo 1)",
+            [],
+            "Translation error occurred at 1:0 ((foo): Unknown operation: 'foo'",
+            id="translator",
+        ),
+        pytest.param(
+            "(output 5000000000)",
+            ["--save-program", "program.curb"],
+            "Invalid program at instructions[0]: 5000000000 does not fit in a word",
+            id="save",
+        ),
+    ],
+)
+def test_run_errors(
+    tmp_path: Path, source: str, args: list[str], expected: str
+) -> None:
+    source_path: Path = tmp_path / "program.carp"
+    source_path.write_text(source + "\n", encoding="utf-8")
+    args = [str(tmp_path / arg) if arg.endswith(".curb") else arg for arg in args]
+
+    assert check_output("run", str(source_path), *args) == expected
+
+
+def test_run_timings(tmp_path: Path) -> None:
+    source_path: Path = EXAMPLE_FOLDER / "prob2.carp"
+    cache_path: Path = tmp_path / "cache"
+
+    def phases() -> list[str]:
+        process = subprocess.run(
+            ["python", "carp", "run", str(source_path), "--timings"]
+            + ["--cache-dir", str(cache_path)],
+            cwd="./..",
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert process.stdout.strip() == "4613732"
+        lines: list[str] = process.stderr.splitlines()
+        assert lines[0] == "Timings:"
+        return [line.split()[0] for line in lines[1:]]
+
+    assert phases() == ["read", "translate", "optimize", "execute", "total"]
+    assert phases() == ["read", "execute", "total"]
+
+
+def test_translate_uncached(tmp_path: Path) -> None:
+    source_path: Path = tmp_path / "program.carp"
+    executable_path: Path = tmp_path / "program.curp"
+    cache_path: Path = tmp_path / "cache"
+    source_path.write_text("(output 5000000000)\n", encoding="utf-8")
+
+    check_output("translate", str(source_path), str(executable_path))
+    expected: str = check_output("execute", str(executable_path))
+    output: str = check_output(
+        "translate",
+        str(source_path),
+        str(executable_path),
+        "--cache-dir",
+        str(cache_path),
+    )
+    assert "Compilation successful" in output
+    assert check_output("execute", str(executable_path)) == expected
+    assert not list(cache_path.iterdir())
+
+
+def imported_modules(*args: str) -> set[str]:
+    imports: str = subprocess.run(
+        ["python", "-X", "importtime", "carp", *args],
+        cwd="./..",
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    return {
+        line.rpartition("|")[2].strip()
+        for line in imports.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+@pytest.mark.parametrize(
+    ("args", "excluded"),
+    [
+        pytest.param(
+            ["execute", str(EXAMPLE_FOLDER / "hello.curp")],
+            ["pydantic", "translator.translator", "translator.passes"],
+            id="execute",
+        ),
+        pytest.param(
+            ["translate", str(EXAMPLE_FOLDER / "hello.carp"), "/dev/null"],
+            ["pydantic", "executor.control", "executor.wiring"],
+            id="translate",
+        ),
+        pytest.param(
+            ["--help"],
+            ["pydantic", "translator.translator", "common.binary"],
+            id="help",
+        ),
+    ],
+)
+def test_lazy_imports(args: list[str], excluded: list[str]) -> None:
+    modules: set[str] = imported_modules(*args)
+    assert "typer" in modules
+    assert not modules.intersection(excluded)
+
+
+def test_watch(tmp_path: Path) -> None:
+    source_path: Path = tmp_path / "program.carp"
+    executable_path: Path = tmp_path / "program.curb"
+    source_path.write_text("(assign x 2)\n(output x)\n", encoding="utf-8")
+    saved: str = f"result has been saved to {executable_path}\n"
+
+    watcher = subprocess.Popen(
+        ["python", "carp", "translate", str(source_path), "--watch", "-O1"]
+        + ["--format", "binary"],
+        cwd="./..",
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    assert watcher.stdout is not None
+    try:
+        assert watcher.stdout.readline().startswith("Watching")
+        assert watcher.stdout.readline() == "Compiled 2 of 2 forms, " + saved
+        assert check_output("execute", str(executable_path)) == "2"
+
+        source_path.write_text("(assign x 2)\n(output (* x 21))\n", encoding="utf-8")
+        assert watcher.stdout.readline() == "Compiled 1 of 2 forms, " + saved
+        assert check_output("execute", str(executable_path)) == "42"
+    finally:
+        watcher.send_signal(signal.SIGINT)
+        output: str = watcher.communicate(timeout=10)[0]
+    assert output == "Stopped watching\n"
@@ -0,0 +1,65 @@
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from common.errors import ProgramError
+from common.operations import JumpOperation
+from common.program import DataSegment, Program
+from translator.build_cache import BuildCache
+
+program = Program(
+    data=[DataSegment(address=20, values=[1, 2])],
+    instructions=[JumpOperation(offset=0)],
+)
+
+
+def test_key() -> None:
+    key: str = BuildCache.key("(output 1)", {"optimize": 0})
+    assert key == BuildCache.key("(output 1)", {"optimize": 0})
+    assert key != BuildCache.key("(output 2)", {"optimize": 0})
+    assert key != BuildCache.key("(output 1)", {"optimize": 1})
+
+
+def test_get_put(tmp_path: Path) -> None:
+    cache = BuildCache(tmp_path / "cache", limit=1 << 20)
+    assert cache.get("key") is None
+
+    cache.put("key", program)
+    assert cache.get("key") == program
+    assert [path.name for path in cache.directory.iterdir()] == ["key.curb"]
+
+
+def test_broken_entry(tmp_path: Path) -> None:
+    cache = BuildCache(tmp_path, limit=1 << 20)
+    cache.path("key").write_bytes(b"CURB")
+    assert cache.get("key") is None
+    assert not cache.path("key").exists()
+
+
+def test_eviction(tmp_path: Path) -> None:
+    cache = BuildCache(tmp_path, limit=1 << 20)
+    for number, key in enumerate(["old", "used", "new"]):
+        cache.put(key, program)
+        os.utime(cache.path(key), (number, number))
+    size: int = cache.path("old").stat().st_size
+
+    assert cache.get("used") == program  # becomes the most recently used
+    cache.limit = 2 * size
+    cache.evict()
+    assert sorted(path.stem for path in tmp_path.iterdir()) == ["new", "used"]
+
+
+def test_failed_put(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = BuildCache(tmp_path, limit=1 << 20)
+    with pytest.raises(ProgramError):
+        cache.put("key", Program(instructions=[JumpOperation(offset=2**31)]))
+
+    def fail(*args: Any) -> None:
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        cache.put("key", program)
+    assert not list(tmp_path.iterdir())
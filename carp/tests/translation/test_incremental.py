@@ -0,0 +1,65 @@
+import pytest
+
+from common.errors import TranslationError
+from common.program import Program
+from translator.incremental import IncrementalTranslator
+from translator.reader import Reader
+from translator.translator import Translator
+
+SOURCE: str = """
+(assign x 5)
+(print "x is ")
+(output x)
+(array arr 3)
+(set arr 1 (+ x 2))
+(loop (> x 0) (block (assign x (- x 1)) (output (get arr 1))))
+"""
+
+
+def translate(source: str, shared_runtime: bool) -> Program:
+    translator = Translator(Reader(source), shared_runtime=shared_runtime)
+    translator.translate_blocks()
+    return Program(instructions=translator.result, data=translator.data)
+
+
+@pytest.mark.parametrize("shared_runtime", [False, True])
+@pytest.mark.parametrize(
+    ("edited", "translated"),
+    [
+        pytest.param(SOURCE, 0, id="same"),
+        pytest.param(SOURCE.replace("(> x 0)", "(> x 1)"), 1, id="last"),
+        pytest.param(SOURCE.replace('"x is "', '"value: "'), 5, id="string"),
+        pytest.param(SOURCE.replace("arr 3", "arr 4"), 3, id="array"),
+        pytest.param("(assign y 1)\n" + SOURCE, 7, id="first"),
+        pytest.param(SOURCE + "(output (+ x 1))", 1, id="appended"),
+        pytest.param(SOURCE.rpartition("(loop")[0], 0, id="removed"),
+        pytest.param(SOURCE.replace(")\n(array", ") (array"), 4, id="same_line"),
+        pytest.param(SOURCE.replace("(set", "\n\n(set"), 2, id="lines"),
+    ],
+)
+def test_update(shared_runtime: bool, edited: str, translated: int) -> None:
+    incremental = IncrementalTranslator(shared_runtime=shared_runtime)
+    assert incremental.update(SOURCE) == translate(SOURCE, shared_runtime)
+    assert incremental.translated == incremental.forms == 6
+
+    assert incremental.update(edited) == translate(edited, shared_runtime)
+    assert incremental.translated == translated
+    assert incremental.update(SOURCE) == translate(SOURCE, shared_runtime)
+
+
+@pytest.mark.parametrize(
+    ("broken", "message"),
+    [
+        pytest.param("(output (+ x y))", "Variable 'y' is not defined", id="variable"),
+        pytest.param("(output (+ x 1)", "Missing closing bracket", id="bracket"),
+    ],
+)
+def test_error(broken: str, message: str) -> None:
+    incremental = IncrementalTranslator(shared_runtime=True)
+    incremental.update(SOURCE)
+    with pytest.raises(TranslationError) as e:
+        incremental.update(SOURCE.replace("(output x)", broken))
+    assert str(e.value) == message
+
+    assert incremental.update(SOURCE) == translate(SOURCE, shared_runtime=True)
+    assert incremental.translated == 4
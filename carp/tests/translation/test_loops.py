@@ -0,0 +1,245 @@
+import pytest
+from tests.helpers import execute, to_text
+
+from common.errors import TranslationError
+from translator.forms import Expression, flatten, read_forms
+from translator.loops import estimate_size, hoist_invariants, unroll_loops
+from translator.parser import Parser
+from translator.reader import Reader
+from translator.translator import Translator
+from translator.variables import VariableIndex
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        pytest.param("(+ 1 (* 2 3)) (output 4)", id="normal"),
+        pytest.param(") (+ 1 2))", id="extra_closing"),
+        pytest.param("(+ 1 (* 2 3", id="missing_closing"),
+        pytest.param('(print "(hello)")', id="quoted"),
+    ],
+)
+def test_forms_roundtrip(source: str) -> None:
+    symbols = Parser(source).result
+    assert list(flatten(read_forms(symbols))) == symbols
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        pytest.param(
+            "(loop (< i n) (assign i (+ i (* n 2))))",
+            "(block (assign $0 (* n 2)) (loop (< i n) (assign i (+ i $0))))",
+            id="simple",
+        ),
+        pytest.param(
+            "(loop (< i (+ n 1)) (assign i (+ i (+ n 1))))",
+            "(block (assign $0 (+ n 1)) (loop (< i $0) (assign i (+ i $0))))",
+            id="reused",
+        ),
+        pytest.param(
+            "(loop (< i n) (block (assign i (+ i 1)) (output (/ n 2))))",
+            "(block (assign $0 (/ n 2)) "
+            + "(loop (< i n) (block (assign i (+ i 1)) (output $0))))",
+            id="division",
+        ),
+        pytest.param(
+            "(loop (< i n) (block (assign i (+ i 1)) (output (/ n k))))",
+            "(loop (< i n) (block (assign i (+ i 1)) (output (/ n k))))",
+            id="unsafe_division",
+        ),
+        pytest.param(
+            "(loop (< i n) (block (assign i (+ i 1)) (output (+ n (input)))))",
+            "(loop (< i n) (block (assign i (+ i 1)) (output (+ n (input)))))",
+            id="impure",
+        ),
+        pytest.param(
+            "(loop (< i n) (if (- n 1) (assign i (+ i 1))))",
+            "(loop (< i n) (if (- n 1) (assign i (+ i 1))))",
+            id="bare_condition",
+        ),
+        pytest.param(
+            "(loop (< i n) (block (assign j 0) (loop (< j n) (block "
+            + "(assign j (+ j (* i 2) (- n 1))))) (assign i (+ i 1))))",
+            "(block (assign $0 (- n 1)) (loop (< i n) (block (assign j 0) "
+            + "(block (assign $1 (* i 2)) (loop (< j n) (block "
+            + "(assign j (+ j $1 $0))))) (assign i (+ i 1)))))",
+            id="nested",
+        ),
+    ],
+)
+def test_hoist_invariants(source: str, expected: str) -> None:
+    forms = hoist_invariants(list(read_forms(Parser(source).result)), VariableIndex())
+    assert " ".join(symbol.text for symbol in flatten(forms)) == to_text(expected)
+
+
+def test_temporaries() -> None:
+    variables = VariableIndex()
+    variables.register("var")
+    name = variables.allocate_temporary()
+    assert variables.bad_name("$1")
+    assert variables.bad_name(name)  # users can't read or change temporaries
+    with pytest.raises(TranslationError):
+        variables.register(name)
+    location: int = variables.read(name, temporary=True).location
+    assert location == variables.read("var").location + 1
+    assert variables.allocate_temporary() != name
+
+
+@pytest.mark.parametrize("usage", ["(output $0)", "(assign $0 1)"])
+def test_temporaries_in_source(usage: str) -> None:
+    translator = Translator(
+        Reader(f"(assign i 0) (assign n 3) (loop (< i n) (output (* n 2))) {usage}")
+    )
+    forms = hoist_invariants(
+        list(read_forms(translator.reader.symbols)), translator.variables
+    )
+    assert "$0" in translator.variables.temporaries
+    translator.reader.symbols = list(flatten(forms))
+    with pytest.raises(TranslationError) as e:
+        translator.translate_blocks()
+    assert str(e.value) == "Unsupported variable name: '$0'"
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_hoisted_execution(optimize: bool) -> None:
+    source: str = """
+    (assign n 7) (assign k 3) (assign i 0) (assign s 0)
+    (loop (< i (* n k)) (block
+      (assign s (+ s (* (+ n 1) (% k 2)) i))
+      (assign j 0)
+      (loop (< j 3) (block (assign s (+ s (* i 2) (- n k))) (assign j (+ j 1))))
+      (assign i (+ i 1))))
+    (output s)
+    """
+    translator = Translator(Reader(source))
+    if optimize:
+        forms = hoist_invariants(
+            list(read_forms(translator.reader.symbols)), translator.variables
+        )
+        translator.reader.symbols = list(flatten(forms))
+    translator.translate_blocks()
+    assert execute(translator.result) == "1890\n"
+
+
+@pytest.mark.parametrize(
+    ("source", "factor", "expected"),
+    [
+        pytest.param(
+            "(loop (< i 10) (block (output i) (assign i (+ i 1))))",
+            2,
+            "(block (loop (< i 9) (block (output i) (assign i (+ i 1)) "
+            + "(output i) (assign i (+ i 1)))) "
+            + "(loop (< i 10) (block (output i) (assign i (+ i 1)))))",
+            id="simple",
+        ),
+        pytest.param(
+            "(loop (> 10 i) (assign i (+ 2 i)))",
+            3,
+            "(block (loop (< i 6) (block (assign i (+ 2 i)) (assign i (+ 2 i)) "
+            + "(assign i (+ 2 i)))) (loop (> 10 i) (assign i (+ 2 i))))",
+            id="swapped",
+        ),
+        pytest.param(
+            "(loop (>= i 0) (assign i (- i 5)))",
+            2,
+            "(block (loop (>= i 5) (block (assign i (- i 5)) (assign i (- i 5)))) "
+            + "(loop (>= i 0) (assign i (- i 5))))",
+            id="down",
+        ),
+        pytest.param(
+            "(loop (< i 10) (if (< s 5) (assign i (+ i 1))))",
+            2,
+            "(loop (< i 10) (if (< s 5) (assign i (+ i 1))))",
+            id="conditional_step",
+        ),
+        pytest.param(
+            "(loop (< i 10) (block (assign i (+ i 1)) (assign i (+ i 1))))",
+            2,
+            "(loop (< i 10) (block (assign i (+ i 1)) (assign i (+ i 1))))",
+            id="two_steps",
+        ),
+        pytest.param(
+            "(loop (< i 10) (assign i (- i 1)))",
+            2,
+            "(loop (< i 10) (assign i (- i 1)))",
+            id="wrong_direction",
+        ),
+        pytest.param(
+            "(loop (< i n) (assign i (+ i 1)))",
+            2,
+            "(loop (< i n) (assign i (+ i 1)))",
+            id="variable_limit",
+        ),
+        pytest.param(
+            "(loop (< i 10) (assign i (+ i 1)))",
+            1,
+            "(loop (< i 10) (assign i (+ i 1)))",
+            id="disabled",
+        ),
+    ],
+)
+def test_unroll_loops(source: str, factor: int, expected: str) -> None:
+    forms = unroll_loops(
+        list(read_forms(Parser(source).result)), VariableIndex(), factor, budget=256
+    )
+    assert " ".join(symbol.text for symbol in flatten(forms)) == to_text(expected)
+
+
+@pytest.mark.parametrize(("bodies", "copies"), [(0, 1), (1, 1), (3, 3), (100, 8)])
+def test_unroll_budget(bodies: int, copies: int) -> None:
+    source: str = "(loop (< i 100) (block (output (* i i)) (assign i (+ i 1))))"
+    forms = list(read_forms(Parser(source).result))
+    assert isinstance(forms[0], Expression)
+    size = estimate_size(forms[0].arguments[1], VariableIndex())
+    assert size is not None
+
+    forms = unroll_loops(forms, VariableIndex(), 8, budget=size * bodies + 1)
+    text: str = " ".join(symbol.text for symbol in flatten(forms))
+    assert text.count("output") == (copies + 1 if copies > 1 else 1)
+
+
+def test_estimate_size() -> None:
+    source: str = '(block (output (* i i)) (print (get arr i)) (print "ab"))'
+    form = next(read_forms(Parser(source).result))
+    variables = VariableIndex()
+    variables.register("i")
+    mark: tuple[int, int] = variables.mark()
+
+    inline = estimate_size(form, variables)
+    shared = estimate_size(form, variables, shared_runtime=True)
+    assert inline is not None and shared is not None
+    assert shared < inline  # the number output is a call to the shared routine
+    assert variables.mark() == mark
+    assert "arr" not in variables.arrays
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_unrolled_execution(optimize: bool) -> None:
+    source: str = """
+    (assign i 0) (assign s 0)
+    (loop (< i 103) (block (assign s (+ s (* i i))) (assign i (+ i 2))))
+    (output s)
+    (loop (> i 3) (assign i (- i 7)))
+    (output i)
+    """
+    translator = Translator(Reader(source))
+    if optimize:
+        forms = unroll_loops(
+            list(read_forms(translator.reader.symbols)), translator.variables, 4, 256
+        )
+        translator.reader.symbols = list(flatten(forms))
+    translator.translate_blocks()
+    assert execute(translator.result) == "182104\n-1\n"
+
+
+def test_unrolled_arrays() -> None:
+    source: str = (
+        "(loop (< i 10) (block (set arr i (get arr (- 9 i))) (assign i (+ i 1))))"
+    )
+    forms = list(read_forms(Parser(source).result))
+    assert isinstance(forms[0], Expression)
+    assert estimate_size(forms[0].arguments[1], VariableIndex()) is not None
+
+    forms = unroll_loops(forms, VariableIndex(), 2, budget=256)
+    assert " ".join(symbol.text for symbol in flatten(forms)).count("(set") == 3
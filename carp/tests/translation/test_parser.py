@@ -1,9 +1,10 @@
+import itertools
 import random
 from collections.abc import Iterator
 
 import pytest
 
-from translator.parser import Symbol, ParserError, Parser
+from translator.parser import Symbol, ParserError, Parser, split_point
 
 
 def _randomize_spaces(string: str) -> Iterator[str]:
@@ -82,6 +83,88 @@ def test_symbols(
 )
 def test_errors(source: str, exception_text: str) -> None:
     with pytest.raises(ParserError) as e:
-        Parser(source)
+        Parser(source).result
 
     assert str(e.value) == exception_text
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        pytest.param("(output 1)", [(1, 0), (1, 8), (1, 10)], id="brackets_after"),
+        pytest.param(
+            "a\n  (b))\nc", [(1, 0), (2, 2), (2, 5), (2, 6), (3, 0)], id="lines"
+        ),
+        pytest.param('"a\nb" c', [(1, 0), (2, 3)], id="quoted_line"),
+        pytest.param('("x)" y)', [(1, 0), (1, 6), (1, 8)], id="quoted_bracket"),
+    ],
+)
+def test_positions(source: str, expected: list[tuple[int, int]]) -> None:
+    real: list[Symbol] = Parser(source).result
+    assert [(symbol.line, symbol.char) for symbol in real] == expected
+
+
+def test_symbol_equality() -> None:
+    assert Symbol(text="a", line=1, char=2) == Symbol(text="a", line=1, char=2)
+    assert Symbol(text="a", line=1, char=2) != Symbol(text="a", line=1, char=3)
+    assert Symbol(text="a", line=1, char=2).as_dict() == {
+        "text": "a",
+        "line": 1,
+        "char": 2,
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, 1000])
+@pytest.mark.parametrize(
+    "source",
+    [
+        pytest.param(
+            '(print "hello\n world")\n(assign a (+ 1 2))\n\t(output a))', id="lines"
+        ),
+        pytest.param(
+            '(print "hello world") (assign a (+ 1 2))\t(output a))', id="single_line"
+        ),
+    ],
+)
+def test_chunks(chunk_size: int, source: str) -> None:
+    chunks: list[str] = [
+        source[i : i + chunk_size] for i in range(0, len(source), chunk_size)
+    ]
+    assert Parser(chunks).result == Parser(source).result
+
+
+@pytest.mark.parametrize(
+    ("chunk", "quoted", "expected"),
+    [
+        pytest.param('(a "b\n c")\n(d', False, (11, False), id="closed"),
+        pytest.param('b\n c")\n(d "e\n', True, (10, True), id="continued"),
+        pytest.param("(a b) (c", False, (6, False), id="single_line"),
+        pytest.param('"b\n c', False, (0, True), id="opened"),
+        pytest.param("(a\n", True, (0, True), id="quoted"),
+    ],
+)
+def test_split_point(chunk: str, quoted: bool, expected: tuple[int, bool]) -> None:
+    assert split_point(chunk, quoted) == expected
+
+
+def test_unclosed_chunks() -> None:
+    source: str = '(output 1)\n(print "missing\n' + "(output 2)\n" * 100
+    chunks: list[str] = [source[i : i + 7] for i in range(0, len(source), 7)]
+    with pytest.raises(ParserError) as e:
+        list(Parser(chunks))
+    with pytest.raises(ParserError) as expected:
+        list(Parser(source))
+    assert str(e.value) == str(expected.value)
+
+
+def test_lazy_chunks() -> None:
+    symbols: Iterator[Symbol] = iter(Parser(itertools.repeat("(output 1) ")))
+    assert [next(symbols).text for _ in range(4)] == ["(output", "1", ")", "(output"]
+    assert next(symbols).char == 19
+
+
+def test_lazy() -> None:
+    symbols: Iterator[Symbol] = iter(Parser('(output 1) "missing'))
+    assert next(symbols).text == "(output"
+    with pytest.raises(ParserError):
+        list(symbols)
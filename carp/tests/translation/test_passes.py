@@ -0,0 +1,239 @@
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+from tests.helpers import create_data_path, execute
+
+from common.constants import OPTIMIZATION_LEVELS
+from common.operations import (
+    RA,
+    RB,
+    BinaryOperation,
+    IndexedMemoryOperation,
+    JumpOperation,
+    MemoryOperation,
+    OperationBase,
+    SubroutineOperation,
+    Value,
+)
+from executor.control import ControlUnit
+from translator.passes import PassManager, create_operation_passes
+from translator.peephole import (
+    invert_branches,
+    remove_operations,
+    remove_redundant_loads,
+    remove_unreachable,
+    thread_jumps,
+)
+from translator.reader import Reader
+from translator.translator import Translator
+
+EXAMPLE_FOLDER: Path = Path("../examples")
+
+
+def jump(
+    offset: int, code: JumpOperation.Code = JumpOperation.Code.JUMP_BECAUSE
+) -> JumpOperation:
+    return JumpOperation(code=code, offset=offset)
+
+
+def move(value: int) -> BinaryOperation:
+    return BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, left=Value(value=value))
+
+
+def memory(code: MemoryOperation.Code, address: int = 16) -> MemoryOperation:
+    return MemoryOperation(code=code, address=address)
+
+
+LOAD: MemoryOperation.Code = MemoryOperation.Code.LOAD_MEMORY
+SAVE: MemoryOperation.Code = MemoryOperation.Code.SAVE_MEMORY
+SAVEI: IndexedMemoryOperation.Code = IndexedMemoryOperation.Code.SAVE_INDEXED
+
+
+@pytest.mark.parametrize("level", OPTIMIZATION_LEVELS)
+def test_manager_levels(level: int) -> None:
+    manager: PassManager[list[int]] = PassManager(level, disabled=["disabled"])
+    manager.register("first", lambda program: program[1:], level=1)
+    manager.register("second", lambda program: program[1:], level=2)
+    manager.register("disabled", lambda program: program[1:], level=0)
+
+    assert manager.run([1, 2, 3]) == [1, 2, 3][level:]
+
+    for i, record in enumerate(manager.stats[:2], start=1):
+        assert record.enabled == (level >= i)
+        if record.enabled:
+            assert record.size_before == 4 - i
+            assert record.delta == -1
+            assert record.time >= 0
+        else:
+            assert record.time == 0
+            assert "skipped" in str(record)
+    assert not manager.stats[2].enabled
+
+
+def test_level_zero() -> None:
+    operations: list[OperationBase] = [jump(0), jump(-2)]
+    manager = create_operation_passes(0)
+    assert manager.run(operations) == operations
+    assert not any(record.enabled for record in manager.stats)
+
+
+def test_remove_operations() -> None:
+    operations: list[OperationBase] = [
+        jump(3),
+        move(1),
+        move(2),
+        move(3),
+        jump(-4),
+        jump(-6),
+    ]
+    result = remove_operations(operations, {1, 3})
+    assert result == [jump(1), move(2), jump(-2), jump(-4)]
+
+
+def test_thread_jumps() -> None:
+    operations: list[OperationBase] = [
+        jump(1, JumpOperation.Code.JUMP_ZERO),
+        jump(2),
+        jump(1),
+        jump(-1),
+        jump(-2),
+    ]
+    result = thread_jumps(operations)
+    assert result == [
+        jump(2, JumpOperation.Code.JUMP_ZERO),
+        jump(1),
+        jump(0),
+        jump(-1),
+        jump(-2),
+    ]
+
+
+def test_invert_branches() -> None:
+    operations: list[OperationBase] = [
+        jump(1, JumpOperation.Code.JUMP_NEGATIVE),
+        jump(3),
+        move(1),
+        jump(1, JumpOperation.Code.JUMP_ZERO),
+        jump(-5),
+        move(2),
+        jump(1, JumpOperation.Code.JUMP_ZERO),
+        jump(1),
+        jump(-2),
+    ]
+    assert invert_branches(operations) == [
+        jump(2, JumpOperation.Code.JUMP_NOT_NEGATIVE),
+        move(1),
+        jump(-3, JumpOperation.Code.JUMP_NOT_ZERO),
+        move(2),
+        jump(1, JumpOperation.Code.JUMP_ZERO),
+        jump(1),
+        jump(-2),
+    ]
+
+
+def test_unreachable_routines() -> None:
+    call = SubroutineOperation(code=SubroutineOperation.Code.CALL, offset=2)
+    ret = SubroutineOperation(code=SubroutineOperation.Code.RETURN)
+    operations: list[OperationBase] = [
+        call,
+        jump(0),
+        jump(4),
+        move(1),
+        ret,
+        move(2),
+        ret,
+    ]
+    assert remove_unreachable(operations) == [
+        replace(call, offset=1),
+        jump(2),
+        move(1),
+        ret,
+    ]
+
+
+def test_remove_unreachable() -> None:
+    operations: list[OperationBase] = [
+        jump(1, JumpOperation.Code.JUMP_NEGATIVE),
+        jump(2),
+        move(1),
+        jump(0),
+        move(2),
+        jump(1),
+        move(3),
+    ]
+    assert remove_unreachable(operations) == [
+        jump(1, JumpOperation.Code.JUMP_NEGATIVE),
+        jump(1),
+        move(1),
+        move(2),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("operations", "removed"),
+    [
+        pytest.param([memory(SAVE), memory(LOAD), move(1)], True, id="after_save"),
+        pytest.param([memory(LOAD), memory(LOAD)], True, id="after_load"),
+        pytest.param(
+            [memory(SAVE), IndexedMemoryOperation(code=SAVEI), memory(LOAD)],
+            False,
+            id="indexed_saved",
+        ),
+        pytest.param(
+            [memory(SAVE), memory(SAVE, 17), memory(LOAD)], True, id="other_saved"
+        ),
+        pytest.param([memory(SAVE), memory(LOAD), jump(1)], False, id="flags_used"),
+        pytest.param([memory(SAVE), move(1), memory(LOAD)], False, id="overwritten"),
+        pytest.param([memory(SAVE), jump(0), memory(LOAD)], False, id="jump_target"),
+        pytest.param([memory(SAVE, 1), memory(LOAD, 1)], False, id="io_device"),
+        pytest.param(
+            [
+                memory(LOAD),
+                BinaryOperation(code=BinaryOperation.Code.MOVE_DATA, right=RB, left=RA),
+                MemoryOperation(code=SAVE, right=RB, address=16),
+                memory(LOAD),
+            ],
+            False,
+            id="saved_by_other",
+        ),
+    ],
+)
+def test_redundant_loads(operations: list[OperationBase], removed: bool) -> None:
+    result = remove_redundant_loads(operations)
+    assert len(result) == len(operations) - removed
+
+
+@pytest.mark.parametrize("level", OPTIMIZATION_LEVELS)
+@pytest.mark.parametrize("program_name", ["hello", "prob2", "many", "sort"])
+def test_optimized_programs(level: int, program_name: str) -> None:
+    source_path: Path = EXAMPLE_FOLDER / f"{program_name}.carp"
+    translator = Translator(Reader(source_path.read_text(encoding="utf-8")))
+    translator.translate_blocks()
+
+    expected: str = execute(translator.result)
+    optimized = create_operation_passes(level).run(translator.result)
+    assert len(optimized) <= len(translator.result)
+    assert execute(optimized) == expected
+
+
+@pytest.mark.parametrize("level", [0, 1])
+@pytest.mark.parametrize("program_name", ["prob2", "sort"])
+def test_fusion_unchanged(level: int, program_name: str) -> None:
+    source_path: Path = EXAMPLE_FOLDER / f"{program_name}.carp"
+    translator = Translator(Reader(source_path.read_text(encoding="utf-8")))
+    translator.translate_blocks()
+    operations = create_operation_passes(level).run(translator.result)
+
+    plain = ControlUnit(create_data_path(operations), fusion=False)
+    plain.main()
+    fused = ControlUnit(create_data_path(operations), fusion=True)
+    fused.main()
+    assert fused.log == plain.log
+    assert fused.data_path.counters == plain.data_path.counters
+
+
+def test_operands_unchanged() -> None:
+    operations: list[OperationBase] = [move(1), memory(SAVE), memory(LOAD), move(2)]
+    assert remove_redundant_loads(operations) == [move(1), memory(SAVE), move(2)]
+    assert operations[1] == MemoryOperation(code=SAVE, right=RA, address=16)
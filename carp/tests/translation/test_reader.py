@@ -1,3 +1,5 @@
+from collections.abc import Iterator
+
 import pytest
 
 from common.errors import TranslationError
@@ -61,3 +63,38 @@ def test_reader(source: str, expression: bool, closing: bool) -> None:
 
     assert reader.current_or_none() is None
     assert reader.next_or_none() is None
+
+
+def test_streaming() -> None:
+    read: list[str] = []
+
+    def chunks() -> Iterator[str]:
+        for line in ["(output 1)\n", "(output 2)\n", "(output 3)\n"]:
+            read.append(line)
+            yield line
+
+    reader = Reader(chunks())
+    assert reader.next_expression().text == "(output"
+    assert len(read) == 1
+
+    for _ in range(3):
+        reader.next_or_closing()
+    assert reader.position == 4
+    reader.back()
+    reader.back()
+    assert reader.position == 2
+    assert reader.current_or_closing().text == ")"
+    with pytest.raises(IndexError):
+        reader.back()
+
+    assert [symbol.text for symbol in reader.symbols] == [
+        ")",
+        "(output",
+        "2",
+        ")",
+        "(output",
+        "3",
+        ")",
+    ]
+    reader.next_closing()
+    assert reader.next_expression().text == "(output"
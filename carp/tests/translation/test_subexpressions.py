@@ -0,0 +1,112 @@
+import pytest
+from tests.helpers import execute, to_text
+
+from common.operations import OperationBase
+from translator.forms import flatten, read_forms
+from translator.parser import Parser
+from translator.passes import create_form_passes, optimize_symbols
+from translator.reader import Reader
+from translator.subexpressions import eliminate_subexpressions
+from translator.translator import Translator
+from translator.variables import VariableIndex
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        pytest.param(
+            "(block (output (+ a b)) (output (+ a b)))",
+            "(block (output (assign $0 (+ a b))) (output $0))",
+            id="simple",
+        ),
+        pytest.param(
+            "(output (* (+ a b) (+ a b)))",
+            "(output (* (assign $0 (+ a b)) $0))",
+            id="same_form",
+        ),
+        pytest.param(
+            "(block (output (+ a b)) (assign a 1) (output (+ a b)))",
+            "(block (output (+ a b)) (assign a 1) (output (+ a b)))",
+            id="killed",
+        ),
+        pytest.param(
+            "(block (output (+ a b)) (assign c 1) (output (+ a b)))",
+            "(block (output (assign $0 (+ a b))) (assign c 1) (output $0))",
+            id="not_killed",
+        ),
+        pytest.param(
+            "(block (output (* (+ a b) 2)) (output (+ a b)) (output (* (+ a b) 2)))",
+            "(block (output (assign $0 (* (assign $1 (+ a b)) 2))) "
+            + "(output $1) (output $0))",
+            id="nested",
+        ),
+        pytest.param(
+            "(block (output (+ a b)) (if (< a (+ a b)) (output (+ a b))))",
+            "(block (output (assign $0 (+ a b))) (if (< a $0) (output $0)))",
+            id="reused_in_construct",
+        ),
+        pytest.param(
+            "(block (if (< a 1) (output (+ a b))) (output (+ a b)))",
+            "(block (if (< a 1) (output (+ a b))) (output (+ a b)))",
+            id="first_in_construct",
+        ),
+        pytest.param(
+            "(block (output (+ a b)) (if (< a 1) (assign a 2)) (output (+ a b)))",
+            "(block (output (+ a b)) (if (< a 1) (assign a 2)) (output (+ a b)))",
+            id="killed_in_construct",
+        ),
+        pytest.param(
+            "(block (output (+ a b)) (if (+ a b) (output 1)))",
+            "(block (output (+ a b)) (if (+ a b) (output 1)))",
+            id="bare_condition",
+        ),
+        pytest.param(
+            "(loop (< i 1) (block (assign i (* i 2)) (output (* i 2))))",
+            "(loop (< i 1) (block (assign i (* i 2)) (output (* i 2))))",
+            id="loop_scope",
+        ),
+        pytest.param(
+            "(loop (< i 1) (block (output (* i 2)) (assign i (* i 2))))",
+            "(loop (< i 1) (block (output (assign $0 (* i 2))) (assign i $0)))",
+            id="loop_body",
+        ),
+        pytest.param(
+            "(block (output (+ a (input))) (output (+ a (input))))",
+            "(block (output (+ a (input))) (output (+ a (input))))",
+            id="impure",
+        ),
+    ],
+)
+def test_eliminate_subexpressions(source: str, expected: str) -> None:
+    forms = eliminate_subexpressions(
+        list(read_forms(Parser(source).result)), VariableIndex()
+    )
+    assert " ".join(symbol.text for symbol in flatten(forms)) == to_text(expected)
+
+
+def translate(source: str, level: int) -> list[OperationBase]:
+    translator = Translator(Reader(source))
+    passes = create_form_passes(translator.variables, level)
+    translator.reader.symbols = optimize_symbols(translator.reader.symbols, passes)
+    translator.translate_blocks()
+    return translator.result
+
+
+def test_optimized_execution() -> None:
+    source: str = """
+    (assign a 5) (assign b 7) (assign i 0)
+    (loop (< i 10) (block
+      (output (+ (% (+ a i) 3) (* b 2)))
+      (if (= (% (+ a i) 3) 0) (print "z") (output (* (% (+ a i) 3) (* b 2))))
+      (assign a (+ a 1))
+      (output (+ a i))
+      (assign i (+ i 1))))
+    """
+    plain, optimized = translate(source, level=0), translate(source, level=2)
+    assert execute(optimized) == execute(plain)
+    assert len(optimized) < len(plain)
+
+
+def test_reused_in_registry_b() -> None:
+    source: str = "(assign a 1) (assign b 2) (output (+ 10 (+ a b) (+ a b)))"
+    assert execute(translate(source, level=2)) == "16\n"
@@ -2,17 +2,27 @@ import json
 from collections.abc import Callable
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, TypedDict
 
 import pytest
 from pytest_golden.plugin import (  # type: ignore
     GoldenTestFixtureFactory,
     GoldenTestFixture,
 )
+from tests.helpers import execute
 
-from common.constants import INPUT_ADDRESS, OUTPUT_ADDRESS
+from common.constants import CORE_ID_ADDRESS, INPUT_ADDRESS, OUTPUT_ADDRESS
 from common.errors import TranslationError
-from common.operations import OPERATOR_TO_CODE, BinaryOperation, Value
+from common.operations import (
+    OPERATOR_TO_CODE,
+    BinaryOperation,
+    BlockOperation,
+    IndexedMemoryOperation,
+    SubroutineOperation,
+    Value,
+    VectorOperation,
+)
+from common.serialization import dump
 from translator.comparators import SYMBOL_TO_COMPARATOR
 from translator.parser import Symbol
 from translator.reader import Reader
@@ -35,8 +45,13 @@ def char(request: FixtureRequest) -> int:
     return request.param
 
 
+class Position(TypedDict):
+    line: int
+    char: int
+
+
 @pytest.fixture
-def position(line: int, char: int) -> dict[str, int]:
+def position(line: int, char: int) -> Position:
     return {"line": line, "char": char}
 
 
@@ -53,9 +68,7 @@ def translator(reader: Reader) -> Translator:
 
 
 @pytest.fixture
-def assert_debug_symbol(
-    position: dict[str, int], reader: Reader
-) -> Callable[[str], None]:
+def assert_debug_symbol(position: Position, reader: Reader) -> Callable[[str], None]:
     def assert_debug_symbol_inner(expected_text: str) -> None:
         reader.back()
         debug_symbol: Symbol = reader.current_or_closing()
@@ -94,6 +107,14 @@ translated_arguments: dict[str, tuple[list[str], dict[str, Any]]] = {
             "address": INPUT_ADDRESS,
         },
     ),
+    "core": (
+        ["(core", ")"],
+        {
+            "code": "load",
+            "right": {"type": "registry", "code": "A"},
+            "address": CORE_ID_ADDRESS,
+        },
+    ),
 }
 
 
@@ -119,13 +140,13 @@ def test_arguments(
 
     real = translator.result
     assert len(real) == 2
-    assert json.loads(real[0].json()) == expected
+    assert dump(real[0]) == expected
     assert real[1] == additional_operation
 
 
 def test_deny_strings(
     translator: Translator,
-    position: dict[str, int],
+    position: Position,
     assert_debug_symbol: Callable[[str], None],
 ) -> None:
     symbol_text: str = '"hello"'
@@ -201,7 +222,7 @@ def test_operators(
     ]
     translator.translate_valuable(stack=stack)
 
-    real = [json.loads(operation.json()) for operation in translator.result]
+    real = [dump(operation) for operation in translator.result]
 
     if stack:
         common = {"type": "registry", "code": "B"}
@@ -231,7 +252,7 @@ def test_commands(translator: Translator, command: list[str], address: int) -> N
     ]
     translator.translate_valuable()
 
-    real = [json.loads(operation.json()) for operation in translator.result]
+    real = [dump(operation) for operation in translator.result]
     assert len(real) == 2
     assert real[1] == {
         "code": "save",
@@ -249,7 +270,7 @@ def test_output(golden: GoldenTestFixtureFactory, translator: Translator) -> Non
     ]
     translator.translate_valuable()
 
-    real = [json.loads(operation.json()) for operation in translator.result]
+    real = [dump(operation) for operation in translator.result]
     assert real == gold.out["output"]
 
 
@@ -287,13 +308,13 @@ def test_constructs(
     ]
     translator.translate_valuable(stack=False)
 
-    real = [operation.json() for operation in translator.result]
+    real = [json.dumps(dump(operation)) for operation in translator.result]
     assert real == gold.out[f"{name}-{construct}"]
 
 
 def test_unknown_header(
     translator: Translator,
-    position: dict[str, int],
+    position: Position,
     assert_debug_symbol: Callable[[str], None],
 ) -> None:
     operator: str = "!"
@@ -306,7 +327,7 @@ def test_unknown_header(
 
 def test_blocks(
     translator: Translator,
-    position: dict[str, int],
+    position: Position,
     assert_debug_symbol: Callable[[str], None],
 ) -> None:
     translator.translate_blocks()
@@ -318,3 +339,173 @@ def test_blocks(
         translator.translate_blocks()
     assert str(e.value) == "Unexpected closing symbol"
     assert_debug_symbol(")")
+
+
+@pytest.mark.parametrize(
+    ("source", "output"),
+    [
+        pytest.param("(output (+ 1 (assign x 5) x))", "11\n", id="assign"),
+        pytest.param('(print (+ 1 (print "ab")))', "abc", id="print"),
+    ],
+)
+def test_result_registry_saved(source: str, output: str) -> None:
+    translator = Translator(Reader(source))
+    translator.translate_blocks()
+    assert execute(translator.result) == output
+
+
+@pytest.mark.parametrize("count", [1, 2, 10])
+def test_shared_runtime(count: int) -> None:
+    source: str = "(output (- 0 15)) (output 7) " * count
+    inline = Translator(Reader(source))
+    inline.translate_blocks()
+    shared = Translator(Reader(source), shared_runtime=True)
+    shared.translate_blocks()
+
+    assert execute(shared.result) == execute(inline.result) == "-15\n7\n" * count
+    codes: list[str] = [operation.code for operation in shared.result]
+    assert codes.count(SubroutineOperation.Code.CALL) == 2 * count
+    assert codes.count(SubroutineOperation.Code.RETURN) == 1
+    assert len(shared.result) < len(inline.result) or count == 1
+    assert not shared.routines
+
+
+def test_arrays(translator: Translator) -> None:
+    translator.reader.symbols = Reader(
+        f"(array arr 4) (set arr 1 (get arr {THE_VARIABLE})) (get arr 2)"
+    ).symbols
+    translator.translate_blocks()
+    location: int = translator.variables.read_array("arr").location
+
+    indexed = [
+        operation
+        for operation in translator.result
+        if isinstance(operation, IndexedMemoryOperation)
+    ]
+    assert [operation.code for operation in indexed] == [
+        IndexedMemoryOperation.Code.LOAD_INDEXED,
+        IndexedMemoryOperation.Code.SAVE_INDEXED,
+        IndexedMemoryOperation.Code.LOAD_INDEXED,
+    ]
+    assert all(operation.address == location for operation in indexed)
+    assert indexed[0].index == indexed[0].right
+    assert indexed[1].index != indexed[1].right
+
+
+@pytest.mark.parametrize(
+    ("source", "message"),
+    [
+        pytest.param("(array arr n)", "Array size should be a number", id="size"),
+        pytest.param(
+            "(array arr 4) (get arr 4)",
+            "Index 4 is out of bounds for 'arr' of size 4",
+            id="get_bounds",
+        ),
+        pytest.param(
+            "(array arr 4) (set arr -1 0)",
+            "Index -1 is out of bounds for 'arr' of size 4",
+            id="set_bounds",
+        ),
+        pytest.param(
+            "(array arr 4) (output arr)",
+            "Array 'arr' can only be read with 'get'",
+            id="scalar_read",
+        ),
+    ],
+)
+def test_array_errors(source: str, message: str) -> None:
+    translator = Translator(Reader(source))
+    with pytest.raises(TranslationError) as e:
+        translator.translate_blocks()
+    assert str(e.value) == message
+
+
+def test_arrays_execution() -> None:
+    source: str = """
+    (array arr 5)
+    (assign i 0)
+    (loop (< i 5) (block (set arr i (* i i)) (assign i (+ i 1))))
+    (output (+ (get arr 4) (get arr (- (get arr 2) 1)) (set arr 0 7)))
+    (output (get arr 0))
+    """
+    translator = Translator(Reader(source))
+    translator.translate_blocks()
+    assert execute(translator.result) == "32\n7\n"
+
+
+def test_string_table() -> None:
+    source: str = (
+        '(print "hello, world") (print "a") (print (+ 1 (print "hello, world")))'
+    )
+    inline = Translator(Reader(source))
+    inline.translate_blocks()
+    shared = Translator(Reader(source), shared_runtime=True)
+    shared.translate_blocks()
+
+    assert execute(shared.result, shared.data) == execute(inline.result)
+    assert execute(inline.result) == "hello, worldahello, worlde"
+    assert len(shared.result) < len(inline.result)
+    assert shared.strings == {"hello, world": shared.data[0].address}
+    assert shared.data[0].values == [*map(ord, "hello, world")]
+    assert shared.result[0] == BlockOperation(
+        code=BlockOperation.Code.STREAM_BLOCK,
+        source=shared.data[0].address,
+        address=OUTPUT_ADDRESS,
+        length=len("hello, world"),
+    )
+
+
+def test_block_forms() -> None:
+    source: str = """
+    (array a 4) (array b 4)
+    (output (fill a 7))
+    (set a 2 5)
+    (output (copy b a))
+    (output (+ (get b 0) (get b 2) (get b 3)))
+    (fill a 0)
+    (output (get a 2))
+    """
+    translator = Translator(Reader(source))
+    translator.translate_blocks()
+    assert execute(translator.result) == "7\n4\n19\n0\n"
+    codes = [getattr(operation, "code") for operation in translator.result]
+    assert codes.count(BlockOperation.Code.FILL_BLOCK) == 2
+    assert codes.count(BlockOperation.Code.COPY_BLOCK) == 1
+
+
+def test_vector_forms() -> None:
+    source: str = """
+    (array a 3) (array b 3) (array c 3)
+    (assign i 0)
+    (loop (< i 3) (block (set a i (+ i 1)) (set b i (- 2 i)) (assign i (+ i 1))))
+    (output (vector * c a b))
+    (vector + c c (* 2 5))
+    (vector <=> b a b)
+    (output (+ (get c 0) (get c 1) (get c 2)))
+    (output (+ (* 100 (get b 0)) (* 10 (get b 1)) (get b 2)))
+    """
+    translator = Translator(Reader(source))
+    translator.translate_blocks()
+    assert execute(translator.result) == "3\n34\n-89\n"
+    codes = [getattr(operation, "code") for operation in translator.result]
+    assert VectorOperation.Code.VECTOR_MUL in codes
+
+
+@pytest.mark.parametrize(
+    ("source", "error"),
+    [
+        pytest.param(
+            "(array a 2) (array b 3) (copy a b)",
+            "Array 'b' should be of size 2, got 3",
+            id="sizes",
+        ),
+        pytest.param(
+            "(assign a 1) (fill a 0)", "Variable 'a' is not an array", id="scalar"
+        ),
+    ],
+)
+def test_block_form_errors(source: str, error: str) -> None:
+    translator = Translator(Reader(source))
+    with pytest.raises(TranslationError) as e:
+        translator.translate_blocks()
+    assert e.value.args[0] == error
@@ -1,3 +1,5 @@
+from collections.abc import Callable
+
 import pytest
 
 from common.errors import TranslationError
@@ -36,3 +38,59 @@ def test_variables(variables: VariableIndex, name: str, valid: bool) -> None:
         with pytest.raises(TranslationError) as e:
             variables.register(name)
         assert str(e.value) == f"Unsupported variable name: '{name}'"
+
+
+def test_arrays(variables: VariableIndex) -> None:
+    variables.register("var")
+    location = variables.register_array("array", 10)
+    assert location == variables.read("var").location + 1
+    assert variables.register("after") == location + 10
+    assert variables.register_array("array", 10) == location
+    assert variables.read_array("array").size == 10
+
+
+@pytest.mark.parametrize(
+    ("action", "message"),
+    [
+        pytest.param(
+            lambda v: v.register_array("array", 5),
+            "Variable 'array' is already defined",
+            id="redefined_size",
+        ),
+        pytest.param(
+            lambda v: v.register_array("var", 5),
+            "Variable 'var' is already defined",
+            id="redefined_variable",
+        ),
+        pytest.param(
+            lambda v: v.register_array("empty", 0),
+            "Array size should be positive, got 0",
+            id="empty",
+        ),
+        pytest.param(
+            lambda v: v.register("array"),
+            "Array 'array' can only be changed with 'set'",
+            id="assigned",
+        ),
+        pytest.param(
+            lambda v: v.read("array"),
+            "Array 'array' can only be read with 'get'",
+            id="read",
+        ),
+        pytest.param(
+            lambda v: v.read_array("var"),
+            "Variable 'var' is not an array",
+            id="not_array",
+        ),
+    ],
+)
+def test_array_errors(
+    variables: VariableIndex,
+    action: Callable[[VariableIndex], object],
+    message: str,
+) -> None:
+    variables.register("var")
+    variables.register_array("array", 10)
+    with pytest.raises(TranslationError) as e:
+        action(variables)
+    assert str(e.value) == message
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any
+
+from common.binary import decode_program, encode_program
+from common.errors import ProgramError
+from common.program import Program
+
+# sources of the translator and of the program format: any change in them
+# gives other keys, so results of an older translator are never reused
+FINGERPRINTED: tuple[Path, ...] = (
+    Path(__file__).parent,
+    Path(__file__).parent.parent / "common",
+)
+ENTRY_SUFFIX: str = ".curb"
+
+_fingerprint: str | None = None
+
+
+def translator_fingerprint() -> str:
+    """Hash of the translator's code, that stands for its version"""
+    global _fingerprint
+    if _fingerprint is None:
+        digest = hashlib.sha256()
+        for folder in FINGERPRINTED:
+            for path in sorted(folder.glob("*.py")):
+                digest.update(path.name.encode())
+                digest.update(path.read_bytes())
+        _fingerprint = digest.hexdigest()
+    return _fingerprint
+
+
+class BuildCache:
+    """
+    Content-addressed storage of compiled programs in a directory.
+    A key is a hash of the source text, the translator's code and the options,
+    so equal inputs always give the same key and anything else gives another.
+
+    Entries are stored in the binary format. Reading an entry updates its
+    modification time, and the least recently used entries are removed,
+    when the directory grows over ``limit`` bytes. Entries are written to
+    temporary files and renamed, so parallel builds may share a directory
+    """
+
+    def __init__(self, directory: Path, limit: int) -> None:
+        self.directory: Path = directory
+        self.limit: int = limit
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(source: str, options: dict[str, Any]) -> str:
+        digest = hashlib.sha256()
+        digest.update(translator_fingerprint().encode())
+        digest.update(json.dumps(options, sort_keys=True).encode())
+        digest.update(source.encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / (key + ENTRY_SUFFIX)
+
+    def get(self, key: str) -> Program | None:
+        path: Path = self.path(key)
+        try:
+            program: Program = decode_program(path.read_bytes())
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except ProgramError:
+            path.unlink(missing_ok=True)
+            return None
+        return program
+
+    def put(self, key: str, program: Program) -> None:
+        encoded: bytes = encode_program(program)  # fails before a file is made
+        temporary = NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False)
+        try:
+            with temporary:
+                temporary.write(encoded)
+            os.chmod(temporary.name, 0o644)  # as other files, not only for the owner
+            os.replace(temporary.name, self.path(key))
+        except BaseException:
+            Path(temporary.name).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes the least recently used entries over the limit"""
+        entries: list[tuple[float, int, Path]] = []
+        for path in self.directory.glob("*" + ENTRY_SUFFIX):
+            try:
+                stat: os.stat_result = path.stat()
+            except FileNotFoundError:  # removed by another build
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total: int = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
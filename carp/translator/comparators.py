@@ -1,15 +1,17 @@
-from pydantic import BaseModel
+from dataclasses import dataclass
 
 from common.operations import BinaryOperation, JumpOperation
 
 
-class ComparatorData(BaseModel):
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ComparatorData:
     jump: JumpOperation.Code
     command: BinaryOperation.Code = BinaryOperation.Code.COMPARE
     negated: bool
 
 
-class ComparatorTemplate(BaseModel):
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ComparatorTemplate:
     zero: bool
     reverse: bool = False
     negated: bool
@@ -33,6 +35,7 @@ class ComparatorTemplate(BaseModel):
 # (<= a b) -> (jn (comp b a)) -> jn +skip
 # (< a b) -> (!jn (comp a b)) -> jn +1; jb +skip
 # (!= a b) -> (jz (comp a b)) -> jz +skip
+# on -O1 negated pairs are lowered to one inverse branch: jn +1; jb +skip -> jnn +skip
 SYMBOL_TO_COMPARATOR: dict[str, ComparatorTemplate] = {
     ">=": ComparatorTemplate(zero=False, reverse=False, negated=False),
     "<": ComparatorTemplate(zero=False, reverse=False, negated=True),
@@ -0,0 +1,179 @@
+from collections.abc import Iterable, Iterator
+
+from common.operations import OPERATOR_TO_CODE
+from translator.comparators import SYMBOL_TO_COMPARATOR
+from translator.parser import Symbol
+
+DIVISION_OPERATORS: frozenset[str] = frozenset(("/", "%"))
+# header -> positions of arguments, that are names of arrays
+ARRAY_HEADERS: dict[str, tuple[int, ...]] = {
+    "array": (0,),
+    "get": (0,),
+    "set": (0,),
+    "fill": (0,),
+    "copy": (0, 1),
+    "vector": (1, 2),
+}
+
+
+class Expression:
+    """
+    Parsed expression, that groups :py:class:`Symbol` into a tree:
+    the opening symbol (:py:attr:`head`), arguments (symbols or other expressions)
+    and the closing symbol, which is missing for unfinished expressions.
+
+    Used by optimization passes, that work on the source code level
+    """
+
+    def __init__(
+        self,
+        head: Symbol,
+        arguments: "list[Symbol | Expression]",
+        closing: Symbol | None = None,
+    ) -> None:
+        self.head: Symbol = head
+        self.arguments: list[Symbol | Expression] = arguments
+        self.closing: Symbol | None = closing
+
+    @classmethod
+    def create(
+        cls, origin: Symbol, header: str, *arguments: "Symbol | Expression"
+    ) -> "Expression":
+        """Creates a new expression, pointing to the origin's position for errors"""
+        return cls(
+            head=Symbol(text="(" + header, line=origin.line, char=origin.char),
+            arguments=list(arguments),
+            closing=Symbol(text=")", line=origin.line, char=origin.char),
+        )
+
+    @property
+    def header(self) -> str:
+        return self.head.text[1:]
+
+    @property
+    def is_closed(self) -> bool:
+        return self.closing is not None
+
+    def with_arguments(self, arguments: "list[Symbol | Expression]") -> "Expression":
+        return Expression(head=self.head, arguments=arguments, closing=self.closing)
+
+
+Form = Symbol | Expression
+
+
+def read_forms(symbols: Iterable[Symbol]) -> Iterator[Form]:
+    """
+    Groups symbols into top-level forms. Unbalanced brackets are kept as is,
+    so flattening the result always gives back the same symbols
+    """
+    opened: list[Expression] = []
+    for symbol in symbols:
+        if symbol.is_expression:
+            opened.append(Expression(head=symbol, arguments=[]))
+            continue
+
+        form: Form = symbol
+        if symbol.is_closing and opened:
+            form = opened.pop()
+            form.closing = symbol
+
+        if opened:
+            opened[-1].arguments.append(form)
+        else:
+            yield form
+
+    while opened:
+        form = opened.pop()
+        if opened:
+            opened[-1].arguments.append(form)
+        else:
+            yield form
+
+
+def flatten(forms: Iterable[Form]) -> Iterator[Symbol]:
+    for form in forms:
+        if isinstance(form, Symbol):
+            yield form
+            continue
+        yield form.head
+        yield from flatten(form.arguments)
+        if form.closing is not None:
+            yield form.closing
+
+
+def copy_form(form: Form) -> Form:
+    """Copies expressions, so that the result can be changed independently"""
+    if isinstance(form, Symbol):
+        return form
+    return form.with_arguments([copy_form(argument) for argument in form.arguments])
+
+
+def count_symbols(forms: Iterable[Form]) -> int:
+    return sum(1 for _ in flatten(forms))
+
+
+def form_key(form: Form) -> tuple[str, ...]:
+    return tuple(symbol.text for symbol in flatten([form]))
+
+
+def is_number(form: Form) -> bool:
+    return isinstance(form, Symbol) and form.is_digit
+
+
+def is_variable(form: Form) -> bool:
+    return isinstance(form, Symbol) and not (
+        form.is_expression or form.is_closing or form.is_quoted or form.is_digit
+    )
+
+
+def read_names(form: Form) -> set[str]:
+    return {symbol.text for symbol in flatten([form]) if is_variable(symbol)}
+
+
+def array_names(form: Form) -> set[str]:
+    if isinstance(form, Symbol):
+        return set()
+    result: set[str] = set()
+    for position in ARRAY_HEADERS.get(form.header, ()):
+        if position < len(form.arguments):
+            name = form.arguments[position]
+            if isinstance(name, Symbol):
+                result.add(name.text)
+    for argument in form.arguments:
+        result.update(array_names(argument))
+    return result
+
+
+def assigned_names(form: Form) -> set[str]:
+    if isinstance(form, Symbol):
+        return set()
+    result: set[str] = set()
+    if form.header == "assign" and form.arguments:
+        name = form.arguments[0]
+        if isinstance(name, Symbol):
+            result.add(name.text)
+    for argument in form.arguments:
+        result.update(assigned_names(argument))
+    return result
+
+
+def is_comparison(form: Form) -> bool:
+    return isinstance(form, Expression) and form.header in SYMBOL_TO_COMPARATOR
+
+
+def is_pure_arithmetic(form: Form) -> bool:
+    """
+    Checks if the form is a math expression, that can be evaluated at any moment
+    with the same result and without errors. Only variables and numbers
+    are allowed as operands and division is only allowed by non-zero numbers
+    """
+    if isinstance(form, Symbol):
+        return form.is_digit or is_variable(form)
+    if not form.is_closed or form.header not in OPERATOR_TO_CODE:
+        return False
+    if form.header in DIVISION_OPERATORS and not all(
+        isinstance(argument, Symbol) and argument.is_digit and int(argument.text) != 0
+        for argument in form.arguments[1:]
+    ):
+        return False
+    return all(is_pure_arithmetic(argument) for argument in form.arguments)
@@ -0,0 +1,155 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any
+
+from common.errors import TranslationError
+from common.operations import OperationBase
+from common.program import Program
+from translator.parser import Symbol, tokenize
+from translator.reader import Reader
+from translator.translator import Translator
+
+
+@dataclass(slots=True, kw_only=True)
+class FormState:
+    """
+    State of the :py:class:`Translator` after a top-level form. Lists and dicts
+    of the translator only grow, so their sizes are enough to restore it.
+
+    The source can be parsed again from the line after the form (``end + 1``),
+    if no other form starts on its last line (``separated``)
+    """
+
+    end: int
+    result_size: int
+    calls_size: int
+    data_size: int
+    variables: tuple[int, int]
+    strings_size: int
+    routines_size: int
+    separated: bool = False
+
+
+def truncate(items: dict[Any, Any], size: int) -> None:
+    """Removes the last added items over the size"""
+    while len(items) > size:
+        items.popitem()
+
+
+def common_prefix(first: str, second: str) -> int:
+    """Length of the common start of strings, compared by halves"""
+    low, high = 0, min(len(first), len(second))
+    while low < high:
+        middle: int = (low + high + 1) // 2
+        if first[low:middle] == second[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class IncrementalTranslator:
+    """
+    Translates versions of the same source, while it is edited. The state
+    of the translator is saved after each top-level form, so on an update
+    forms before the first changed line are kept as translated: the state
+    after them is restored and only the rest of the source is parsed
+    and translated again. Calls of shared routines are pointed to them,
+    when the result is linked.
+
+    The result is the same, as the whole source would give. Passes over forms
+    are not supported, as they change the source as a whole
+    """
+
+    def __init__(self, shared_runtime: bool = False) -> None:
+        self.translator: Translator = Translator(
+            reader=Reader(()), shared_runtime=shared_runtime
+        )
+        self.result: list[OperationBase] = self.translator.result
+        self.states: list[FormState] = []
+        self.save(end=0)
+        self.states[0].separated = True
+        self.source: str = ""
+        self.forms: int = 0
+        self.translated: int = 0
+
+    def kept_forms(self, source: str) -> tuple[int, int]:
+        """
+        Number of forms before the first changed line of the source
+        and the position in the source after them
+        """
+        changed: int = common_prefix(self.source, source)
+        line: int = source.count("\n", 0, changed) + 1
+        # the last form, that ends before the line and is followed by a new line
+        kept: int = bisect_left(self.states, line, key=lambda state: state.end) - 1
+        while not self.states[kept].separated:
+            kept -= 1
+
+        position: int = source.rfind("\n", 0, changed) + 1
+        for _ in range(self.states[kept].end + 1, line):
+            position = source.rfind("\n", 0, position - 1) + 1
+        return kept, position
+
+    def restore(self, forms: int) -> None:
+        """Returns the translator to the state after the first ``forms``"""
+        del self.states[forms + 1 :]
+        state: FormState = self.states[-1]
+        translator: Translator = self.translator
+
+        del self.result[state.result_size :]
+        del translator.calls[state.calls_size :]
+        del translator.data[state.data_size :]
+        translator.result = self.result  # could be left in a routine by an error
+        translator.variables.rollback(state.variables)
+        truncate(translator.strings, state.strings_size)
+        truncate(translator.routines, state.routines_size)
+
+    def save(self, end: int) -> None:
+        translator: Translator = self.translator
+        self.states.append(
+            FormState(
+                end=end,
+                result_size=len(self.result),
+                calls_size=len(translator.calls),
+                data_size=len(translator.data),
+                variables=translator.variables.mark(),
+                strings_size=len(translator.strings),
+                routines_size=len(translator.routines),
+            )
+        )
+
+    def update(self, source: str) -> Program:
+        """
+        Translates a new version of the source.
+        Raises :py:class:`ParserError` and :py:class:`TranslationError`,
+        forms before the failed one are still reused by the next update
+        """
+        kept, position = self.kept_forms(source)
+        self.restore(kept)
+        self.source = source
+        self.forms, self.translated = kept, 0
+
+        # the rest is read, as the whole source would be: a form is all,
+        # that the translator reads for one top-level argument
+        state: FormState = self.states[-1]
+        reader: Reader = self.translator.reader
+        reader.symbols = []
+        reader.stream = tokenize(source[position:], state.end + 1)
+        try:
+            while reader.has_next():
+                first: Symbol = reader.current_or_closing()
+                state.separated = state.separated or first.line > state.end
+                self.forms += 1
+                self.translator.translate_argument(stack=False)
+                last: Symbol = reader.behind[-1]
+                self.save(last.line + last.text.count("\n"))
+                state = self.states[-1]
+                self.translated += 1
+        except IndexError:  # read past the end of the source
+            raise TranslationError("Missing closing bracket")
+        state.separated = True
+
+        return Program(
+            instructions=self.translator.linked_result(),
+            data=list(self.translator.data),
+        )
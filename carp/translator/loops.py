@@ -0,0 +1,324 @@
+from common.constants import WORD_MAX_VALUE, WORD_MIN_VALUE
+from common.errors import TranslationError
+from translator.forms import (
+    Expression,
+    Form,
+    array_names,
+    assigned_names,
+    copy_form,
+    flatten,
+    form_key,
+    is_comparison,
+    is_number,
+    is_pure_arithmetic,
+    is_variable,
+    read_names,
+)
+from translator.parser import Symbol
+from translator.reader import Reader
+from translator.translator import Translator
+from translator.variables import VariableIndex
+
+CONSTRUCTS: frozenset[str] = frozenset(("if", "loop"))
+
+# comparator -> (comparator with swapped operands, sign of a step towards the end)
+COUNTED_COMPARATORS: dict[str, tuple[str, int]] = {
+    "<": (">", 1),
+    "<=": (">=", 1),
+    ">": ("<", -1),
+    ">=": ("<=", -1),
+}
+
+
+def is_loop(form: Form) -> bool:
+    return (
+        isinstance(form, Expression)
+        and form.is_closed
+        and form.header == "loop"
+        and len(form.arguments) == 2
+    )
+
+
+class InvariantHoister:
+    """
+    Replaces invariant math expressions inside the loop with temporary variables.
+    Expressions are invariant if they don't read any variable, assigned inside
+    the loop. Temporaries are assigned in the preheader (see :py:attr:`preheader`).
+
+    Conditions of constructs are only touched if they are comparisons,
+    as otherwise flags after them could change
+    """
+
+    def __init__(self, loop: Expression, variables: VariableIndex) -> None:
+        self.variables: VariableIndex = variables
+        self.assigned: set[str] = assigned_names(loop)
+        self.temporaries: dict[tuple[str, ...], str] = {}
+        self.preheader: list[Form] = []
+
+    def temporary(self, form: Expression) -> Symbol:
+        key: tuple[str, ...] = form_key(form)
+        name: str | None = self.temporaries.get(key)
+        if name is None:
+            name = self.variables.allocate_temporary()
+            self.temporaries[key] = name
+            self.preheader.append(
+                Expression.create(form.head, "assign", self.symbol(form, name), form)
+            )
+        return self.symbol(form, name)
+
+    @staticmethod
+    def symbol(form: Expression, name: str) -> Symbol:
+        return Symbol(
+            text=name, line=form.head.line, char=form.head.char, temporary=True
+        )
+
+    def is_invariant(self, form: Form) -> bool:
+        return is_pure_arithmetic(form) and not read_names(form) & self.assigned
+
+    def replace_condition(self, form: Form) -> Form:
+        if is_comparison(form):
+            return self.replace(form)
+        return form
+
+    def replace(self, form: Form) -> Form:
+        if isinstance(form, Symbol) or not form.is_closed:
+            return form
+        if self.is_invariant(form):
+            return self.temporary(form)
+
+        arguments: list[Form] = list(form.arguments)
+        if form.header in CONSTRUCTS and arguments:
+            arguments[0] = self.replace_condition(arguments[0])
+            arguments[1:] = [self.replace(argument) for argument in arguments[1:]]
+        else:
+            arguments = [self.replace(argument) for argument in arguments]
+        return form.with_arguments(arguments)
+
+
+def hoist_loop(loop: Expression, variables: VariableIndex) -> Form:
+    hoister = InvariantHoister(loop, variables)
+    condition, body = loop.arguments
+    result: Form = loop.with_arguments(
+        [
+            hoist_form(hoister.replace_condition(condition), variables),
+            hoist_form(hoister.replace(body), variables),
+        ]
+    )
+    if hoister.preheader:
+        result = Expression.create(loop.head, "block", *hoister.preheader, result)
+    return result
+
+
+def hoist_form(form: Form, variables: VariableIndex) -> Form:
+    if isinstance(form, Symbol):
+        return form
+    if is_loop(form):
+        return hoist_loop(form, variables)
+    return form.with_arguments(
+        [hoist_form(argument, variables) for argument in form.arguments]
+    )
+
+
+def hoist_invariants(forms: list[Form], variables: VariableIndex) -> list[Form]:
+    """
+    Loop-invariant code motion: invariant math expressions are calculated once
+    before the loop and saved to temporary variables, which are read in the loop.
+    Outer loops are processed first, so expressions are moved as far as possible
+    """
+    return [hoist_form(form, variables) for form in forms]
+
+
+class CountedLoop:
+    """
+    Loop with a counter, that is compared to a constant in the condition
+    and changed by a constant step exactly once per iteration, on the top level
+    of the body. Such loops can be unrolled without knowing the trip count:
+    while at least ``factor`` iterations are left, the body is repeated
+    ``factor`` times without checks, the rest is done by the original loop
+    """
+
+    def __init__(
+        self, loop: Expression, comparator: str, counter: str, limit: int, step: int
+    ) -> None:
+        self.loop: Expression = loop
+        self.comparator: str = comparator
+        self.counter: str = counter
+        self.limit: int = limit
+        self.step: int = step
+
+    @classmethod
+    def parse_condition(cls, condition: Form) -> tuple[str, str, int] | None:
+        if not isinstance(condition, Expression) or len(condition.arguments) != 2:
+            return None
+        comparator: str = condition.header
+        if comparator not in COUNTED_COMPARATORS:
+            return None
+
+        counter, limit = condition.arguments
+        if is_variable(limit) and is_number(counter):
+            comparator = COUNTED_COMPARATORS[comparator][0]
+            counter, limit = limit, counter
+        if not isinstance(counter, Symbol) or not isinstance(limit, Symbol):
+            return None
+        if not is_variable(counter) or not limit.is_digit:
+            return None
+        return comparator, counter.text, int(limit.text)
+
+    @staticmethod
+    def parse_step(statement: Form, counter: str) -> int | None:
+        """Returns the step if the statement is ``(assign i (+ i step))`` or alike"""
+        if not isinstance(statement, Expression) or statement.header != "assign":
+            return None
+        if len(statement.arguments) != 2:
+            return None
+        if form_key(statement.arguments[0]) != (counter,):
+            return None
+
+        value = statement.arguments[1]
+        if not isinstance(value, Expression) or len(value.arguments) != 2:
+            return None
+        keys = [form_key(argument) for argument in value.arguments]
+        numbers = [
+            int(argument.text)
+            for argument in value.arguments
+            if isinstance(argument, Symbol) and argument.is_digit
+        ]
+        if len(numbers) != 1 or (counter,) not in keys:
+            return None
+        if value.header == "+":
+            return numbers[0]
+        if value.header == "-" and keys[0] == (counter,):
+            return -numbers[0]
+        return None
+
+    @classmethod
+    def parse(cls, loop: Expression) -> "CountedLoop | None":
+        condition, body = loop.arguments
+        parsed = cls.parse_condition(condition)
+        if parsed is None:
+            return None
+        comparator, counter, limit = parsed
+
+        steps: list[int] = []
+        for statement in statements(body):
+            step = cls.parse_step(statement, counter)
+            if step is not None:
+                steps.append(step)
+            elif counter in assigned_names(statement):
+                return None
+
+        if len(steps) != 1 or steps[0] * COUNTED_COMPARATORS[comparator][1] <= 0:
+            return None
+        return cls(loop, comparator, counter, limit, steps[0])
+
+    def unrolled_limit(self, factor: int) -> int | None:
+        limit: int = self.limit - (factor - 1) * self.step
+        if WORD_MIN_VALUE <= limit <= WORD_MAX_VALUE:
+            return limit
+        return None
+
+    def unroll(self, factor: int) -> Form:
+        limit: int | None = self.unrolled_limit(factor)
+        if limit is None:
+            return self.loop
+
+        origin: Symbol = self.loop.head
+        condition: Expression = Expression.create(
+            origin,
+            self.comparator,
+            Symbol(text=self.counter, line=origin.line, char=origin.char),
+            Symbol(text=str(limit), line=origin.line, char=origin.char),
+        )
+        body: list[Form] = [
+            copy_form(statement)
+            for _ in range(factor)
+            for statement in statements(self.loop.arguments[1])
+        ]
+        unrolled: Expression = self.loop.with_arguments(
+            [condition, Expression.create(origin, "block", *body)]
+        )
+        return Expression.create(origin, "block", unrolled, self.loop)
+
+
+def statements(body: Form) -> list[Form]:
+    if isinstance(body, Expression) and body.header == "block" and body.is_closed:
+        return list(body.arguments)
+    return [body]
+
+
+def estimate_size(
+    form: Form, variables: VariableIndex, shared_runtime: bool = False
+) -> int | None:
+    """
+    Counts instructions in the translation of a form, as the translator with
+    the same ``shared_runtime`` emits them. Shared routines are placed once
+    per program, so only their calls are counted. Variables, that are not
+    defined yet, are registered in the index and forgotten after the count.
+    Sizes of arrays are not known before the translation, so they are maxed out
+    """
+    translator = Translator(Reader(""), shared_runtime=shared_runtime)
+    translator.variables = variables
+    translator.reader.symbols = list(flatten([form]))
+    arrays: set[str] = array_names(form)
+    mark: tuple[int, int] = variables.mark()
+    try:
+        for name in arrays:
+            variables.register_array(name, WORD_MAX_VALUE)
+        for name in read_names(form) - arrays:
+            if not variables.bad_name(name):  # operators of vectors
+                variables.register(name)
+        while translator.reader.has_next():  # without linking shared routines
+            translator.translate_argument(stack=False)
+    except (TranslationError, IndexError):
+        return None
+    finally:
+        variables.rollback(mark)
+    return len(translator.result)
+
+
+def unroll_form(
+    form: Form,
+    variables: VariableIndex,
+    factor: int,
+    budget: int,
+    shared_runtime: bool = False,
+) -> Form:
+    if isinstance(form, Symbol):
+        return form
+    form = form.with_arguments(
+        [
+            unroll_form(argument, variables, factor, budget, shared_runtime)
+            for argument in form.arguments
+        ]
+    )
+    if not is_loop(form):
+        return form
+
+    counted: CountedLoop | None = CountedLoop.parse(form)
+    if counted is None:
+        return form
+    size: int | None = estimate_size(form.arguments[1], variables, shared_runtime)
+    if size is None:
+        return form
+    factor = min(factor, budget // max(size, 1))
+    if factor < 2:
+        return form
+    return counted.unroll(factor)
+
+
+def unroll_loops(
+    forms: list[Form],
+    variables: VariableIndex,
+    factor: int,
+    budget: int,
+    shared_runtime: bool = False,
+) -> list[Form]:
+    """
+    Unrolls loops with counters (see :py:class:`CountedLoop`) ``factor`` times.
+    Inner loops are unrolled first. The factor is reduced for each loop,
+    so that repeated bodies take no more than ``budget`` instructions
+    (translated with the same ``shared_runtime`` as the program)
+    """
+    return [
+        unroll_form(form, variables, factor, budget, shared_runtime) for form in forms
+    ]
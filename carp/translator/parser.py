@@ -1,20 +1,32 @@
-from collections.abc import Iterator
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 
-from pydantic import BaseModel
+# a symbol is a run of non-space characters, where quoted parts may contain spaces;
+# a lone quotation mark only matches, when it is never closed
+SYMBOL_PATTERN: re.Pattern[str] = re.compile(r'(?:[^ \n\t"]+|"[^"]*")+|"')
+# characters, that end a symbol outside quotes (see :py:data:`SYMBOL_PATTERN`)
+SPACES: str = " \n\t"
+# characters to read from a file at once, while the source is parsed
+READ_CHUNK_SIZE: int = 1 << 16
 
 
-class Symbol(BaseModel):
+@dataclass(slots=True)
+class Symbol:
     """
-    Simple model to describe a 'symbol'. Symbols can be represented as
+    Simple structure to describe a 'symbol'. Symbols can be represented as
     either space-less strings or quoted sequences of any characters.
 
-    Symbol's position is also contained in this model
-    (see :py:attr:`line` and :py:attr:`char` for line and column numbers)
+    Symbol's position is also contained in this structure
+    (see :py:attr:`line` and :py:attr:`char` for line and column numbers).
+    Names of temporary variables are only read from symbols,
+    that optimization passes create with :py:attr:`temporary` set
     """
 
     text: str
     line: int
     char: int
+    temporary: bool = False
 
     @property
     def is_expression(self) -> bool:
@@ -36,6 +48,10 @@ class Symbol(BaseModel):
             return self.text[1:].isdigit()
         return self.text.isdigit()
 
+    def as_dict(self) -> dict[str, str | int]:
+        """Fields in the format of ``.cpar`` files"""
+        return {"text": self.text, "line": self.line, "char": self.char}
+
     def __str__(self) -> str:
         if self.is_quoted:
             return self.text[1:-1].replace(r"\n", "\n")
@@ -50,79 +66,127 @@ class ParserError(Exception):
         return f"Parsing error occurred: {self.text}"
 
 
-class Parser:
+def count_brackets(text: str) -> int:
+    """Counts closing brackets, that are not quoted"""
+    if '"' not in text:
+        return text.count(")")
+    return sum(part.count(")") for part in text.split('"')[::2])
+
+
+def tokenize(data: str, line: int = 1, char: int = 0) -> Iterator[Symbol]:
     """
-    Class to parse a string, containing the source code, into a
-    list of :py:class:`Symbol`. Used in :py:class:`translator.reader.Reader`
+    Splits the source code into symbols with :py:data:`SYMBOL_PATTERN`
+    in a single pass. Closing brackets are split from the end of a symbol
+    and positioned right before the space, that ends it.
+
+    Lines are counted only between symbols, so the loop stays cheap
+
+    :param line: number of the first line, if the data is a part of the source
+    :param char: column, where the data starts in its first line
     """
+    line_start: int = -char
+    position: int = 0
 
-    def __init__(self, data: str) -> None:
-        self.data: str = data
-        self.result: list[Symbol] = []
+    for match in SYMBOL_PATTERN.finditer(data):
+        text: str = match.group()
+        if text == '"':
+            raise ParserError("Missing closing quotation mark")
 
-        self.position: int = 0
-        self.line_number: int = 1
-        self.char_number: int = 0
+        start: int = match.start()
+        lines: int = data.count("\n", position, start)
+        if lines:
+            line += lines
+            line_start = data.rfind("\n", position, start) + 1
+        position = start
+
+        if ")" not in text:
+            yield Symbol(text, line, start - line_start)
+            continue
+
+        symbol_text: str = text.strip(")")
+        if symbol_text:
+            yield Symbol(symbol_text, line, start - line_start)
+        brackets: int = count_brackets(text)
+        if brackets:
+            end: int = match.end()
+            lines = data.count("\n", position, end)
+            if lines:
+                line += lines
+                line_start = data.rfind("\n", position, end) + 1
+            position = end
+            for char in range(end - line_start - brackets + 1, end - line_start + 1):
+                yield Symbol(")", line, char)
+
+
+def split_point(chunk: str, quoted: bool) -> tuple[int, bool]:
+    """
+    Position after the last space of the chunk, that is not quoted,
+    or 0 if there is no such space, and whether the chunk ends
+    inside quotes, if it starts inside them (``quoted``).
 
-        self.started_position: int | None = None
-        self.started_line_number: int = 0
-        self.started_char_number: int = 0
+    Parts between quotation marks are checked from the end of the chunk,
+    so usually only the last few of them are searched
+    """
+    ends_quoted: bool = quoted ^ (chunk.count('"') % 2 == 1)
+    inside: bool = ends_quoted
+    end: int = len(chunk)
+    while end >= 0:
+        start: int = chunk.rfind('"', 0, end) + 1
+        if not inside:
+            split: int = max(chunk.rfind(space, start, end) for space in SPACES)
+            if split >= 0:
+                return split + 1, ends_quoted
+        inside = not inside
+        end = start - 1
+    return 0, ends_quoted
+
+
+def tokenize_chunks(chunks: Iterable[str]) -> Iterator[Symbol]:
+    """
+    Tokenizes the source code, that is read by parts (e.g. blocks of a file).
+    Parts are joined up to the last space outside quotes, as no symbol
+    can cross it, and the rest is kept for the next part. Whether the kept
+    rest is quoted is carried on to the next part.
 
-        self.in_quotes: bool = False
-        self.back_brackets: int = 0
+    Only the rest is held in memory, so a single symbol (e.g. a long string)
+    is the most, that is kept at once, whatever the lines are
+    """
+    line: int = 1
+    char: int = 0
+    rest: list[str] = []
+    quoted: bool = False
+    for chunk in chunks:
+        split, quoted = split_point(chunk, quoted)
+        if split:
+            data: str = "".join(rest) + chunk[:split]
+            yield from tokenize(data, line, char)
+            lines: int = data.count("\n")
+            if lines:
+                line += lines
+                char = len(data) - data.rfind("\n") - 1
+            else:
+                char += len(data)
+            rest.clear()
+        rest.append(chunk[split:])
+    yield from tokenize("".join(rest), line, char)
 
-        self.parse_all()
 
-    def iterate_chars(self) -> Iterator[str]:
-        for i, char in enumerate(self.data):
-            self.position = i
-            if not self.in_quotes:
-                if char == ")":
-                    self.back_brackets += 1
-                yield char
-            self.in_quotes = self.in_quotes != (char == '"')
+class Parser:
+    """
+    Lazily parses the source code, given as a string or by parts,
+    into :py:class:`Symbol`-s (see :py:func:`tokenize`).
+    Iterated by :py:class:`translator.reader.Reader`
+    """
 
-            self.char_number += 1
-            if char == "\n":
-                self.line_number += 1
-                self.char_number = 0
+    def __init__(self, data: str | Iterable[str]) -> None:
+        self.data: str | Iterable[str] = data
 
-        self.position += 1
-        if self.in_quotes:
-            raise ParserError("Missing closing quotation mark")
+    def __iter__(self) -> Iterator[Symbol]:
+        if isinstance(self.data, str):
+            return tokenize(self.data)
+        return tokenize_chunks(self.data)
 
-    def end_symbol(self) -> None:
-        symbol: Symbol = Symbol(
-            text=self.data[self.started_position : self.position].strip(")"),
-            line=self.started_line_number,
-            char=self.started_char_number,
-        )
-        if symbol.text != "":
-            self.result.append(symbol)
-
-    def save_brackets(self) -> None:
-        if self.back_brackets:
-            self.result.extend(
-                Symbol(text=")", line=self.line_number, char=self.char_number - i + 1)
-                for i in range(self.back_brackets, 0, -1)
-            )
-            self.back_brackets = 0
-
-    def parse_all(self) -> None:
-        in_spaces: bool
-        prev_in_spaces: bool = True
-
-        for char in self.iterate_chars():
-            in_spaces = char in {" ", "\n", "\t"}
-            if prev_in_spaces and not in_spaces:
-                self.started_position = self.position
-                self.started_line_number = self.line_number
-                self.started_char_number = self.char_number
-            elif in_spaces and not prev_in_spaces:
-                self.end_symbol()
-                self.save_brackets()
-            prev_in_spaces = in_spaces
-
-        if not prev_in_spaces:
-            self.end_symbol()
-        self.save_brackets()
+    @property
+    def result(self) -> list[Symbol]:
+        """All symbols at once"""
+        return list(self)
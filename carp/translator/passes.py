@@ -0,0 +1,183 @@
+from collections.abc import Callable, Collection, Sized
+from dataclasses import dataclass
+from functools import partial
+from time import perf_counter
+from typing import Generic, TypeVar
+
+from common.constants import DEFAULT_UNROLL_BUDGET, DEFAULT_UNROLL_FACTOR
+from common.operations import OperationBase
+from translator.forms import Form, count_symbols, flatten, read_forms
+from translator.loops import hoist_invariants, unroll_loops
+from translator.parser import Symbol
+from translator.peephole import (
+    invert_branches,
+    remove_redundant_loads,
+    remove_unreachable,
+    thread_jumps,
+)
+from translator.subexpressions import eliminate_subexpressions
+from translator.variables import VariableIndex
+
+ProgramType = TypeVar("ProgramType", bound=Sized)
+
+
+@dataclass(slots=True, kw_only=True)
+class PassStats:
+    """
+    Statistics, collected by :py:class:`PassManager` for one registered pass.
+    Sizes are measured in instructions (or any other unit of the pass' program)
+    """
+
+    name: str
+    enabled: bool
+    unit: str = "instructions"
+    time: float = 0
+    size_before: int = 0
+    size_after: int = 0
+
+    @property
+    def delta(self) -> int:
+        return self.size_after - self.size_before
+
+    def __str__(self) -> str:
+        if not self.enabled:
+            return f"{self.name:<24} skipped"
+        return (
+            f"{self.name:<24} {self.time * 1000:>8.3f} ms "
+            + f"{self.size_before:>6} -> {self.size_after:<6} ({self.delta:+}) "
+            + self.unit
+        )
+
+
+class OptimizationPass(Generic[ProgramType]):
+    def __init__(
+        self,
+        name: str,
+        function: Callable[[ProgramType], ProgramType],
+        stats: PassStats,
+    ) -> None:
+        self.name: str = name
+        self.function: Callable[[ProgramType], ProgramType] = function
+        self.stats: PassStats = stats
+
+    @property
+    def enabled(self) -> bool:
+        return self.stats.enabled
+
+    def __call__(self, program: ProgramType) -> ProgramType:
+        started: float = perf_counter()
+        program = self.function(program)
+        self.stats.time += perf_counter() - started
+        return program
+
+
+class PassManager(Generic[ProgramType]):
+    """
+    Runs registered optimization passes over a program in order of registration.
+    Every pass is registered with a minimal optimization level, which enables it,
+    and can be switched off by name. Timing and size changes are recorded
+    for every enabled pass (see :py:attr:`stats`), sizes are calculated
+    with the ``measure`` function and reported in ``unit``-s
+    """
+
+    def __init__(
+        self,
+        level: int = 0,
+        disabled: Collection[str] = (),
+        measure: Callable[[ProgramType], int] = len,
+        unit: str = "instructions",
+    ) -> None:
+        self.level: int = level
+        self.disabled: Collection[str] = disabled
+        self.measure: Callable[[ProgramType], int] = measure
+        self.unit: str = unit
+        self.passes: list[OptimizationPass[ProgramType]] = []
+
+    def register(
+        self,
+        name: str,
+        function: Callable[[ProgramType], ProgramType],
+        level: int = 1,
+    ) -> None:
+        enabled: bool = self.level >= level and name not in self.disabled
+        stats = PassStats(name=name, enabled=enabled, unit=self.unit)
+        self.passes.append(OptimizationPass(name, function, stats))
+
+    def run(self, program: ProgramType) -> ProgramType:
+        for optimization_pass in self.passes:
+            if optimization_pass.enabled:
+                optimization_pass.stats.size_before += self.measure(program)
+                program = optimization_pass(program)
+                optimization_pass.stats.size_after += self.measure(program)
+        return program
+
+    @property
+    def enabled(self) -> bool:
+        """If any pass is going to run"""
+        return any(optimization_pass.enabled for optimization_pass in self.passes)
+
+    @property
+    def stats(self) -> list[PassStats]:
+        return [optimization_pass.stats for optimization_pass in self.passes]
+
+
+def create_operation_passes(
+    level: int = 0, disabled: Collection[str] = ()
+) -> PassManager[list[OperationBase]]:
+    """
+    Creates a :py:class:`PassManager` with all passes over the translator's output.
+    On level 0 no passes are enabled, so the output stays exactly as translated
+    """
+    manager: PassManager[list[OperationBase]] = PassManager(level, disabled)
+    manager.register("invert-branches", invert_branches, level=1)
+    manager.register("thread-jumps", thread_jumps, level=1)
+    manager.register("remove-unreachable", remove_unreachable, level=1)
+    manager.register("redundant-loads", remove_redundant_loads, level=1)
+    return manager
+
+
+def create_form_passes(
+    variables: VariableIndex,
+    level: int = 0,
+    disabled: Collection[str] = (),
+    unroll_factor: int = DEFAULT_UNROLL_FACTOR,
+    unroll_budget: int = DEFAULT_UNROLL_BUDGET,
+    shared_runtime: bool = False,
+) -> PassManager[list[Form]]:
+    """
+    Creates a :py:class:`PassManager` with all passes over the source code,
+    grouped into forms (see :py:mod:`translator.forms`). Temporary variables,
+    required by passes, are allocated in the translator's :py:class:`VariableIndex`.
+    Loops are unrolled up to ``unroll_factor`` times, while repeated bodies
+    take no more than ``unroll_budget`` instructions (as translated with
+    ``shared_runtime``)
+    """
+    manager: PassManager[list[Form]] = PassManager(
+        level, disabled, measure=count_symbols, unit="symbols"
+    )
+    manager.register(
+        "unroll-loops",
+        partial(
+            unroll_loops,
+            variables=variables,
+            factor=unroll_factor,
+            budget=unroll_budget,
+            shared_runtime=shared_runtime,
+        ),
+        level=2,
+    )
+    manager.register(
+        "hoist-invariants", partial(hoist_invariants, variables=variables), level=2
+    )
+    manager.register(
+        "eliminate-subexpressions",
+        partial(eliminate_subexpressions, variables=variables),
+        level=2,
+    )
+    return manager
+
+
+def optimize_symbols(
+    symbols: list[Symbol], manager: PassManager[list[Form]]
+) -> list[Symbol]:
+    return list(flatten(manager.run(list(read_forms(symbols)))))
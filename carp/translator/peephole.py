@@ -0,0 +1,238 @@
+from collections.abc import Collection
+from dataclasses import replace
+from typing import TypeGuard
+
+from common.constants import IO_DEVICE_COUNT
+from common.operations import (
+    BinaryOperation,
+    BlockOperation,
+    IndexedMemoryOperation,
+    JumpOperation,
+    MemoryOperation,
+    OperationBase,
+    Registry,
+    StackOperation,
+    SubroutineOperation,
+)
+
+COMPARISON_CODES: frozenset[BinaryOperation.Code] = frozenset(
+    (BinaryOperation.Code.COMPARE, BinaryOperation.Code.COMPARE_REVERSE)
+)
+INVERSE_JUMPS: dict[JumpOperation.Code, JumpOperation.Code] = {
+    JumpOperation.Code.JUMP_ZERO: JumpOperation.Code.JUMP_NOT_ZERO,
+    JumpOperation.Code.JUMP_NOT_ZERO: JumpOperation.Code.JUMP_ZERO,
+    JumpOperation.Code.JUMP_NEGATIVE: JumpOperation.Code.JUMP_NOT_NEGATIVE,
+    JumpOperation.Code.JUMP_NOT_NEGATIVE: JumpOperation.Code.JUMP_NEGATIVE,
+}
+
+
+def jump_target(index: int, operation: JumpOperation | SubroutineOperation) -> int:
+    """
+    Calculates the index of the operation a jump (or a call) leads to.
+    Offset is applied after the fetch, so it is relative to the next operation
+    """
+    return index + 1 + operation.offset
+
+
+def is_relative(
+    operation: OperationBase,
+) -> TypeGuard[JumpOperation | SubroutineOperation]:
+    """Checks if the operation has an offset to another operation"""
+    return isinstance(operation, JumpOperation) or (
+        isinstance(operation, SubroutineOperation)
+        and operation.code is SubroutineOperation.Code.CALL
+    )
+
+
+def jump_targets(operations: list[OperationBase]) -> set[int]:
+    return {
+        jump_target(index, operation)
+        for index, operation in enumerate(operations)
+        if is_relative(operation)
+    }
+
+
+def successors(index: int, operation: OperationBase) -> list[int]:
+    """Calls continue after the routine returns, returns lead to any call"""
+    if isinstance(operation, SubroutineOperation):
+        if operation.code is SubroutineOperation.Code.RETURN:
+            return []
+        return [index + 1, jump_target(index, operation)]
+    if not isinstance(operation, JumpOperation):
+        return [index + 1]
+    if operation.code is JumpOperation.Code.JUMP_BECAUSE:
+        return [jump_target(index, operation)]
+    return [index + 1, jump_target(index, operation)]
+
+
+def sets_flags(operation: OperationBase) -> bool:
+    return (
+        isinstance(operation, BinaryOperation)
+        or operation.code is MemoryOperation.Code.LOAD_MEMORY
+        or operation.code is IndexedMemoryOperation.Code.LOAD_INDEXED
+        or operation.code is StackOperation.Code.GRAB
+    )
+
+
+def flags_dead(operations: list[OperationBase], index: int) -> bool:
+    """
+    Checks if flags, set by the operation at the index, are never read.
+    Only the straight-line code after the operation is considered,
+    so any jump or call is treated as a possible reader
+    """
+    for operation in operations[index + 1 :]:
+        if isinstance(operation, JumpOperation | SubroutineOperation):
+            return False
+        if sets_flags(operation):
+            return True
+    return True
+
+
+def remove_operations(
+    operations: list[OperationBase], removed: Collection[int]
+) -> list[OperationBase]:
+    """
+    Removes operations by their indexes and relocates offsets of remaining jumps.
+    Jumps to a removed operation will land on the next remaining one,
+    so only operations, that don't do anything when executed, can be removed
+    """
+    positions: list[int] = []
+    position: int = 0
+    for index in range(len(operations) + 1):
+        positions.append(position)
+        if index not in removed:
+            position += 1
+
+    result: list[OperationBase] = []
+    for index, operation in enumerate(operations):
+        if index in removed:
+            continue
+        if is_relative(operation):
+            target = jump_target(index, operation)
+            if 0 <= target <= len(operations):
+                offset = positions[target] - positions[index] - 1
+                if offset != operation.offset:
+                    operation = replace(operation, offset=offset)
+        result.append(operation)
+    return result
+
+
+def invert_branches(operations: list[OperationBase]) -> list[OperationBase]:
+    """
+    Conditional jumps over an unconditional jump (``jz +1; jb +skip``),
+    which are produced for negated comparators, are replaced with
+    a single inverse branch (``jnz +skip``), unless something jumps
+    to the unconditional jump itself
+    """
+    targets: set[int] = jump_targets(operations)
+    result: list[OperationBase] = list(operations)
+    removed: set[int] = set()
+
+    for index, operation in enumerate(operations[:-1]):
+        next_operation: OperationBase = operations[index + 1]
+        if (
+            not isinstance(operation, JumpOperation)
+            or operation.code not in INVERSE_JUMPS
+            or operation.offset != 1
+            or not isinstance(next_operation, JumpOperation)
+            or next_operation.code is not JumpOperation.Code.JUMP_BECAUSE
+            or index + 1 in targets
+            or next_operation.offset == -1
+        ):
+            continue
+        result[index] = JumpOperation(
+            code=INVERSE_JUMPS[operation.code], offset=next_operation.offset + 1
+        )
+        removed.add(index + 1)
+
+    return remove_operations(result, removed)
+
+
+def thread_jumps(operations: list[OperationBase]) -> list[OperationBase]:
+    """Jumps, that lead to unconditional jumps, are redirected to the final target"""
+    result: list[OperationBase] = list(operations)
+    for index, operation in enumerate(result):
+        if not isinstance(operation, JumpOperation):
+            continue
+
+        target: int = jump_target(index, operation)
+        visited: set[int] = {index}
+        while 0 <= target < len(result) and target not in visited:
+            next_operation = result[target]
+            if not isinstance(next_operation, JumpOperation) or (
+                next_operation.code is not JumpOperation.Code.JUMP_BECAUSE
+            ):
+                break
+            visited.add(target)
+            target = jump_target(target, next_operation)
+
+        offset: int = target - index - 1
+        if offset != operation.offset:
+            result[index] = replace(operation, offset=offset)
+    return result
+
+
+def remove_unreachable(operations: list[OperationBase]) -> list[OperationBase]:
+    """
+    Removes operations, that can't be reached from the start of the program,
+    and jumps to the next operation, which don't change the control flow
+    """
+    while True:
+        reachable: set[int] = set()
+        queue: list[int] = [0]
+        while queue:
+            index = queue.pop()
+            if index in reachable or not 0 <= index < len(operations):
+                continue
+            reachable.add(index)
+            queue.extend(successors(index, operations[index]))
+
+        removed: set[int] = set(range(len(operations))) - reachable
+        removed.update(
+            index
+            for index, operation in enumerate(operations)
+            if isinstance(operation, JumpOperation) and operation.offset == 0
+        )
+        if len(removed) == 0:
+            return operations
+        operations = remove_operations(operations, removed)
+
+
+def remove_redundant_loads(operations: list[OperationBase]) -> list[OperationBase]:
+    """
+    Removes loads of values, that are already present in the target registry.
+    Knowledge about registries is tracked only inside straight-line code
+    and loads are kept if any following jump can depend on their flags
+    """
+    targets: set[int] = jump_targets(operations)
+    known: dict[Registry.Code, set[int]] = {code: set() for code in Registry.Code}
+    removed: set[int] = set()
+
+    for index, operation in enumerate(operations):
+        if index in targets:
+            known = {code: set() for code in Registry.Code}
+
+        if isinstance(operation, MemoryOperation):
+            addresses = known[operation.right.code]
+            if operation.address < IO_DEVICE_COUNT:
+                if operation.code is MemoryOperation.Code.LOAD_MEMORY:
+                    addresses.clear()
+            elif operation.code is MemoryOperation.Code.SAVE_MEMORY:
+                for other in known.values():
+                    other.discard(operation.address)
+                addresses.add(operation.address)
+            elif operation.address in addresses and flags_dead(operations, index):
+                removed.add(index)
+            else:
+                addresses.clear()
+                addresses.add(operation.address)
+        elif isinstance(operation, BinaryOperation | StackOperation):
+            if operation.code not in COMPARISON_CODES:
+                known[operation.right.code].clear()
+        elif isinstance(operation, BlockOperation):
+            if operation.code is not BlockOperation.Code.STREAM_BLOCK:
+                known = {code: set() for code in Registry.Code}
+        else:
+            known = {code: set() for code in Registry.Code}
+
+    return remove_operations(operations, removed)
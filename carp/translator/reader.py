@@ -1,18 +1,56 @@
+from collections import deque
+from collections.abc import Iterable, Iterator
+
 from common.errors import TranslationError
 from translator.parser import Symbol, Parser
 
+# symbols, that can be read again with back(): one for the translator
+# and one to point at the symbol, that caused an error
+LOOKBACK: int = 2
+
 
 class Reader:
-    def __init__(self, data: str) -> None:
-        self.symbols: list[Symbol] = Parser(data).result
+    """
+    Reads symbols from the :py:class:`Parser` one by one, while they are parsed.
+    Only the current symbol and :py:data:`LOOKBACK` previous ones are kept,
+    so the source code is translated in constant memory.
+    :py:attr:`position` is the number of the current symbol from the start
+    """
+
+    def __init__(self, data: str | Iterable[str]) -> None:
+        self.stream: Iterator[Symbol] = iter(Parser(data))
+        self.ahead: deque[Symbol] = deque()
+        self.behind: deque[Symbol] = deque(maxlen=LOOKBACK)
         self.position: int = 0
+        self.consumed: int = 0
+
+    @property
+    def symbols(self) -> list[Symbol]:
+        """Symbols from the current one onward. Reads the rest of the stream"""
+        rest: list[Symbol] = [*self.ahead, *self.stream]
+        self.ahead = deque(rest)
+        self.stream = iter(())
+        return rest
+
+    @symbols.setter
+    def symbols(self, symbols: Iterable[Symbol]) -> None:
+        """Starts reading other symbols from the start"""
+        self.stream = iter(symbols)
+        self.ahead = deque()
+        self.behind.clear()
+        self.position = 0
+        self.consumed = 0
 
     def has_next(self) -> bool:
-        return self.position < len(self.symbols)
+        if not self.ahead and self.position == self.consumed:
+            symbol: Symbol | None = next(self.stream, None)
+            if symbol is not None:
+                self.ahead.append(symbol)
+        return bool(self.ahead) and self.position == self.consumed
 
     def current_or_none(self) -> Symbol | None:
         if self.has_next():
-            return self.symbols[self.position]
+            return self.ahead[0]
         return None
 
     def current_or_closing(self) -> Symbol:
@@ -29,13 +67,16 @@ class Reader:
 
     def next_or_none(self) -> Symbol | None:
         result = self.current_or_none()
+        if result is not None:
+            self.behind.append(self.ahead.popleft())
+            self.consumed += 1
         self.position += 1
-        return result  # noqa: R504  # flake bug
+        return result
 
     def next_or_closing(self) -> Symbol:
         result = self.current_or_closing()
-        self.position += 1
-        return result  # noqa: R504  # flake bug
+        self.next_or_none()
+        return result
 
     def next(self) -> Symbol:  # noqa: A003
         result = self.next_or_closing()
@@ -54,4 +95,15 @@ class Reader:
         return result
 
     def back(self) -> None:
-        self.position -= 1
+        """
+        Steps back to the previous symbol, reads past the end are undone first.
+        Stays at the first symbol, so it can be shown for errors at the start
+        """
+        if self.position > self.consumed:
+            self.position -= 1
+        elif self.behind:
+            self.ahead.appendleft(self.behind.pop())
+            self.consumed -= 1
+            self.position -= 1
+        elif self.consumed:
+            raise IndexError("Only the last symbols can be read again")
@@ -0,0 +1,134 @@
+from translator.forms import (
+    Expression,
+    Form,
+    assigned_names,
+    form_key,
+    is_comparison,
+    is_pure_arithmetic,
+    read_names,
+)
+from translator.loops import CONSTRUCTS
+from translator.parser import Symbol
+from translator.variables import VariableIndex
+
+
+class Subexpression:
+    """All evaluations of the same math expression, while its operands don't change"""
+
+    def __init__(self, first: Expression) -> None:
+        self.occurrences: list[Expression] = [first]
+        self.names: set[str] = read_names(first)
+
+
+class SubexpressionEliminator:
+    """
+    Finds math expressions, that are evaluated more than once in a scope with
+    no assignments to their operands in between. The first evaluation is saved
+    to a temporary variable, which is then read instead of the repeated ones.
+
+    Code in constructs is not guaranteed to run, so it can only reuse values.
+    Conditions are skipped, unless they are comparisons, to keep flags intact
+    """
+
+    def __init__(self, variables: VariableIndex) -> None:
+        self.variables: VariableIndex = variables
+        self.available: dict[tuple[str, ...], Subexpression] = {}
+        self.finished: list[Subexpression] = []
+        self.temporaries: dict[int, str] = {}
+        self.firsts: set[int] = set()
+
+    def kill(self, names: set[str]) -> None:
+        for key, subexpression in list(self.available.items()):
+            if subexpression.names & names:
+                self.finished.append(self.available.pop(key))
+
+    def walk(self, form: Form, record: bool = True) -> None:
+        if isinstance(form, Symbol) or not form.is_closed:
+            return
+        if form.header in CONSTRUCTS:
+            self.walk_construct(form)
+            return
+
+        if is_pure_arithmetic(form):
+            key: tuple[str, ...] = form_key(form)
+            subexpression: Subexpression | None = self.available.get(key)
+            if subexpression is not None:
+                subexpression.occurrences.append(form)
+                return
+            if record:
+                self.available[key] = Subexpression(form)
+
+        for argument in form.arguments:
+            self.walk(argument, record=record)
+        if form.header == "assign":
+            self.kill(assigned_names(form))
+
+    def walk_construct(self, form: Expression) -> None:
+        self.kill(assigned_names(form))
+        if not form.arguments:
+            return
+        condition, *arguments = form.arguments
+        if is_comparison(condition):
+            self.walk(condition, record=False)
+        for argument in arguments:
+            self.walk(argument, record=False)
+
+    def finish(self) -> None:
+        self.finished.extend(self.available.values())
+        self.available.clear()
+        for subexpression in self.finished:
+            if len(subexpression.occurrences) < 2:
+                continue
+            name: str = self.variables.allocate_temporary()
+            self.firsts.add(id(subexpression.occurrences[0]))
+            for occurrence in subexpression.occurrences:
+                self.temporaries[id(occurrence)] = name
+
+    def rebuild(self, form: Form) -> Form:
+        if isinstance(form, Symbol):
+            return form
+
+        name: str | None = self.temporaries.get(id(form))
+        if name is not None and id(form) not in self.firsts:
+            return Symbol(
+                text=name, line=form.head.line, char=form.head.char, temporary=True
+            )
+
+        result: Form = form.with_arguments(
+            [self.rebuild(argument) for argument in form.arguments]
+        )
+        if name is not None:
+            symbol = Symbol(
+                text=name, line=form.head.line, char=form.head.char, temporary=True
+            )
+            result = Expression.create(form.head, "assign", symbol, result)
+        return result
+
+
+def eliminate_scope(form: Form, variables: VariableIndex) -> Form:
+    eliminator = SubexpressionEliminator(variables)
+    eliminator.walk(form)
+    eliminator.finish()
+    return eliminate_constructs(eliminator.rebuild(form), variables)
+
+
+def eliminate_constructs(form: Form, variables: VariableIndex) -> Form:
+    """Code inside constructs is processed as separate scopes"""
+    if isinstance(form, Symbol) or not form.is_closed:
+        return form
+    if form.header not in CONSTRUCTS or not form.arguments:
+        return form.with_arguments(
+            [eliminate_constructs(argument, variables) for argument in form.arguments]
+        )
+    condition, *arguments = form.arguments
+    return form.with_arguments(
+        [condition, *(eliminate_scope(argument, variables) for argument in arguments)]
+    )
+
+
+def eliminate_subexpressions(forms: list[Form], variables: VariableIndex) -> list[Form]:
+    """
+    Common subexpression elimination. Each top-level form and each branch or body
+    of a construct is a separate scope, so values are reused across blocks
+    """
+    return [eliminate_scope(form, variables) for form in forms]
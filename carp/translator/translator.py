@@ -1,9 +1,18 @@
+from collections.abc import Callable
 from contextlib import contextmanager, nullcontext
+from functools import partial
 from typing import Any
 
-from common.constants import INPUT_ADDRESS, OUTPUT_ADDRESS
+from common.constants import (
+    CORE_ID_ADDRESS,
+    INPUT_ADDRESS,
+    IO_DEVICE_COUNT,
+    OUTPUT_ADDRESS,
+)
 from common.errors import TranslationError
 from common.operations import (
+    BlockOperation,
+    IndexedMemoryOperation,
     OperationBase,
     MemoryOperation,
     BinaryOperation,
@@ -13,8 +22,12 @@ from common.operations import (
     RA,
     JumpOperation,
     OPERATOR_TO_CODE,
+    OPERATOR_TO_VECTOR_CODE,
     Registry,
+    SubroutineOperation,
+    VectorOperation,
 )
+from common.program import DataSegment
 from translator.comparators import (
     SYMBOL_TO_COMPARATOR,
     ComparatorData,
@@ -34,12 +47,22 @@ class Translator:
     (represented in :py:attr:`result` as a list of :py:class:`OperationBase`).
 
     Basic usage: initialize and call :py:meth:`parce_blocks`
+
+    With ``shared_runtime`` enabled, runtime routines (like number output)
+    are translated once and placed after the program, while all usages call them.
+    String literals are then streamed from the string table, which is placed
+    to the data memory before start (see :py:attr:`data`)
     """
 
-    def __init__(self, reader: Reader) -> None:
+    def __init__(self, reader: Reader, shared_runtime: bool = False) -> None:
         self.reader: Reader = reader
         self.result: list[OperationBase] = []
         self.variables: VariableIndex = VariableIndex()
+        self.shared_runtime: bool = shared_runtime
+        self.routines: dict[str, list[OperationBase]] = {}
+        self.calls: list[tuple[int, str]] = []
+        self.strings: dict[str, int] = {}
+        self.data: list[DataSegment] = []
 
     def check_closed_bracket(self) -> None:
         self.reader.next_closing()
@@ -56,7 +79,7 @@ class Translator:
             raise TranslationError("Argument can't be a string")
         if argument.is_digit:
             return int(argument.text)
-        return self.variables.read(argument.text)
+        return self.variables.read(argument.text, argument.temporary)
 
     def parse_argument(self, allow_strings: bool = False) -> VarDef | str | int | None:
         if self.reader.current().is_expression:
@@ -81,16 +104,7 @@ class Translator:
         """
         argument = self.parse_argument(allow_strings=allow_strings)
         if allow_strings and isinstance(argument, str):
-            for character in argument:
-                self.extend_result(
-                    BinaryOperation(
-                        code=BinaryOperation.Code.MOVE_DATA,
-                        right=result_registry,
-                        left=Value(value=ord(character)),
-                    )
-                )
-                if operation is not None:
-                    self.extend_result(operation)
+            self.translate_string(argument, operation, result_registry)
             return
         if argument is None:
             self.translate_valuable(result_registry=result_registry, stack=stack)
@@ -113,6 +127,56 @@ class Translator:
         if operation is not None:
             self.extend_result(operation)
 
+    def translate_string(
+        self,
+        text: str,
+        operation: OperationBase | None = None,
+        result_registry: Registry = RA,
+    ) -> None:
+        """
+        Executes the operation for each character of a string, the result
+        is the last character. Strings, that are written to a device, are streamed
+        from the string table when the shared runtime is enabled
+        """
+        if (
+            self.shared_runtime
+            and len(text) > 1
+            and isinstance(operation, MemoryOperation)
+            and operation.code is MemoryOperation.Code.SAVE_MEMORY
+            and operation.address < IO_DEVICE_COUNT
+        ):
+            self.extend_result(
+                BlockOperation(
+                    code=BlockOperation.Code.STREAM_BLOCK,
+                    source=self.allocate_string(text),
+                    address=operation.address,
+                    length=len(text),
+                )
+            )
+            text = text[-1]  # the result is set back to the last character
+            operation = None
+
+        for character in text:
+            self.extend_result(
+                BinaryOperation(
+                    code=BinaryOperation.Code.MOVE_DATA,
+                    right=result_registry,
+                    left=Value(value=ord(character)),
+                )
+            )
+            if operation is not None:
+                self.extend_result(operation)
+
+    def allocate_string(self, text: str) -> int:
+        """Places a string to the string table once"""
+        address: int | None = self.strings.get(text)
+        if address is None:
+            values: list[int] = [ord(character) for character in text]
+            address = self.variables.allocate(len(values))
+            self.strings[text] = address
+            self.data.append(DataSegment(address=address, values=values))
+        return address
+
     @contextmanager
     def stack_save(self, reg: Registry) -> Any:
         """
@@ -151,10 +215,70 @@ class Translator:
                     )
                 )
 
+    def translate_routine(self, name: str, translate: Callable[[], None]) -> None:
+        """
+        Adds a call to a shared routine. The routine is translated on the first call
+        and kept in :py:attr:`routines` until :py:meth:`link_routines`
+        """
+        if name not in self.routines:
+            result, self.result = self.result, []
+            translate()
+            self.extend_result(
+                SubroutineOperation(code=SubroutineOperation.Code.RETURN)
+            )
+            self.routines[name], self.result = self.result, result
+
+        self.calls.append((len(self.result), name))
+        self.extend_result(SubroutineOperation(code=SubroutineOperation.Code.CALL))
+
+    def linked_result(self) -> list[OperationBase]:
+        """
+        The result with used routines placed after the program (with a jump
+        over them to the end) and all calls pointed to their routines.
+        Calls are replaced in the copy, so the translation can be continued
+        """
+        result: list[OperationBase] = list(self.result)
+        if not self.routines:
+            return result
+
+        result.append(
+            JumpOperation(
+                offset=sum(len(routine) for routine in self.routines.values())
+            )
+        )
+        starts: dict[str, int] = {}
+        for name, routine in self.routines.items():
+            starts[name] = len(result)
+            result.extend(routine)
+        for index, name in self.calls:
+            result[index] = SubroutineOperation(
+                code=SubroutineOperation.Code.CALL, offset=starts[name] - index - 1
+            )
+        return result
+
+    def link_routines(self) -> None:
+        """Links used routines to the result (see :py:meth:`linked_result`)"""
+        self.result = self.linked_result()
+        self.routines.clear()
+        self.calls.clear()
+
     def translate_output(self, registry: Registry) -> None:
         """
         Translates the output operation
         """
+        if self.shared_runtime:
+            self.translate_routine(
+                f"output-{registry.code.value}",
+                partial(self.translate_number_output, registry),
+            )
+        else:
+            self.translate_number_output(registry)
+
+    def translate_number_output(self, registry: Registry) -> None:
+        """
+        Translates the number printing routine: digits are pushed to the stack
+        and then printed, the registry is restored afterwards
+        """
 
         buffer_registry: Registry = RB if registry is RA else RA
 
@@ -347,6 +471,159 @@ class Translator:
         )
         jump_operation.offset = condition_start - len(self.result)
 
+    def read_index(self, array: VarDef) -> None:
+        """Checks the index of an array if it is a number, doesn't move the reader"""
+        index: Symbol = self.reader.current()
+        if index.is_digit and not 0 <= int(index.text) < array.size:
+            raise TranslationError(
+                f"Index {index.text} is out of bounds for '{array.name}'"
+                + f" of size {array.size}"
+            )
+
+    def translate_array(self, result_registry: Registry = RA) -> None:
+        """
+        Translates an array declaration: ``(array name size)``, size should
+        be a number. The value of the declaration is the size
+        """
+        name: str = self.reader.next().text
+        size: Symbol = self.reader.next()
+        if not size.is_digit:
+            raise TranslationError("Array size should be a number")
+        self.variables.register_array(name, int(size.text))
+        self.extend_result(
+            BinaryOperation(
+                code=BinaryOperation.Code.MOVE_DATA,
+                right=result_registry,
+                left=Value(value=int(size.text)),
+            )
+        )
+
+    def translate_get(self, result_registry: Registry = RA, stack: bool = True) -> None:
+        """
+        Translates an indexed read: ``(get name index)``.
+        The index is calculated in the result registry and then replaced
+        with the element, so the other registry is not touched
+        """
+        array: VarDef = self.variables.read_array(self.reader.next().text)
+        self.read_index(array)
+        self.translate_argument(
+            IndexedMemoryOperation(
+                code=IndexedMemoryOperation.Code.LOAD_INDEXED,
+                right=result_registry,
+                index=result_registry,
+                address=array.location,
+            ),
+            result_registry=result_registry,
+            stack=stack,
+        )
+
+    def translate_set(self, result_registry: Registry = RA, stack: bool = True) -> None:
+        """
+        Translates an indexed assign: ``(set name index value)``, the value
+        is the result. The index is kept in the buffer registry with stack-protection
+        """
+        array: VarDef = self.variables.read_array(self.reader.next().text)
+        self.read_index(array)
+        buffer_registry: Registry = RB if result_registry is RA else RA
+
+        with self.stack_save(buffer_registry) if stack else nullcontext():
+            self.translate_argument(result_registry=buffer_registry)
+            self.translate_argument(
+                IndexedMemoryOperation(
+                    code=IndexedMemoryOperation.Code.SAVE_INDEXED,
+                    right=result_registry,
+                    index=buffer_registry,
+                    address=array.location,
+                ),
+                result_registry=result_registry,
+            )
+
+    def translate_copy(self, result_registry: Registry = RA) -> None:
+        """
+        Translates a copy of an array to another: ``(copy target source)``,
+        arrays should be of the same size, which is the value of the copy
+        """
+        target: VarDef = self.variables.read_array(self.reader.next().text)
+        source: VarDef = self.read_same_array(target.size)
+        self.extend_result(
+            BlockOperation(
+                code=BlockOperation.Code.COPY_BLOCK,
+                source=source.location,
+                address=target.location,
+                length=target.size,
+            ),
+            BinaryOperation(
+                code=BinaryOperation.Code.MOVE_DATA,
+                right=result_registry,
+                left=Value(value=target.size),
+            ),
+        )
+
+    def translate_fill(
+        self, result_registry: Registry = RA, stack: bool = True
+    ) -> None:
+        """
+        Translates a fill of the whole array: ``(fill name value)``,
+        the value is the result
+        """
+        array: VarDef = self.variables.read_array(self.reader.next().text)
+        self.translate_argument(
+            BlockOperation(
+                code=BlockOperation.Code.FILL_BLOCK,
+                right=result_registry,
+                address=array.location,
+                length=array.size,
+            ),
+            result_registry=result_registry,
+            stack=stack,
+        )
+
+    def read_same_array(self, size: int) -> VarDef:
+        array: VarDef = self.variables.read_array(self.reader.next().text)
+        if array.size != size:
+            raise TranslationError(
+                f"Array '{array.name}' should be of size {size}, got {array.size}"
+            )
+        return array
+
+    def translate_vector(
+        self, result_registry: Registry = RA, stack: bool = True
+    ) -> None:
+        """
+        Translates an element-wise operation: ``(vector operator target left right)``,
+        all arrays should be of the same size, which is the value of the operation.
+        If the right side is not an array, it is calculated in the result registry
+        and used for every element
+        """
+        operator: str = self.reader.next().text
+        code: VectorOperation.Code | None = OPERATOR_TO_VECTOR_CODE.get(operator)
+        if code is None:
+            raise TranslationError(f"Unknown vector operator: '{operator}'")
+        target: VarDef = self.variables.read_array(self.reader.next().text)
+        source: VarDef = self.read_same_array(target.size)
+
+        operand: int | Registry
+        if self.reader.current().text in self.variables.arrays:
+            operand = self.read_same_array(target.size).location
+        else:
+            self.translate_argument(result_registry=result_registry, stack=stack)
+            operand = result_registry
+
+        self.extend_result(
+            VectorOperation(
+                code=code,
+                source=source.location,
+                operand=operand,
+                address=target.location,
+                length=target.size,
+            ),
+            BinaryOperation(
+                code=BinaryOperation.Code.MOVE_DATA,
+                right=result_registry,
+                left=Value(value=target.size),
+            ),
+        )
+
     def translate_valuable(
         self, result_registry: Registry = RA, stack: bool = True
     ) -> None:
@@ -369,6 +646,7 @@ class Translator:
                     MemoryOperation(
                         code=MemoryOperation.Code.SAVE_MEMORY,
                         address=OUTPUT_ADDRESS,
+                        right=result_registry,
                     ),
                     result_registry=result_registry,
                     allow_strings=True,
@@ -378,16 +656,29 @@ class Translator:
                 self.translate_argument(stack=stack, result_registry=result_registry)
                 self.translate_output(result_registry)
             case "assign":
-                var_name = self.reader.next().text
-                location = self.variables.register(var_name)
+                name: Symbol = self.reader.next()
+                location = self.variables.register(name.text, name.temporary)
                 self.translate_argument(
                     MemoryOperation(
                         code=MemoryOperation.Code.SAVE_MEMORY,
                         address=location,
+                        right=result_registry,
                     ),
                     result_registry=result_registry,
                     stack=stack,
                 )
+            case "array":
+                self.translate_array(result_registry=result_registry)
+            case "get":
+                self.translate_get(result_registry=result_registry, stack=stack)
+            case "set":
+                self.translate_set(result_registry=result_registry, stack=stack)
+            case "copy":
+                self.translate_copy(result_registry=result_registry)
+            case "fill":
+                self.translate_fill(result_registry=result_registry, stack=stack)
+            case "vector":
+                self.translate_vector(result_registry=result_registry, stack=stack)
             case "if":
                 self.translate_construct(
                     loop=False, result_registry=result_registry, stack=stack
@@ -406,6 +697,14 @@ class Translator:
                         address=INPUT_ADDRESS,
                     )
                 )
+            case "core":
+                self.extend_result(
+                    MemoryOperation(
+                        code=MemoryOperation.Code.LOAD_MEMORY,
+                        right=result_registry,
+                        address=CORE_ID_ADDRESS,
+                    )
+                )
             case _:
                 template = SYMBOL_TO_COMPARATOR.get(header)
                 if template is not None:
@@ -442,3 +741,6 @@ class Translator:
             if allow_quit and self.reader.current_or_closing().is_closing:
                 return
             self.translate_argument(result_registry=result_registry, stack=stack)
+
+        if not allow_quit:
+            self.link_routines()
@@ -1,38 +1,107 @@
 import re
-
-from pydantic import BaseModel
+from dataclasses import dataclass
 
 from common.constants import IO_DEVICE_COUNT
 from common.errors import TranslationError
 
 
-class VarDef(BaseModel):
+@dataclass(frozen=True, slots=True, kw_only=True)
+class VarDef:
     name: str
     location: int
+    size: int = 1
 
 
 class VariableIndex:
     VARIABLE_REGEX: re.Pattern[str] = re.compile("[a-z_][a-z_0-9]*")
+    TEMPORARY_PREFIX: str = "$"
 
     def __init__(self) -> None:
         self.variables: dict[str, int] = {}
+        self.arrays: dict[str, int] = {}
+        self.temporaries: set[str] = set()
         self.next_location: int = IO_DEVICE_COUNT
 
-    def bad_name(self, name: str) -> bool:
+    def mark(self) -> tuple[int, int]:
+        """The state to go back to with :py:meth:`rollback`"""
+        return len(self.variables), self.next_location
+
+    def rollback(self, mark: tuple[int, int]) -> None:
+        """
+        Forgets variables, registered after the mark. Names only
+        are added, so the ones after the mark are the last in the dict
+        """
+        size, self.next_location = mark
+        while len(self.variables) > size:
+            name, _ = self.variables.popitem()
+            self.arrays.pop(name, None)
+            self.temporaries.discard(name)
+
+    def bad_name(self, name: str, temporary: bool = False) -> bool:
+        """
+        Names of temporaries are only allowed, when they come from
+        the optimizer (``temporary``), users can't read or change them
+        """
+        if temporary and name in self.temporaries:
+            return False
         return re.fullmatch(self.VARIABLE_REGEX, name) is None
 
-    def register(self, name: str) -> int:
-        if self.bad_name(name):
+    def allocate_temporary(self) -> str:
+        """
+        Registers a compiler-generated variable. Its name doesn't match
+        :py:attr:`VARIABLE_REGEX`, so it can't clash with user's variables
+        """
+        name = f"{self.TEMPORARY_PREFIX}{len(self.temporaries)}"
+        self.temporaries.add(name)
+        self.register(name, temporary=True)
+        return name
+
+    def register(self, name: str, temporary: bool = False) -> int:
+        if self.bad_name(name, temporary):
             raise TranslationError(f"Unsupported variable name: '{name}'")
+        if name in self.arrays:
+            raise TranslationError(f"Array '{name}' can only be changed with 'set'")
         if name not in self.variables:
             self.variables[name] = self.next_location
             self.next_location += 1
         return self.variables[name]
 
-    def read(self, name: str) -> VarDef:
+    def register_array(self, name: str, size: int) -> int:
+        """
+        Allocates a contiguous range of ``size`` cells for an array.
+        Arrays can be declared again, but only with the same size
+        """
         if self.bad_name(name):
             raise TranslationError(f"Unsupported variable name: '{name}'")
+        if size < 1:
+            raise TranslationError(f"Array size should be positive, got {size}")
+        if name in self.variables and self.arrays.get(name) != size:
+            raise TranslationError(f"Variable '{name}' is already defined")
+        if name not in self.variables:
+            self.variables[name] = self.allocate(size)
+            self.arrays[name] = size
+        return self.variables[name]
+
+    def allocate(self, size: int) -> int:
+        """Reserves a range of memory, that is not bound to any name"""
+        location: int = self.next_location
+        self.next_location += size
+        return location
+
+    def _read(self, name: str, temporary: bool = False) -> VarDef:
+        if self.bad_name(name, temporary):
+            raise TranslationError(f"Unsupported variable name: '{name}'")
         location = self.variables.get(name)
         if location is None:
             raise TranslationError(f"Variable '{name}' is not defined")
-        return VarDef(name=name, location=location)
+        return VarDef(name=name, location=location, size=self.arrays.get(name, 1))
+
+    def read(self, name: str, temporary: bool = False) -> VarDef:
+        if name in self.arrays:
+            raise TranslationError(f"Array '{name}' can only be read with 'get'")
+        return self._read(name, temporary)
+
+    def read_array(self, name: str) -> VarDef:
+        if name in self.variables and name not in self.arrays:
+            raise TranslationError(f"Variable '{name}' is not an array")
+        return self._read(name)